@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+from trend_utils import ols_slope
 
 logger = logging.getLogger(__name__)
 
@@ -88,9 +89,9 @@ class HolzhauerStrategy:
         """Analyze recent performance trends"""
         try:
             recent_games = stats.sort_values('date').tail(5)
-            trend = np.polyfit(range(len(recent_games)), 
-                             recent_games['performance'], 
-                             deg=1)[0]
+            trend = ols_slope(recent_games['performance'].to_numpy())
+            if np.isnan(trend):  # Fewer than 2 games: no trend
+                return 1.0
             
             # Convert trend to multiplier
             return 1 + (trend * 0.1)  # 10% adjustment per trend unit
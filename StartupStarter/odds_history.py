@@ -1,8 +1,8 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import os
 from config import DATA_DIR
+from trend_utils import ols_slope
 import json
 import logging
 
@@ -106,7 +106,7 @@ class OddsHistory:
                     volatility = odds_series.std() / odds_series.mean()
                     
                     # Determina tendência
-                    slope = np.polyfit(range(len(odds_series)), odds_series, 1)[0]
+                    slope = ols_slope(odds_series.to_numpy())
                     
                     trend_info = {
                         'Match': match,
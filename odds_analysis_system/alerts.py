@@ -7,7 +7,7 @@ import logging
 import numpy as np
 import requests
 import threading
-from queue import Queue
+from queue import Queue, Empty
 
 logger = logging.getLogger(__name__)
 
@@ -42,10 +42,11 @@ class AlertSystem:
         """Loop principal de processamento de alertas"""
         while self.is_running:
             try:
-                if not self.alert_queue.empty():
-                    alert = self.alert_queue.get()
-                    self._process_alert(alert)
-                time.sleep(1)
+                # Espera bloqueante: o alerta sai assim que entra na fila
+                alert = self.alert_queue.get(timeout=1)
+                self._process_alert(alert)
+            except Empty:
+                continue
             except Exception as e:
                 logger.error(f"Erro no loop de alertas: {e}")
                 time.sleep(5)
@@ -53,7 +54,7 @@ class AlertSystem:
     def _process_alert(self, alert):
         """Processa e envia um alerta"""
         try:
-            alert_key = f"{alert['type']}_{alert['message']}"
+            alert_key = alert.get('key') or f"{alert['type']}_{alert['message']}"
             current_time = datetime.now()
             
             # Verifica se já enviou alerta similar recentemente
@@ -105,28 +106,56 @@ class AlertSystem:
         except Exception as e:
             logger.error(f"Erro ao verificar movimentos de odds: {e}")
     
-    def check_arbitrage(self, current_odds):
-        """Verifica oportunidades de arbitragem"""
+    def check_arbitrage(self, current_odds, best_prices=None):
+        """Verifica oportunidades de arbitragem entre casas diferentes"""
         try:
             for match in current_odds['Match'].unique():
-                match_odds = current_odds[current_odds['Match'] == match]
+                if best_prices is not None:
+                    home_quotes, away_quotes = best_prices.quotes(match, 'home'), best_prices.quotes(match, 'away')
+                else:
+                    match_odds = current_odds[current_odds['Match'] == match]
+                    home_quotes = dict(zip(match_odds['Bookmaker'], match_odds['Home_Odds']))
+                    away_quotes = dict(zip(match_odds['Bookmaker'], match_odds['Away_Odds']))
                 
-                min_home = match_odds['Home_Odds'].min()
-                min_away = match_odds['Away_Odds'].min()
-                
-                implied_prob = (1/min_home + 1/min_away) * 100
+                arbitrage = self._find_arbitrage(home_quotes, away_quotes)
+                if arbitrage is None:
+                    continue
                 
-                if implied_prob < 100:  # Oportunidade de arbitragem
-                    profit = (100 - implied_prob)
-                    self.alert_queue.put({
-                        'type': 'Arbitragem',
-                        'match': match,
-                        'message': f"Possível arbitragem com {profit:.1f}% de lucro"
-                    })
+                profit, (home_odds, home_book), (away_odds, away_book) = arbitrage
+                self.alert_queue.put({
+                    'type': 'Arbitragem',
+                    'match': match,
+                    'key': ('Arbitragem', match),  # O lucro muda a cada tick; o cooldown vale por partida
+                    'message': (f"Possível arbitragem com {profit:.1f}% de lucro: "
+                                f"casa {home_odds:.2f} ({home_book}), fora {away_odds:.2f} ({away_book})")
+                })
                     
         except Exception as e:
             logger.error(f"Erro ao verificar arbitragem: {e}")
     
+    def _find_arbitrage(self, home_quotes, away_quotes):
+        """Melhor par de cotações de casas diferentes cuja soma das probabilidades implícitas fica abaixo de 100%
+        
+        Retorna (lucro %, (cotação casa, casa), (cotação fora, casa)) ou None.
+        """
+        # Uma casa sem margem no próprio mercado tem cotação inválida ou desatualizada
+        books = [book for book in home_quotes.keys() & away_quotes.keys()
+                 if home_quotes[book] > 1 and away_quotes[book] > 1
+                 and 1/home_quotes[book] + 1/away_quotes[book] >= 1]
+        if len(books) < 2:
+            return None
+        
+        # Duas melhores de cada lado bastam para o melhor par de casas diferentes
+        top_home = sorted(((home_quotes[book], book) for book in books), reverse=True)[:2]
+        top_away = sorted(((away_quotes[book], book) for book in books), reverse=True)[:2]
+        pairs = [(home, away) for home in top_home for away in top_away if home[1] != away[1]]
+        home, away = min(pairs, key=lambda pair: 1/pair[0][0] + 1/pair[1][0])
+        
+        profit = (1 - (1/home[0] + 1/away[0])) * 100
+        if profit <= 0 or profit > ALERT_THRESHOLDS['max_arbitrage_profit']:
+            return None
+        return profit, home, away
+    
     def check_opportunities(self):
         """Verifica novas oportunidades com alto EV"""
         try:
@@ -1,39 +1,29 @@
-from flask import Flask, render_template, jsonify, request
-import pandas as pd
-from config import ODDS_FILE, OPPORTUNITIES_FILE
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.utils
-import json
+from flask import Flask, Blueprint, render_template, jsonify, request
 from odds_history import OddsHistory
 from alerts import AlertSystem
 from player_stats import PlayerStatsAnalyzer
 from player_behavior_tracker import PlayerBehaviorTracker
+from behavior_store import BehaviorStore
 import config
 import logging
 import os
 from datetime import datetime
 import threading
 from odds_collector import OddsCollector
+from state_service import SharedOddsCollector
 from monitoring import SystemMonitor
 from holzhauer_strategy import HolzhauerStrategy
+from model_trainer import ModelTrainer
+from clv_tracker import CLVTracker
+from market_consensus import MarketConsensus
+from steam_detector import SteamDetector
+from best_price_index import BestPriceIndex
+from game_context import GameContextCache
 from nba_analyzer import NBAAnalyzer
-from apscheduler.schedulers.background import BackgroundScheduler
-from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
-
-# Configuração do Sentry para monitoramento de erros
-sentry_sdk.init(
-    dsn=os.getenv("SENTRY_DSN"),
-    integrations=[FlaskIntegration()],
-    environment=os.getenv("ENVIRONMENT", "production"),
-    traces_sample_rate=1.0
-)
 
 # Configuração de logging
 logging.basicConfig(
@@ -43,50 +33,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-
-# Configuração do CORS
-CORS(app, resources={r"/*": {"origins": "*"}})
+bp = Blueprint('main', __name__)
 
-# Configuração do Rate Limiting
+# Extensões, vinculadas ao app em create_app()
 limiter = Limiter(
-    app=app,
     key_func=get_remote_address,
     default_limits=["100 per day", "30 per hour"]
 )
-
-# Configuração do Cache simples
-cache_config = {
+cache = Cache(config={
     "CACHE_TYPE": "SimpleCache",
     "CACHE_DEFAULT_TIMEOUT": 300
-}
-cache = Cache(app, config=cache_config)
-
-# Configuração do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///odds.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
+})
 
-# Inicialização dos sistemas
-odds_collector = OddsCollector()
+# Inicialização dos sistemas (construção leve; modelos e threads só em create_app/primeiro uso)
+odds_collector = SharedOddsCollector() if config.STATE_MODE == 'shared' else OddsCollector()
 history_manager = OddsHistory()
 alert_system = AlertSystem()
 stats_analyzer = PlayerStatsAnalyzer()
-behavior_tracker = PlayerBehaviorTracker()
+behavior_tracker = PlayerBehaviorTracker(store=BehaviorStore())
 system_monitor = SystemMonitor()
-holzhauer = HolzhauerStrategy()
+best_prices = BestPriceIndex()
+holzhauer = HolzhauerStrategy(best_prices=best_prices)
+model_trainer = ModelTrainer()
+clv_tracker = CLVTracker()
+market_consensus = MarketConsensus()
+steam_detector = SteamDetector(alert_system)
+game_contexts = GameContextCache(odds_collector, stats_analyzer, holzhauer)
+
+def flag_clv_opportunities(odds_data, version):
+    """Listener da coleta: registra para CLV as oportunidades recomendadas do snapshot"""
+    clv_tracker.flag_opportunities(holzhauer.analyze_opportunities(odds_data, version), odds_data)
+
+def check_arbitrage(odds_data, version):
+    """Listener da coleta: verifica arbitragem com o índice de melhores preços"""
+    alert_system.check_arbitrage(odds_data, best_prices)
+
+odds_collector.add_listener(best_prices.on_snapshot)
+# No modo compartilhado linhas, CLV, steam e arbitragem ficam com o processo de estado
+if config.STATE_MODE != 'shared':
+    odds_collector.add_listener(clv_tracker.record_snapshot)
+    odds_collector.add_listener(flag_clv_opportunities)
+    odds_collector.add_listener(steam_detector.on_snapshot)
+    odds_collector.add_listener(check_arbitrage)
 nba_analyzer = NBAAnalyzer()
 
-# Inicia a coleta de odds
-odds_collector.start_collection()
+def create_app():
+    """Cria e configura a aplicação Flask"""
+    app = Flask(__name__)
+
+    # Configuração do Sentry para monitoramento de erros (importado só se configurado)
+    if os.getenv("SENTRY_DSN"):
+        import sentry_sdk
+        from sentry_sdk.integrations.flask import FlaskIntegration
+        sentry_sdk.init(
+            dsn=os.getenv("SENTRY_DSN"),
+            integrations=[FlaskIntegration()],
+            environment=os.getenv("ENVIRONMENT", "production"),
+            traces_sample_rate=1.0
+        )
+
+    # Configuração do CORS
+    CORS(app, resources={r"/*": {"origins": "*"}})
+
+    # Rate limiting e cache
+    limiter.init_app(app)
+    cache.init_app(app)
+
+    # Configuração do banco de dados (apenas quando configurado)
+    if os.getenv('DATABASE_URL'):
+        from flask_sqlalchemy import SQLAlchemy
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        SQLAlchemy(app)
 
-@app.route('/')
+    app.register_blueprint(bp)
+
+    # Inicia a coleta de odds
+    odds_collector.start_collection()
+
+    # Alertas de steam e arbitragem (no modo compartilhado, com o processo de estado).
+    # O retreino não começa aqui: create_app roda em cada worker, e o agendamento é
+    # único (hooks do gunicorn, processo de estado ou o __main__ abaixo)
+    if config.STATE_MODE != 'shared':
+        alert_system.start()
+
+    return app
+
+@bp.route('/')
 @limiter.limit("60 per minute")
 @cache.cached(timeout=30)
 def index():
     try:
         games = odds_collector.get_live_games()
-        opportunities = holzhauer.get_opportunities()
+        opportunities = holzhauer.get_opportunities(
+            odds_collector.get_current_odds(),
+            odds_collector.snapshot_version
+        )
         return render_template('index.html', 
                              games=games,
                              opportunities=opportunities,
@@ -98,12 +140,12 @@ def index():
                              opportunities=[],
                              error="Erro ao carregar dados")
 
-@app.route('/players')
+@bp.route('/players')
 def player_dashboard():
     """Dashboard de análise de jogadores"""
     return render_template('behavior_tracker.html')
 
-@app.route('/register_observation', methods=['POST'])
+@bp.route('/register_observation', methods=['POST'])
 def register_observation():
     """Registra uma nova observação de comportamento"""
     try:
@@ -119,7 +161,7 @@ def register_observation():
         logger.error(f"Erro ao registrar observação: {e}")
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/register_interaction', methods=['POST'])
+@bp.route('/register_interaction', methods=['POST'])
 def register_interaction():
     """Registra uma interação entre jogadores"""
     try:
@@ -135,7 +177,7 @@ def register_interaction():
         logger.error(f"Erro ao registrar interação: {e}")
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/get_emotional_states')
+@bp.route('/get_emotional_states')
 def get_emotional_states():
     """Retorna estados emocionais atuais dos jogadores"""
     try:
@@ -147,7 +189,7 @@ def get_emotional_states():
         logger.error(f"Erro ao obter estados emocionais: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_sequence_analysis')
+@bp.route('/get_sequence_analysis')
 def get_sequence_analysis():
     """Retorna análise de sequências para jogadores"""
     try:
@@ -159,7 +201,7 @@ def get_sequence_analysis():
         logger.error(f"Erro ao obter análise de sequências: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_correlation_analysis')
+@bp.route('/get_correlation_analysis')
 def get_correlation_analysis():
     """Retorna análise de correlações para jogadores"""
     try:
@@ -171,7 +213,7 @@ def get_correlation_analysis():
         logger.error(f"Erro ao obter análise de correlações: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_behavior_history')
+@bp.route('/get_behavior_history')
 def get_behavior_history():
     """Retorna histórico de observações"""
     try:
@@ -183,21 +225,65 @@ def get_behavior_history():
         logger.error(f"Erro ao obter histórico de comportamento: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_opportunities')
+@bp.route('/get_opportunities')
 @limiter.limit("60 per minute")
 @cache.cached(timeout=30)
 def get_opportunities():
     try:
         odds_data = odds_collector.get_current_odds()
         if not odds_data.empty:
-            opportunities = holzhauer.analyze_opportunities(odds_data)
+            opportunities = holzhauer.analyze_opportunities(odds_data, odds_collector.snapshot_version)
             return jsonify(opportunities)
         return jsonify([])
     except Exception as e:
         logger.error(f"Erro ao obter oportunidades: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/get_player_stats')
+@bp.route('/clv')
+@limiter.limit("30 per minute")
+def get_clv():
+    """Retorna o closing line value das oportunidades sinalizadas no dia (?date=AAAA-MM-DD)"""
+    try:
+        day = request.args.get('date')
+        day = datetime.strptime(day, '%Y-%m-%d').date() if day else None
+        return jsonify(clv_tracker.compute_clv(day))
+    except Exception as e:
+        logger.error(f"Erro ao calcular CLV: {e}")
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/market_consensus')
+@limiter.limit("60 per minute")
+def get_market_consensus():
+    """Retorna o preço justo ponderado de cada mercado e as casas fora do consenso"""
+    try:
+        odds_data = odds_collector.get_current_odds()
+        if odds_data.empty:
+            return jsonify({'markets': [], 'outliers': []})
+
+        consensus = market_consensus.compute(odds_data, odds_collector.snapshot_version)
+        return jsonify({
+            'markets': consensus['markets'].to_dict('records'),
+            'outliers': consensus['outliers'].to_dict('records')
+        })
+    except Exception as e:
+        logger.error(f"Erro ao calcular consenso de mercado: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/best_prices')
+@limiter.limit("120 per minute")
+def get_best_prices():
+    """Retorna o quadro de melhores preços de todos os mercados ao vivo"""
+    try:
+        odds_collector.get_current_odds()  # No modo compartilhado, recarrega o snapshot se mudou
+        return jsonify({
+            'snapshot_version': best_prices.snapshot_version,
+            'markets': best_prices.board()
+        })
+    except Exception as e:
+        logger.error(f"Erro ao obter melhores preços: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/get_player_stats')
 def get_player_stats():
     """Retorna estatísticas completas do jogador"""
     try:
@@ -213,7 +299,18 @@ def get_player_stats():
         logger.error(f"Erro ao obter estatísticas do jogador: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_live_games')
+@bp.route('/prop_probabilities')
+@limiter.limit("30 per minute")
+def get_prop_probabilities():
+    """Retorna a probabilidade de over/under e o EV de todas as props"""
+    try:
+        scored = stats_analyzer.score_props()
+        return jsonify(scored.astype(object).where(scored.notna(), None).to_dict('records'))
+    except Exception as e:
+        logger.error(f"Erro ao obter probabilidades das props: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/get_live_games')
 @limiter.limit("120 per minute")
 @cache.cached(timeout=15)
 def get_live_games():
@@ -227,7 +324,7 @@ def get_live_games():
         logger.error(f"Erro ao obter jogos ao vivo: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/get_upcoming_games')
+@bp.route('/get_upcoming_games')
 def get_upcoming_games():
     """Retorna próximos jogos com previsões"""
     try:
@@ -265,17 +362,17 @@ def get_upcoming_games():
         logger.error(f"Erro ao obter próximos jogos: {e}")
         return jsonify([])
 
-@app.route('/analysis/<game_id>')
+@bp.route('/analysis/<game_id>')
 def game_analysis(game_id):
     """Página de análise detalhada do jogo ao vivo"""
     return render_template('game_analysis.html', game_id=game_id)
 
-@app.route('/pregame/<game_id>')
+@bp.route('/pregame/<game_id>')
 def pregame_analysis(game_id):
     """Página de análise pré-jogo"""
     return render_template('pregame_analysis.html', game_id=game_id)
 
-@app.route('/get_game_data/<game_id>')
+@bp.route('/get_game_data/<game_id>')
 def get_game_data(game_id):
     """Retorna dados atualizados do jogo"""
     try:
@@ -297,35 +394,17 @@ def get_game_data(game_id):
         logger.error(f"Erro ao obter dados do jogo: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/get_player_analysis/<game_id>')
+@bp.route('/get_player_analysis/<game_id>')
 def get_player_analysis(game_id):
     """Retorna análise detalhada dos jogadores"""
     try:
-        # Obter dados do jogo
-        game_data = odds_collector.get_game_data(game_id)
-        player_stats = {}  # Implementar coleta de estatísticas
-        team_stats = {}    # Implementar coleta de estatísticas
+        # Contexto do jogo no snapshot atual, compartilhado com a análise por quarter e as props
+        context = game_contexts.get(game_id)
+        if context is None:
+            return jsonify({'error': 'Jogo não encontrado'}), 404
         
         # Análise Holzhauer
-        analysis = []
-        for player in game_data.get('players', []):
-            quarter_stats = {}
-            for quarter in range(1, 5):
-                stats = holzhauer.analyze_quarter_stats(
-                    player_name=player['name'],
-                    quarter=quarter,
-                    game_situation=game_data
-                )
-                quarter_stats[quarter] = {
-                    'average': stats['average'],
-                    'confidence': stats['confidence'],
-                    'trend': stats['trend']
-                }
-            
-            analysis.append({
-                'name': player['name'],
-                'quarter_stats': quarter_stats
-            })
+        analysis = context.quarter_analysis()
             
         return jsonify(analysis)
         
@@ -333,7 +412,7 @@ def get_player_analysis(game_id):
         logger.error(f"Erro ao obter análise dos jogadores: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/get_game_predictions/<game_id>')
+@bp.route('/get_game_predictions/<game_id>')
 def get_game_predictions(game_id):
     """Retorna previsões para o jogo atual"""
     try:
@@ -358,7 +437,7 @@ def get_game_predictions(game_id):
         logger.error(f"Erro ao obter previsões: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/update_charts')
+@bp.route('/update_charts')
 def update_charts():
     """Atualiza os gráficos do dashboard"""
     try:
@@ -400,7 +479,7 @@ def update_charts():
             'details': str(e)
         }), 500
 
-@app.route('/get_trends')
+@bp.route('/get_trends')
 def get_trends():
     try:
         odds_df, _ = load_data()
@@ -437,7 +516,7 @@ def get_trends():
             'details': str(e)
         }), 500
 
-@app.route('/system/health')
+@bp.route('/system/health')
 def system_health():
     """Retorna status do sistema"""
     try:
@@ -447,7 +526,7 @@ def system_health():
         logger.error(f"Erro ao obter saúde do sistema: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/system/stats')
+@bp.route('/system/stats')
 def system_stats():
     """Retorna estatísticas do sistema"""
     try:
@@ -458,24 +537,22 @@ def system_stats():
         logger.error(f"Erro ao obter estatísticas: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/analyze_opportunity/<match_id>')
+@bp.route('/analyze_opportunity/<match_id>')
 def analyze_opportunity(match_id):
     """Analisa oportunidade usando estratégia Holzhauer"""
     try:
         odds_data = odds_collector.get_current_odds()
-        match_data = odds_data[odds_data['Match'] == match_id]
-        
-        if match_data.empty:
+        if odds_data.empty or match_id not in set(odds_data['Match']):
             return jsonify({'error': 'Partida não encontrada'}), 404
             
-        analysis = holzhauer.analyze_opportunity(match_data)
+        analysis = holzhauer.get_match_analysis(odds_data, match_id, odds_collector.snapshot_version)
         return jsonify(analysis)
         
     except Exception as e:
         logger.error(f"Erro ao analisar oportunidade: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/nba/analyze/<game_id>')
+@bp.route('/nba/analyze/<game_id>')
 def analyze_nba_game(game_id):
     """Analisa jogo NBA usando estratégia Holzhauer"""
     try:
@@ -496,7 +573,25 @@ def analyze_nba_game(game_id):
         logger.error(f"Erro ao analisar jogo NBA: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/nba/games')
+@bp.route('/nba/analyze_slate', methods=['POST'])
+def analyze_nba_slate():
+    """Analisa todos os jogos da rodada de uma vez usando estratégia Holzhauer"""
+    try:
+        data = request.json
+        games = [
+            (game.get('game_data', {}), game.get('player_stats', {}), game.get('team_stats', {}))
+            for game in data.get('games', [])
+        ]
+
+        # Análise Holzhauer em lote, um resultado por jogo na ordem recebida
+        analyses = nba_analyzer.analyze_slate(nba_analyzer.build_slate(games))
+        return jsonify(analyses)
+
+    except Exception as e:
+        logger.error(f"Erro ao analisar rodada NBA: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/nba/games')
 def get_nba_games():
     """Retorna jogos NBA disponíveis"""
     games = [
@@ -515,12 +610,12 @@ def get_nba_games():
     ]
     return jsonify(games)
 
-@app.route('/nba/dashboard')
+@bp.route('/nba/dashboard')
 def nba_dashboard():
     """Renderiza dashboard NBA"""
     return render_template('nba_dashboard.html')
 
-@app.route('/register_emotion', methods=['POST'])
+@bp.route('/register_emotion', methods=['POST'])
 def register_emotion():
     """Registra uma emoção do jogador"""
     try:
@@ -532,7 +627,7 @@ def register_emotion():
         logger.error(f"Erro ao registrar emoção: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/trigger_alert', methods=['POST'])
+@bp.route('/trigger_alert', methods=['POST'])
 def trigger_alert():
     """Dispara um alerta de risco"""
     try:
@@ -544,7 +639,7 @@ def trigger_alert():
         logger.error(f"Erro ao disparar alerta: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/add_note', methods=['POST'])
+@bp.route('/add_note', methods=['POST'])
 def add_note():
     """Adiciona uma nota de observação"""
     try:
@@ -556,7 +651,7 @@ def add_note():
         logger.error(f"Erro ao adicionar nota: {e}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/holzhauer')
+@bp.route('/holzhauer')
 @limiter.limit("60 per minute")
 def holzhauer_analysis():
     analysis = holzhauer.get_current_analysis()
@@ -565,33 +660,17 @@ def holzhauer_analysis():
                          analysis=analysis, 
                          trends=trends)
 
-@app.route('/get_quarter_analysis/<game_id>')
+@bp.route('/get_quarter_analysis/<game_id>')
 def get_quarter_analysis(game_id):
     """Retorna análise por quarter dos jogadores"""
     try:
-        # Obtém dados do jogo
-        game_data = odds_collector.get_game_data(game_id)
+        # Contexto do jogo no snapshot atual
+        context = game_contexts.get(game_id)
+        if context is None:
+            return jsonify({'error': 'Jogo não encontrado'}), 404
         
         # Análise por quarter usando estratégia Holzhauer
-        analysis = []
-        for player in game_data.get('players', []):
-            quarter_stats = {}
-            for quarter in range(1, 5):
-                stats = holzhauer.analyze_quarter_stats(
-                    player_name=player['name'],
-                    quarter=quarter,
-                    game_situation=game_data
-                )
-                quarter_stats[quarter] = {
-                    'average': stats['average'],
-                    'confidence': stats['confidence'],
-                    'trend': stats['trend']
-                }
-            
-            analysis.append({
-                'name': player['name'],
-                'quarter_stats': quarter_stats
-            })
+        analysis = context.quarter_analysis()
             
         return jsonify(analysis)
         
@@ -599,46 +678,28 @@ def get_quarter_analysis(game_id):
         logger.error(f"Erro ao obter análise por quarter: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/get_value_props/<game_id>')
+@bp.route('/get_value_props/<game_id>')
 def get_value_props(game_id):
     """Retorna props com valor usando estratégia Holzhauer"""
     try:
-        # Obtém dados do jogo
-        game_data = odds_collector.get_game_data(game_id)
+        # Contexto do jogo no snapshot atual
+        context = game_contexts.get(game_id)
+        if context is None:
+            return jsonify({'error': 'Jogo não encontrado'}), 404
         
-        # Análise de props usando estratégia Holzhauer
-        props = []
-        for player in game_data.get('players', []):
-            player_props = holzhauer.analyze_player_props(
-                player_name=player['name'],
-                game_situation=game_data
-            )
-            
-            for prop in player_props:
-                if prop['value_rating'] >= 5:  # Apenas props com valor significativo
-                    props.append({
-                        'player': player['name'],
-                        'type': prop['type'],
-                        'line': prop['line'],
-                        'prediction': prop['prediction'],
-                        'confidence': prop['confidence'],
-                        'value_rating': prop['value_rating'],
-                        'analysis': prop['analysis']
-                    })
-        
-        # Ordena por value_rating
-        props.sort(key=lambda x: x['value_rating'], reverse=True)
+        # Props com valor pela distribuição de cada jogador, já ordenadas por value_rating
+        props = context.value_props()
         return jsonify(props)
         
     except Exception as e:
         logger.error(f"Erro ao obter props com valor: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found_error(error):
     return jsonify({'error': 'Recurso não encontrado'}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     logger.error(f"Erro interno do servidor: {error}")
     return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -647,7 +708,7 @@ def start_alert_system():
     """Inicia o sistema de alertas em uma thread separada"""
     alert_system.run()
 
-@app.route('/health')
+@bp.route('/health')
 def health_check():
     return jsonify({
         'status': 'healthy',
@@ -672,6 +733,10 @@ if __name__ == '__main__':
     # Iniciar monitoramento do sistema
     system_monitor.start()
     
+    # Processo único: o retreino roda aqui mesmo
+    if config.STATE_MODE != 'shared':
+        model_trainer.start()
+    
     # Iniciar servidor
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port) 
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=port) 
\ No newline at end of file
@@ -0,0 +1,152 @@
+import logging
+import numpy as np
+import pandas as pd
+from config import ODDS_HISTORY_FILE, RESULTS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Colunas que o backtest_signals(history, results) de uma estratégia deve
+# retornar. Uma estratégia que treina com os resultados só pode usar, em cada
+# linha, modelos treinados com partidas encerradas antes dela. Score > 0
+# significa que a estratégia apostaria naquele candidato; a coluna opcional
+# Volatility permite filtrar candidatos por volatilidade.
+SIGNAL_COLUMNS = ['Timestamp', 'Match', 'Side', 'Bookmaker', 'Odds', 'Probability', 'Score']
+
+def load_history(history_file=ODDS_HISTORY_FILE):
+    """Carrega o histórico de odds (formato do OddsCollector) em ordem temporal"""
+    history = pd.read_csv(history_file, parse_dates=['Timestamp'])
+    return history.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+def load_results(results_file=RESULTS_FILE):
+    """Carrega os resultados encerrados (Match, Home_Won)"""
+    return pd.read_csv(results_file)
+
+def kelly_fractions(odds, probability, kelly_fraction=1.0, max_stake=0.05):
+    """Fração da banca pelo critério de Kelly, limitada a max_stake (5% por padrão)"""
+    b = odds - 1
+    safe_b = np.where(b > 0, b, 1)
+    kelly = np.where(b > 0, (b * probability - (1 - probability)) / safe_b, 0)
+    return np.clip(kelly * kelly_fraction, 0, max_stake)
+
+def simulate(markets, odds, probability, score, won, closing_odds, volatility=None,
+             min_score=0.0, kelly_fraction=1.0, max_stake=0.05, max_volatility=None, bankroll=1000.0):
+    """Núcleo vetorizado do backtest sobre arrays de candidatos em ordem temporal
+
+    Aposta-se uma vez por mercado (partida, lado): no primeiro candidato com
+    score acima de min_score, stake de Kelly positiva e volatilidade até
+    max_volatility (se informada). Cada aposta é liquidada
+    antes da próxima ser dimensionada, então a banca evolui por produto
+    acumulado. Retorna as métricas, os índices das apostas e a curva da banca.
+    """
+    stake_fraction = kelly_fractions(odds, probability, kelly_fraction, max_stake)
+    mask = (score > min_score) & (stake_fraction > 0)
+    if max_volatility is not None and volatility is not None:
+        mask &= volatility <= max_volatility
+    eligible = np.flatnonzero(mask)
+    _, first = np.unique(markets[eligible], return_index=True)
+    bets = np.sort(eligible[first])
+
+    fraction = stake_fraction[bets]
+    returns = np.where(won[bets], odds[bets] - 1, -1.0)
+    curve = bankroll * np.cumprod(1 + fraction * returns)
+    path = np.concatenate([[bankroll], curve])
+    stakes = fraction * path[:-1]
+
+    staked = stakes.sum()
+    profit = path[-1] - bankroll
+    drawdown = 1 - path / np.maximum.accumulate(path)
+
+    metrics = {
+        'bets': int(len(bets)),
+        'staked': float(staked),
+        'profit': float(profit),
+        'roi': float(profit / staked) if staked > 0 else 0.0,
+        'final_bankroll': float(path[-1]),
+        'max_drawdown': float(drawdown.max()),
+        'hit_rate': float(won[bets].mean()) if len(bets) else 0.0,
+        'clv': float(np.mean(odds[bets] / closing_odds[bets] - 1)) if len(bets) else 0.0,
+        'avg_stake': float(fraction.mean()) if len(bets) else 0.0
+    }
+    return metrics, bets, curve
+
+class Backtester:
+    """Backtest walk-forward de estratégias sobre o histórico de odds
+
+    A estratégia gera, de uma vez, os candidatos de todos os snapshots usando
+    só informação disponível até cada snapshot (backtest_signals, que recebe
+    os resultados para treinos walk-forward); o backtester
+    junta os resultados encerrados, calcula as odds de fechamento e simula a
+    banca com Kelly no núcleo vetorizado `simulate`.
+    """
+
+    def __init__(self, history=None, results=None, bankroll=1000.0, kelly_fraction=1.0, max_stake=0.05):
+        self.history = history if history is not None else load_history()
+        self.results = results if results is not None else load_results()
+        self.bankroll = bankroll
+        self.kelly_fraction = kelly_fraction
+        self.max_stake = max_stake
+
+    def prepare(self, signals):
+        """Ordena os candidatos no tempo e monta os arrays do núcleo de simulação"""
+        # Partidas viram códigos inteiros uma única vez; só ficam as encerradas
+        match_codes, matches = pd.factorize(signals['Match'])
+        settled = self.results.drop_duplicates('Match', keep='last').set_index('Match')['Home_Won']
+        home_won = pd.Series(matches).map(settled).to_numpy()
+        keep = ~pd.isna(home_won[match_codes])
+        signals = signals[keep]
+        match_codes = match_codes[keep]
+
+        # Em cada snapshot, o melhor candidato vem primeiro
+        order = np.lexsort((-signals['Score'].to_numpy(dtype=float), signals['Timestamp'].to_numpy()))
+        signals = signals.iloc[order].reset_index(drop=True)
+        match_codes = match_codes[order]
+
+        side_codes, sides = pd.factorize(signals['Side'])
+        bookmaker_codes, bookmakers = pd.factorize(signals['Bookmaker'])
+        markets = match_codes * len(sides) + side_codes
+        odds = signals['Odds'].to_numpy(dtype=float)
+
+        # Odds de fechamento: última cotação da mesma casa para o mesmo mercado
+        closing_odds = pd.Series(odds).groupby(markets * len(bookmakers) + bookmaker_codes).transform('last')
+
+        won_home = home_won[match_codes].astype(int) == 1
+        arrays = {
+            'markets': markets,
+            'odds': odds,
+            'probability': signals['Probability'].to_numpy(dtype=float),
+            'score': signals['Score'].to_numpy(dtype=float),
+            'won': np.where(sides[side_codes] == 'home', won_home, ~won_home),
+            'closing_odds': closing_odds.to_numpy(dtype=float),
+            'volatility': (
+                signals['Volatility'].to_numpy(dtype=float)
+                if 'Volatility' in signals.columns else np.zeros(len(signals))
+            )
+        }
+        return signals, arrays
+
+    def run(self, strategy, min_score=0.0):
+        """Executa o backtest de uma estratégia e retorna métricas, apostas e curva da banca"""
+        try:
+            signals, arrays = self.prepare(strategy.backtest_signals(self.history, self.results))
+            metrics, bets, curve = simulate(
+                **arrays,
+                min_score=min_score,
+                kelly_fraction=self.kelly_fraction,
+                max_stake=self.max_stake,
+                bankroll=self.bankroll
+            )
+
+            placed = signals.iloc[bets][SIGNAL_COLUMNS].copy()
+            placed['Won'] = arrays['won'][bets]
+            placed['Closing_Odds'] = arrays['closing_odds'][bets]
+            placed['Bankroll'] = curve
+
+            logger.info(
+                f"Backtest {type(strategy).__name__}: {metrics['bets']} apostas, "
+                f"ROI {metrics['roi']:.2%}, drawdown {metrics['max_drawdown']:.2%}"
+            )
+            return {'metrics': metrics, 'bets': placed}
+
+        except Exception as e:
+            logger.error(f"Erro ao executar backtest: {e}")
+            return None
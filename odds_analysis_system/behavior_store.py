@@ -0,0 +1,257 @@
+import json
+import os
+import uuid
+import fcntl
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from config import BEHAVIOR_LOG_FILE, BEHAVIOR_SNAPSHOT_FILE, BEHAVIOR_SNAPSHOT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class BehaviorStore:
+    """Log de escrita antecipada (JSONL) e snapshots do PlayerBehaviorTracker
+
+    O arquivo de log é o armazenamento compartilhado: cada worker acrescenta
+    registros com uma única escrita em modo append e lê os registros novos a
+    partir da última posição aplicada, então todos enxergam o mesmo estado.
+
+    A cada `snapshot_interval` registros o estado vai para o snapshot
+    e o log é rotacionado: o segmento atual vira `<log>.1` e um novo começa
+    vazio. Cada segmento abre com um cabeçalho de id único, e a posição de
+    leitura é (segmento, offset); um worker que ficou um segmento para trás
+    termina de ler o `.1` antes de passar ao novo, e um que ficou mais para
+    trás recarrega o snapshot.
+    """
+
+    def __init__(self, log_file=BEHAVIOR_LOG_FILE, snapshot_file=BEHAVIOR_SNAPSHOT_FILE,
+                 snapshot_interval=BEHAVIOR_SNAPSHOT_INTERVAL):
+        self.log_file = log_file
+        self.rotated_file = f"{log_file}.1"
+        self.lock_file = f"{log_file}.lock"
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self.segment = None  # Id do segmento de log sendo lido
+        self.offset = 0  # Posição no segmento até onde os registros já foram aplicados
+        self.segment_records = 0  # Registros lidos do segmento atual
+        self.snapshot_rotated = None  # Segmento em `.1` quando o snapshot foi salvo (já incluído nele)
+
+    def append(self, record):
+        """Acrescenta um registro ao log
+
+        Sem fsync por registro: a escrita chega ao cache do sistema, o que
+        sobrevive à queda do processo; o snapshot é gravado com fsync.
+        """
+        line = (json.dumps(record, default=self._serialize, ensure_ascii=False) + '\n').encode('utf-8')
+
+        # A trava compartilhada só impede a rotação no meio da escrita
+        with self._locked(fcntl.LOCK_SH):
+            self._ensure_segment()
+            # Uma única escrita com O_APPEND não se intercala com a de outros processos
+            fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def read_new_records(self):
+        """Lê os registros acrescentados desde a última posição
+
+        Retorna None se a posição se perdeu (o log foi rotacionado mais de uma
+        vez desde a última leitura); nesse caso o estado deve ser recarregado
+        do snapshot.
+        """
+        try:
+            with self._locked(fcntl.LOCK_SH):
+                return self._read_new_records()
+
+        except Exception as e:
+            logger.error(f"Erro ao ler log de comportamento: {e}")
+            return []
+
+    def replay_log(self):
+        """Relê do começo o segmento anterior (`.1`) e o atual
+
+        Usado quando o segmento do snapshot não existe mais: os segmentos que
+        sobraram foram criados depois dele, exceto o `.1` já incluído no
+        snapshot. A leitura continua do fim do log atual.
+        """
+        try:
+            with self._locked(fcntl.LOCK_SH):
+                records = []
+                if os.path.exists(self.rotated_file) and self._segment_id(self.rotated_file) != self.snapshot_rotated:
+                    self.offset = 0
+                    records = self._read_segment(self.rotated_file)
+                self.segment, self.offset, self.segment_records = None, 0, 0
+                return records + self._read_new_records()
+
+        except Exception as e:
+            logger.error(f"Erro ao reler log de comportamento: {e}")
+            return []
+
+    def compact(self, apply_record, build_state):
+        """Aplica os registros pendentes, salva o snapshot completo e rotaciona o log
+
+        `apply_record` recebe cada registro pendente e `build_state` monta o
+        estado a gravar. Retorna False se a posição se perdeu antes da
+        compactação.
+        """
+        try:
+            with self._locked(fcntl.LOCK_EX):
+                records = self._read_new_records()
+                if records is None:
+                    return False
+                for record in records:
+                    apply_record(record)
+
+                # Outro worker pode ter compactado enquanto este esperava a trava
+                if self.segment_records < self.snapshot_interval:
+                    return True
+
+                self._rotate()
+                self.save_snapshot(build_state())
+                return True
+
+        except Exception as e:
+            logger.error(f"Erro ao compactar log de comportamento: {e}")
+            return True
+
+    def load_snapshot(self):
+        """Carrega o último snapshot salvo e posiciona a leitura do log logo depois dele"""
+        try:
+            with self._locked(fcntl.LOCK_SH):
+                self.segment, self.offset, self.segment_records = None, 0, 0
+                self.snapshot_rotated = None
+                if not os.path.exists(self.snapshot_file):
+                    return None
+
+                with open(self.snapshot_file, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+
+                if 'segment' not in snapshot:
+                    return None  # Snapshot antigo, só com estados emocionais: replay completo do log
+
+                self.segment = snapshot['segment']
+                self.offset = snapshot['offset']
+                self.snapshot_rotated = snapshot.get('rotated')
+                return snapshot
+
+        except Exception as e:
+            logger.error(f"Erro ao carregar snapshot de comportamento: {e}")
+            return None
+
+    def save_snapshot(self, state):
+        """Salva um snapshot do estado junto com a posição do log já aplicada"""
+        try:
+            snapshot = {
+                'segment': self.segment,
+                'offset': self.offset,
+                'rotated': self._segment_id(self.rotated_file) if os.path.exists(self.rotated_file) else None,
+                'created_at': datetime.now(),
+                **state
+            }
+
+            # Escreve em arquivo temporário e troca de forma atômica
+            tmp_file = f"{self.snapshot_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, default=self._serialize, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+        except Exception as e:
+            logger.error(f"Erro ao salvar snapshot de comportamento: {e}")
+
+    def _read_new_records(self):
+        """Lê os registros novos; exige a trava do log"""
+        if not os.path.exists(self.log_file):
+            return []
+
+        current = self._segment_id(self.log_file)
+        records = []
+
+        if self.segment != current:
+            if self.segment is not None:
+                # O log foi rotacionado: termina de ler o segmento anterior
+                if not os.path.exists(self.rotated_file) or self._segment_id(self.rotated_file) != self.segment:
+                    logger.warning("Posição no log de comportamento perdida, recarregando o snapshot")
+                    return None
+                records = self._read_segment(self.rotated_file)
+
+            self.segment, self.offset, self.segment_records = current, 0, 0
+
+        return records + self._read_segment(self.log_file)
+
+    def _read_segment(self, path):
+        """Lê as linhas completas do segmento a partir do offset atual"""
+        with open(path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # Considera apenas linhas completas; o restante é lido na próxima vez
+        complete = data.rfind(b'\n') + 1
+        self.offset += complete
+
+        records = []
+        for line in data[:complete].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('type') != 'segment':
+                records.append(record)
+        self.segment_records += len(records)
+        return records
+
+    def _segment_id(self, path):
+        """Id do segmento, lido do cabeçalho do arquivo"""
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline() or b'{}')
+        return header.get('id') if header.get('type') == 'segment' else None
+
+    def _ensure_segment(self):
+        """Cria o primeiro segmento do log, se ainda não existir"""
+        if not os.path.exists(self.log_file):
+            self._write_segment(replace=False)
+
+    def _rotate(self):
+        """Move o segmento atual para `.1` e começa um novo; exige a trava exclusiva"""
+        os.replace(self.log_file, self.rotated_file)
+        self.segment = self._write_segment()
+        self.offset = os.path.getsize(self.log_file)
+        self.segment_records = 0
+
+    def _write_segment(self, replace=True):
+        """Cria um segmento vazio com cabeçalho e o coloca no lugar do log"""
+        segment = uuid.uuid4().hex
+        tmp_file = f"{self.log_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'segment', 'id': segment}) + '\n')
+
+        if replace:
+            os.replace(tmp_file, self.log_file)
+            return segment
+
+        # Primeiro segmento: o link falha se outro worker já criou o log
+        try:
+            os.link(tmp_file, self.log_file)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_file)
+        return segment
+
+    @contextmanager
+    def _locked(self, mode):
+        """Trava do log entre processos (compartilhada para ler e escrever, exclusiva para rotacionar)"""
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _serialize(self, value):
+        """Serializa valores não suportados pelo JSON"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Tipo não serializável: {type(value).__name__}")
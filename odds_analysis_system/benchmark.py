@@ -0,0 +1,975 @@
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def bench_behavior_replay(observations=10000, players=30):
+    """Mede o tempo de recuperação do estado (snapshot mais o log que o segue) após uma noite de jogos"""
+    from behavior_store import BehaviorStore
+    from player_behavior_tracker import PlayerBehaviorTracker
+
+    event_types = ['frustração', 'celebração', 'jogada_decisiva', 'erro_crucial',
+                   'clutch_moment', 'foco_intenso', 'hesitação', 'gestos_confiança']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def new_store():
+            return BehaviorStore(
+                log_file=os.path.join(tmp_dir, 'behavior_log.jsonl'),
+                snapshot_file=os.path.join(tmp_dir, 'behavior_snapshot.json')
+            )
+
+        tracker = PlayerBehaviorTracker(store=new_store())
+        start_time = datetime.now() - timedelta(hours=4)
+        for i in range(observations):
+            tracker.register_observation(
+                player_name=f"Jogador {i % players}",
+                timestamp=start_time + timedelta(seconds=i),
+                observation_type=random.choice(event_types),
+                details=''
+            )
+
+        start = time.perf_counter()
+        recovered = PlayerBehaviorTracker(store=new_store())
+        recovered.sync()
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"Recuperação de {len(recovered.behavior_log)} observações: {elapsed:.3f}s")
+
+def bench_startup(top=10):
+    """Perfil de importação do app.py, cold start e tempo até a primeira resposta"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Perfil de importação: módulos importados diretamente pelo app, por tempo acumulado
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=base_dir, capture_output=True, text=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if name.startswith('    ') or not name.startswith('   '):
+            continue  # Só os imports de primeiro nível feitos pelo app
+        imports.append((int(cumulative), name.strip()))
+
+    for cumulative, name in sorted(imports, reverse=True)[:top]:
+        logger.info(f"import {name}: {cumulative / 1000:.1f}ms")
+
+    # Cold start em processo novo: import + create_app + primeira requisição
+    script = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "import app\n"
+        "imported = time.perf_counter()\n"
+        "flask_app = app.create_app()\n"
+        "created = time.perf_counter()\n"
+        "flask_app.test_client().get('/health')\n"
+        "responded = time.perf_counter()\n"
+        "print(json.dumps([imported - start, created - imported, responded - created]))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=base_dir, capture_output=True, text=True)
+    import_time, factory_time, first_response = json.loads(result.stdout.strip().splitlines()[-1])
+
+    logger.info(f"Import do app: {import_time:.3f}s")
+    logger.info(f"create_app(): {factory_time:.3f}s")
+    logger.info(f"Primeira resposta (/health): {first_response:.3f}s")
+    logger.info(f"Cold start até a primeira resposta: {import_time + factory_time + first_response:.3f}s")
+
+def _sample_odds(matches, bookmakers=3, seed=42):
+    """Gera um snapshot de odds sintético no formato do OddsCollector"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    base_home = np.repeat(rng.uniform(1.5, 3.0, matches), bookmakers)
+    base_away = np.repeat(rng.uniform(1.5, 3.0, matches), bookmakers)
+    match_ids = np.repeat(np.arange(matches), bookmakers)
+
+    return pd.DataFrame({
+        'Match': [f"Time {i} vs Time {i + matches}" for i in match_ids],
+        'League': 'NBA',
+        'Home_Team': [f"Time {i}" for i in match_ids],
+        'Away_Team': [f"Time {i + matches}" for i in match_ids],
+        'Bookmaker': [f"Casa {j}" for j in np.tile(np.arange(bookmakers), matches)],
+        'Home_Odds': np.round(base_home + rng.uniform(-0.1, 0.1, len(match_ids)), 2),
+        'Away_Odds': np.round(base_away + rng.uniform(-0.1, 0.1, len(match_ids)), 2),
+        'Timestamp': datetime.now()
+    })
+
+def _fitted_strategy(samples=2000, seed=42):
+    """Retorna uma HolzhauerStrategy com modelo e scaler treinados em dados sintéticos"""
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    from holzhauer_strategy import HolzhauerStrategy
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(samples, 5))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=samples) > 0).astype(int)
+
+    strategy = HolzhauerStrategy()
+    strategy.scaler = StandardScaler().fit(X)
+    strategy.model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=seed)
+    strategy.model.fit(strategy.scaler.transform(X), y)
+    return strategy
+
+def bench_batch_inference(sizes=(10, 100, 10000), max_loop=100):
+    """Compara o custo por partida da inferência individual e em lote"""
+    strategy = _fitted_strategy()
+
+    for size in sizes:
+        odds_data = _sample_odds(size)
+
+        start = time.perf_counter()
+        strategy.analyze_opportunities(odds_data)
+        batch_time = time.perf_counter() - start
+        logger.info(f"{size} partidas em lote: {batch_time:.3f}s ({batch_time / size * 1000:.2f}ms/partida)")
+
+        if size <= max_loop:
+            start = time.perf_counter()
+            for _, match_data in odds_data.groupby('Match', sort=False):
+                strategy.analyze_opportunity(match_data)
+            loop_time = time.perf_counter() - start
+            logger.info(f"{size} partidas uma a uma: {loop_time:.3f}s ({loop_time / size * 1000:.2f}ms/partida)")
+
+def bench_feature_extraction(sizes=(100, 1000, 10000), max_loop=100):
+    """Compara a extração de features por partida, colunar e pelo feature store"""
+    from holzhauer_strategy import HolzhauerStrategy
+
+    strategy = HolzhauerStrategy()
+
+    for size in sizes:
+        odds_data = _sample_odds(size)
+
+        start = time.perf_counter()
+        strategy._get_feature_frame(odds_data, snapshot_version=size)
+        columnar_time = time.perf_counter() - start
+        logger.info(f"{size} partidas colunar: {columnar_time:.3f}s ({columnar_time / size * 1000:.3f}ms/partida)")
+
+        start = time.perf_counter()
+        strategy._get_feature_frame(odds_data, snapshot_version=size)
+        cached_time = time.perf_counter() - start
+        logger.info(f"{size} partidas do feature store: {cached_time * 1000:.3f}ms")
+
+        if size <= max_loop:
+            start = time.perf_counter()
+            for _, match_data in odds_data.groupby('Match', sort=False):
+                strategy._build_feature_frame(match_data)
+            loop_time = time.perf_counter() - start
+            logger.info(f"{size} partidas uma a uma: {loop_time:.3f}s ({loop_time / size * 1000:.3f}ms/partida)")
+
+def bench_compiled_model(batch_size=10000, repeats=100):
+    """Paridade e latência do modelo exportado em arrays contra o sklearn"""
+    import joblib
+    import numpy as np
+    from compiled_forest import CompiledForest
+
+    strategy = _fitted_strategy()
+    forest = strategy.model
+    compiled = CompiledForest.from_sklearn(forest)
+
+    X = np.random.default_rng(7).normal(size=(batch_size, 5))
+    difference = np.abs(compiled.predict_proba(X) - forest.predict_proba(X)).max()
+    agreement = (compiled.predict(X) == forest.predict(X)).mean()
+    logger.info(f"Paridade com o sklearn: diferença máxima {difference:.2e}, predições iguais {agreement:.2%}")
+    assert difference < 1e-9, "Modelo exportado diverge do sklearn"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        joblib_file = os.path.join(tmp_dir, 'model.joblib')
+        compiled_file = os.path.join(tmp_dir, 'model.npz')
+        joblib.dump(forest, joblib_file)
+        compiled.save(compiled_file)
+
+        start = time.perf_counter()
+        joblib.load(joblib_file)
+        logger.info(f"Carga joblib: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        start = time.perf_counter()
+        CompiledForest.load(compiled_file)
+        logger.info(f"Carga exportado: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for name, model in (('sklearn', forest), ('exportado', compiled)):
+        for size in (1, 100, batch_size):
+            runs = max(1, repeats * 100 // max(size, 100)) if size < batch_size else 1
+            start = time.perf_counter()
+            for i in range(runs):
+                model.predict_proba(X[i:i + size])
+            elapsed = (time.perf_counter() - start) / runs
+            logger.info(f"{name}: lote de {size} em {elapsed * 1000:.2f}ms")
+
+def _sample_history(matches=100, snapshots=60, bookmakers=3, seed=42):
+    """Gera um histórico de odds minuto a minuto e os resultados das partidas"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    home_prob = rng.uniform(0.3, 0.7, matches)
+
+    # Odds justas com passeio aleatório no tempo, ruído por casa e margem de 2.5%
+    drift = rng.normal(0, 0.005, (matches, snapshots)).cumsum(axis=1)[:, :, None]
+    shape = (matches, snapshots, bookmakers)
+    home_odds = (1 / home_prob)[:, None, None] * np.exp(drift + rng.normal(0, 0.02, shape)) / 1.025
+    away_odds = (1 / (1 - home_prob))[:, None, None] * np.exp(-drift + rng.normal(0, 0.02, shape)) / 1.025
+
+    match_ids = np.repeat(np.arange(matches), snapshots * bookmakers)
+    minutes = np.tile(np.repeat(np.arange(snapshots), bookmakers), matches) + match_ids * 30
+    names = np.array([f"Time {i} vs Time {i + matches}" for i in range(matches)], dtype=object)
+
+    history = pd.DataFrame({
+        'Timestamp': pd.Timestamp('2024-10-22') + pd.to_timedelta(minutes, unit='m'),
+        'Match': names[match_ids],
+        'Bookmaker': np.array([f"Casa {j}" for j in range(bookmakers)], dtype=object)[np.tile(np.arange(bookmakers), matches * snapshots)],
+        'Home_Odds': np.round(home_odds.ravel(), 2),
+        'Away_Odds': np.round(away_odds.ravel(), 2)
+    }).sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+    results = pd.DataFrame({'Match': names, 'Home_Won': (rng.random(matches) < home_prob).astype(int)})
+    return history, results
+
+def bench_backtest(matches=1230, snapshots=600, bookmakers=3):
+    """Backtest de uma temporada de odds minuto a minuto (OddsAnalyzer) e de uma amostra (Holzhauer)"""
+    from backtester import Backtester
+    from holzhauer_strategy import HolzhauerStrategy
+    from odds_analyzer import OddsAnalyzer
+
+    history, results = _sample_history(matches, snapshots, bookmakers)
+    backtester = Backtester(history, results)
+
+    start = time.perf_counter()
+    report = backtester.run(OddsAnalyzer())
+    elapsed = time.perf_counter() - start
+    logger.info(f"OddsAnalyzer em {len(history)} linhas de histórico: {elapsed:.2f}s")
+    logger.info(f"Métricas: {report['metrics']}")
+
+    # Holzhauer treina um modelo por janela walk-forward; amostra menor
+    history, results = _sample_history(200, 60, bookmakers)
+    strategy = HolzhauerStrategy()
+    strategy.min_confidence = 0.5
+
+    start = time.perf_counter()
+    report = Backtester(history, results).run(strategy)
+    elapsed = time.perf_counter() - start
+    logger.info(f"HolzhauerStrategy em {len(history)} linhas de histórico: {elapsed:.2f}s")
+    logger.info(f"Métricas: {report['metrics']}")
+
+def bench_parameter_sweep(samples=100, matches=1230, snapshots=600):
+    """Busca aleatória de thresholds sobre uma temporada, serial e com pool de processos"""
+    from backtester import Backtester
+    from odds_analyzer import OddsAnalyzer
+    from parameter_sweep import ParameterSweep
+
+    history, results = _sample_history(matches, snapshots)
+    backtester = Backtester(history, results)
+
+    for workers in sorted({1, os.cpu_count()}):
+        sweep = ParameterSweep(backtester, OddsAnalyzer(), workers=workers)
+        param_sets = sweep.random(samples, seed=42, min_score=(-2.0, 6.0), kelly_fraction=(0.1, 1.0), max_stake=(0.01, 0.1))
+
+        start = time.perf_counter()
+        table = sweep.run(param_sets)
+        elapsed = time.perf_counter() - start
+        logger.info(f"{samples} combinações com {workers} processo(s): {elapsed:.2f}s")
+
+    logger.info("Melhores combinações:\n" + table.head(5).to_string(index=False))
+
+def bench_market_consensus(markets=5000, bookmakers=40, snapshots=20):
+    """Consenso ponderado por tick e atualização de pesos com milhares de mercados e dezenas de casas"""
+    from market_consensus import MarketConsensus
+
+    history, _ = _sample_history(markets, snapshots, bookmakers)
+    last_tick = history[history['Timestamp'] == history.groupby('Match')['Timestamp'].transform('max')]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        consensus = MarketConsensus(weights_file=os.path.join(tmp_dir, 'weights.json'))
+
+        start = time.perf_counter()
+        consensus.update_weights(history)
+        logger.info(f"Pesos a partir de {len(history)} cotações: {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        result = consensus.compute(last_tick)
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Consenso de {markets} mercados x {bookmakers} casas: {elapsed * 1000:.1f}ms, "
+            f"{len(result['outliers'])} cotações fora do consenso"
+        )
+
+def bench_steam_detection(markets=500, bookmakers=20, ticks=50):
+    """Latência do detector de steam por tick da coleta"""
+    import numpy as np
+    import pandas as pd
+    from alerts import AlertSystem
+    from steam_detector import SteamDetector
+
+    # Todos os mercados cotados a cada tick (um tick por minuto)
+    history, _ = _sample_history(markets, ticks, bookmakers)
+    tick_index = history.groupby('Match').cumcount() // bookmakers
+    history['Timestamp'] = pd.Timestamp('2024-10-22') + pd.to_timedelta(tick_index, unit='m')
+    detector = SteamDetector(AlertSystem())
+
+    timings = []
+    for _, tick in history.groupby('Timestamp', sort=True):
+        start = time.perf_counter()
+        detector.on_snapshot(tick)
+        timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings[1:])
+    logger.info(
+        f"{markets} mercados x {bookmakers} casas: {np.median(timings) * 1000:.1f}ms por tick "
+        f"(p99 {np.percentile(timings, 99) * 1000:.1f}ms), {detector.alert_system.alert_queue.qsize()} alertas"
+    )
+
+def bench_best_price_index(markets=1000, bookmakers=30, ticks=50, changes=50):
+    """Atualização incremental do índice de melhores preços contra o recálculo com groupby"""
+    import numpy as np
+    import pandas as pd
+    from best_price_index import BestPriceIndex
+
+    rng = np.random.default_rng(0)
+    odds = pd.DataFrame({
+        'Match': np.repeat([f"Team {i} vs Team {i + markets}" for i in range(markets)], bookmakers),
+        'Bookmaker': np.tile([f"Book {j}" for j in range(bookmakers)], markets),
+        'Home_Odds': rng.uniform(1.5, 3.0, markets * bookmakers).round(2),
+        'Away_Odds': rng.uniform(1.5, 3.0, markets * bookmakers).round(2)
+    })
+    index = BestPriceIndex()
+    index.on_snapshot(odds, 0)
+
+    update_times, recompute_times = [], []
+    for version in range(1, ticks + 1):
+        # Poucas cotações mudam a cada tick
+        rows = rng.choice(len(odds), changes, replace=False)
+        odds.loc[rows, 'Home_Odds'] = (odds.loc[rows, 'Home_Odds'] * rng.uniform(0.97, 1.03, changes)).round(2)
+
+        start = time.perf_counter()
+        index.on_snapshot(odds, version)
+        update_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        recomputed = odds.groupby('Match')[['Home_Odds', 'Away_Odds']].max()
+        recompute_times.append(time.perf_counter() - start)
+
+    matches = odds['Match'].unique()
+    start = time.perf_counter()
+    for match in matches:
+        index.best(match, 'home')
+    lookup = (time.perf_counter() - start) / len(matches)
+
+    parity = all(index.best(match, 'home')[0] == recomputed.at[match, 'Home_Odds'] for match in matches)
+    logger.info(
+        f"{markets} mercados x {bookmakers} casas, {changes} mudanças por tick: "
+        f"índice {np.median(update_times) * 1000:.1f}ms por tick, groupby {np.median(recompute_times) * 1000:.1f}ms; "
+        f"consulta {lookup * 1e6:.2f}us; mesmos melhores preços: {parity}"
+    )
+
+def bench_player_stats_repository(players=300, games=80, lookups=100):
+    """Consulta de jogador no repositório em memória contra reler o CSV a cada chamada"""
+    import numpy as np
+    import pandas as pd
+    from player_stats_repository import PlayerStatsRepository
+
+    rng = np.random.default_rng(0)
+    rows = players * games
+    stats = pd.DataFrame({
+        'player_name': np.repeat([f"Player {i}" for i in range(players)], games),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=games).strftime('%Y-%m-%d'), players),
+        'is_home': rng.integers(0, 2, rows).astype(bool),
+        'points': rng.poisson(20, rows),
+        'result': rng.choice(['win', 'loss'], rows)
+    })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats_file = os.path.join(tmp_dir, 'player_stats.csv')
+        stats.to_csv(stats_file, index=False)
+        names = rng.choice(stats['player_name'].unique(), lookups)
+
+        start = time.perf_counter()
+        for name in names:
+            df = pd.read_csv(stats_file)
+            df[df['player_name'] == name].sort_values('game_date').tail(10)
+        reread = (time.perf_counter() - start) / lookups
+
+        repository = PlayerStatsRepository(stats_file)
+        start = time.perf_counter()
+        repository.refresh()
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names:
+            repository.recent(name, 10)
+        lookup = (time.perf_counter() - start) / lookups
+
+        logger.info(
+            f"{rows} linhas, {players} jogadores: reler CSV {reread * 1000:.1f}ms por consulta; "
+            f"repositório carga {load * 1000:.1f}ms, consulta {lookup * 1000:.3f}ms"
+        )
+
+def bench_value_props(props=5000, players=300, games=40):
+    """Avaliação de props agrupada por jogador contra a avaliação prop a prop"""
+    import numpy as np
+    import pandas as pd
+    from player_stats import PlayerStatsAnalyzer
+    from player_stats_repository import PlayerStatsRepository
+
+    rng = np.random.default_rng(0)
+    names = [f"Player {i}" for i in range(players)]
+    rows = players * games
+    stats = pd.DataFrame({
+        'player_name': np.repeat(names, games),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=games).strftime('%Y-%m-%d'), players),
+        'is_home': rng.integers(0, 2, rows).astype(bool),
+        'points': rng.poisson(20, rows),
+        'rebounds': rng.poisson(6, rows),
+        'assists': rng.poisson(5, rows),
+        'result': rng.choice(['win', 'loss'], rows)
+    })
+    stat_types = rng.choice(['points', 'rebounds', 'assists'], props)
+    props_df = pd.DataFrame({
+        'player_name': rng.choice(names, props),
+        'stat_type': stat_types,
+        'line': np.select([stat_types == 'points', stat_types == 'rebounds'], [19.5, 5.5], 4.5),
+        'odds': rng.uniform(1.7, 2.1, props).round(2)
+    })
+
+    def prime_opportunities(player_stats, current_game_stats):
+        # Uma oportunidade por estatística, com a média recente como valor esperado
+        recent = player_stats.tail(10)
+        return [
+            {'stat_type': stat_type, 'confidence': 0.8, 'expected_value': recent[stat_type].mean(), 'recommendation': 'aggressive'}
+            for stat_type in ('points', 'rebounds', 'assists')
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = PlayerStatsAnalyzer()
+        analyzer.repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'))
+        analyzer.props_file = os.path.join(tmp_dir, 'player_props.csv')
+        stats.to_csv(analyzer.repository.stats_file, index=False)
+        props_df.to_csv(analyzer.props_file, index=False)
+        analyzer.repository.refresh()
+
+        # Caminho real: find_prime_opportunities ainda é um stub que retorna [], então só os perfis são montados
+        start = time.perf_counter()
+        real_props = analyzer.find_value_props(None)
+        real_time = time.perf_counter() - start
+
+        # Daqui em diante com oportunidades sintéticas, para medir a avaliação das props
+        analyzer.holzhauer.find_prime_opportunities = prime_opportunities
+
+        # Prop a prop: perfil e oportunidades recalculados para cada prop
+        start = time.perf_counter()
+        for prop in props_df.itertuples():
+            analyzer.analyze_player_trends(prop.player_name, prop.stat_type)
+            prime_opportunities(analyzer.repository.player(prop.player_name), {})
+        per_prop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        value_props = analyzer.find_value_props(None)
+        grouped = time.perf_counter() - start
+
+    logger.info(f"{props} props, {players} jogadores, caminho real (stub de oportunidades): {real_time:.2f}s para {len(real_props)} props")
+    logger.info(
+        f"{props} props, {players} jogadores: prop a prop {per_prop:.2f}s (só perfil e oportunidades), "
+        f"agrupado por jogador {grouped:.2f}s para {len(value_props)} props avaliadas"
+    )
+
+def bench_rolling_aggregates(players=300, games=80, reads=1000):
+    """Ingestão de uma rodada com atualização dos agregados e leitura das tendências"""
+    import numpy as np
+    import pandas as pd
+    from player_stats import PlayerStatsAnalyzer
+    from player_stats_repository import PlayerStatsRepository
+
+    rng = np.random.default_rng(0)
+    names = [f"Player {i}" for i in range(players)]
+    dates = pd.date_range('2024-10-22', periods=games + 1).strftime('%Y-%m-%d')
+
+    def game_rows(player_names, game_dates):
+        rows = len(player_names)
+        quarters = rng.poisson(5, (rows, 4))
+        return pd.DataFrame({
+            'player_name': player_names,
+            'game_date': game_dates,
+            'is_home': rng.integers(0, 2, rows).astype(bool),
+            'points': quarters.sum(axis=1),
+            'rebounds': rng.poisson(6, rows),
+            'assists': rng.poisson(5, rows),
+            **{f'quarter_{quarter}_pts': quarters[:, quarter - 1] for quarter in range(1, 5)},
+            'result': rng.choice(['win', 'loss'], rows)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = PlayerStatsAnalyzer()
+        analyzer.repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'))
+        game_rows(np.repeat(names, games), np.tile(dates[:-1], players)).to_csv(analyzer.repository.stats_file, index=False)
+
+        start = time.perf_counter()
+        analyzer.repository.refresh()
+        load = time.perf_counter() - start
+
+        # Uma rodada: um jogo novo para um terço dos jogadores
+        playing = names[::3]
+        start = time.perf_counter()
+        analyzer.update_player_stats(game_rows(playing, dates[-1]).to_dict('records'))
+        ingest = time.perf_counter() - start
+
+        sample = rng.choice(names, reads)
+        start = time.perf_counter()
+        for name in sample:
+            analyzer.analyze_player_trends(name, 'points')
+        read = (time.perf_counter() - start) / reads
+
+    logger.info(
+        f"{players} jogadores x {games} jogos: carga com agregados {load * 1000:.0f}ms; "
+        f"rodada de {len(playing)} jogos {ingest * 1000:.0f}ms; leitura de tendência {read * 1000:.2f}ms"
+    )
+
+def bench_stats_ingest(players=450, games=82, days=165):
+    """Backfill de uma temporada rodada a rodada: ingestão por chave contra reescrever o CSV"""
+    import numpy as np
+    import pandas as pd
+    from player_stats_repository import PlayerStatsRepository
+
+    rng = np.random.default_rng(0)
+    rows = players * games
+    quarters = rng.poisson(5, (rows, 4))
+    season = pd.DataFrame({
+        'player_name': np.repeat([f"Player {i}" for i in range(players)], games),
+        'game_date': pd.to_datetime('2024-10-22') + pd.to_timedelta(rng.integers(0, days, rows), unit='D'),
+        'is_home': rng.integers(0, 2, rows).astype(bool),
+        'points': quarters.sum(axis=1),
+        'rebounds': rng.poisson(6, rows),
+        'assists': rng.poisson(5, rows),
+        'minutes': rng.integers(10, 40, rows),
+        **{f'quarter_{quarter}_pts': quarters[:, quarter - 1] for quarter in range(1, 5)},
+        'result': rng.choice(['win', 'loss'], rows)
+    })
+    season['game_date'] = season['game_date'].dt.strftime('%Y-%m-%d')
+    season = season.drop_duplicates(subset=['player_name', 'game_date'])
+    batches = [batch.to_dict('records') for _, batch in season.groupby('game_date')]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Antes: lê o CSV inteiro, concatena, remove duplicadas e reescreve a cada rodada
+        stats_file = os.path.join(tmp_dir, 'rewrite.csv')
+        start = time.perf_counter()
+        for batch in batches:
+            current = pd.read_csv(stats_file) if os.path.exists(stats_file) else pd.DataFrame()
+            pd.concat([current, pd.DataFrame(batch)]).drop_duplicates().to_csv(stats_file, index=False)
+        rewrite = time.perf_counter() - start
+
+        repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'), os.path.join(tmp_dir, 'index.json'))
+        start = time.perf_counter()
+        for batch in batches:
+            repository.append(batch)
+        keyed = time.perf_counter() - start
+
+        # Reenvio da temporada inteira e um lote de correções
+        start = time.perf_counter()
+        repeated = repository.append(season.to_dict('records'))
+        repeat = time.perf_counter() - start
+
+        corrections = season.sample(500, random_state=0).assign(points=lambda df: df['points'] + 1)
+        start = time.perf_counter()
+        corrected = repository.append(corrections.to_dict('records'))
+        correct = time.perf_counter() - start
+
+        reader = PlayerStatsRepository(repository.stats_file, repository.index_file)
+        parity = len(reader.all()) == len(season)
+
+    logger.info(
+        f"{len(season)} linhas em {len(batches)} rodadas: reescrita {rewrite:.1f}s "
+        f"({len(season) / rewrite:.0f} linhas/s), por chave {keyed:.1f}s ({len(season) / keyed:.0f} linhas/s); "
+        f"reenvio da temporada {repeat:.2f}s {repeated}; correções {correct:.2f}s {corrected}; "
+        f"linhas únicas na leitura: {parity}"
+    )
+
+def bench_prop_model(players=300, games=40, props=5000):
+    """Probabilidade das props pela distribuição do jogador contra a heurística linear"""
+    import numpy as np
+    import pandas as pd
+    from player_stats_repository import PlayerStatsRepository
+    from prop_model import PropProbabilityModel
+
+    # Pontos com binomial negativa de média e dispersão diferentes por jogador
+    rng = np.random.default_rng(0)
+    names = np.array([f"Player {i}" for i in range(players)])
+    true_mean = rng.uniform(6, 30, players)
+    true_size = rng.uniform(3, 15, players)
+    points = rng.negative_binomial(true_size[:, None], true_size[:, None] / (true_size[:, None] + true_mean[:, None]), (players, games))
+    stats = pd.DataFrame({
+        'player_name': np.repeat(names, games),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=games).strftime('%Y-%m-%d'), players),
+        'is_home': rng.integers(0, 2, players * games).astype(bool),
+        'points': points.ravel()
+    })
+
+    # Props com linhas perto da média recente e o resultado do jogo seguinte
+    player_index = rng.integers(0, players, props)
+    recent = points[:, -20:].mean(axis=1)
+    lines = np.round(recent[player_index] + rng.normal(0, 3, props)).clip(0.5) + 0.5
+    outcome = rng.negative_binomial(true_size[player_index], true_size[player_index] / (true_size[player_index] + true_mean[player_index]))
+    props_df = pd.DataFrame({'player_name': names[player_index], 'stat_type': 'points', 'line': lines, 'odds': 1.9})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'), os.path.join(tmp_dir, 'index.json'))
+        stats.to_csv(repository.stats_file, index=False)
+        repository.refresh()
+        model = PropProbabilityModel(repository)
+
+        start = time.perf_counter()
+        scored = model.score(props_df)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model.score(props_df)
+        warm = time.perf_counter() - start
+
+    won = (outcome > lines).astype(float)
+    linear = np.clip(0.5 + (recent[player_index] - lines) / (2 * lines), 0.01, 0.99)
+    brier_model = np.mean((scored['prob_over'].to_numpy() - won) ** 2)
+    brier_linear = np.mean((linear - won) ** 2)
+    logger.info(
+        f"{props} props, {players} jogadores: {cold * 1000:.0f}ms com ajuste, {warm * 1000:.0f}ms com cache; "
+        f"Brier distribuição {brier_model:.4f} vs heurística linear {brier_linear:.4f}"
+    )
+
+def bench_quarter_simulation(players=10, games=30, sims=10000, trials=200):
+    """Monte Carlo dos quarters restantes: latência do jogo inteiro e cobertura dos quantis"""
+    import numpy as np
+    import pandas as pd
+    from player_stats_repository import PlayerStatsRepository
+    from quarter_simulator import QuarterSimulator
+
+    # Pontos por quarter com binomial negativa de média diferente por jogador e quarter
+    rng = np.random.default_rng(0)
+    names = [f"Player {i}" for i in range(players)]
+    true_mean = rng.uniform(2, 9, (players, 4))
+    size = 4.0
+    draw = lambda shape: rng.negative_binomial(size, size / (size + true_mean[:, None, :]), (players, shape, 4))
+    history = draw(games)
+    stats = pd.DataFrame({
+        'player_name': np.repeat(names, games),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=games).strftime('%Y-%m-%d'), players),
+        'is_home': True,
+        **{f'quarter_{q + 1}_pts': history[:, :, q].ravel() for q in range(4)}
+    })
+    stats['points'] = history.sum(axis=2).ravel()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'), os.path.join(tmp_dir, 'index.json'))
+        stats.to_csv(repository.stats_file, index=False)
+        repository.refresh()
+        simulator = QuarterSimulator(repository, sims=sims, seed=0)
+        simulator.simulate(names)  # Aquece os caches da liga
+
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            simulator.simulate(names, current_quarter=0)
+            timings.append(time.perf_counter() - start)
+
+        # Cobertura: jogos novos no intervalo do 2º quarter, comparando com o total real
+        games_played = draw(trials)
+        covered, brier_sim, brier_pace = 0, [], []
+        for trial in range(trials):
+            played = games_played[:, trial, :2].sum(axis=1)
+            final = games_played[:, trial, :].sum(axis=1)
+            lines = {name: float(np.round(history[i].sum(axis=1).mean()) + 0.5) for i, name in enumerate(names)}
+            result = simulator.simulate(
+                names, current_quarter=2,
+                current_points={name: played[i] for i, name in enumerate(names)},
+                lines=lines
+            )['players']
+            for i, name in enumerate(names):
+                projection = result[name]
+                covered += projection['total']['p10'] <= final[i] <= projection['total']['p90']
+                won = float(final[i] > lines[name])
+                brier_sim.append((projection['prob_over'] - won) ** 2)
+                # Estimativa pontual antiga: média por quarter x ritmo, sem distribuição
+                point = played[i] + history[i, :, 2:].mean(axis=0).sum() * played[i] / max(history[i, :, :2].mean(axis=0).sum(), 1e-9)
+                brier_pace.append((float(point > lines[name]) - won) ** 2)
+
+    logger.info(
+        f"{players} jogadores x {sims} simulações x 4 quarters: mediana {np.median(timings) * 1000:.1f}ms "
+        f"(máx {max(timings) * 1000:.1f}ms); cobertura p10-p90 {covered / (players * trials):.1%}; "
+        f"Brier P(over) {np.mean(brier_sim):.4f} vs estimativa pontual {np.mean(brier_pace):.4f}"
+    )
+
+def bench_game_context(players=10, games=30, matches=200, ticks=20):
+    """Endpoints de um jogo (jogadores, quarters e props) com contexto por snapshot contra cálculo por endpoint"""
+    import numpy as np
+    import pandas as pd
+    from game_context import GameContext, GameContextCache
+    from holzhauer_strategy import HolzhauerStrategy
+    from odds_collector import OddsCollector
+    from player_stats import PlayerStatsAnalyzer
+    from player_stats_repository import PlayerStatsRepository
+    from quarter_simulator import QuarterSimulator
+
+    rng = np.random.default_rng(0)
+    names = [f"Player {i}" for i in range(players)]
+    quarters = rng.poisson(5, (players * games, 4))
+    stats = pd.DataFrame({
+        'player_name': np.repeat(names, games),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=games).strftime('%Y-%m-%d'), players),
+        'is_home': True,
+        'points': quarters.sum(axis=1),
+        'rebounds': rng.poisson(6, players * games),
+        'assists': rng.poisson(5, players * games),
+        **{f'quarter_{q + 1}_pts': quarters[:, q] for q in range(4)}
+    })
+    stat_types = np.tile(['points', 'rebounds', 'assists'], players)
+    props_df = pd.DataFrame({
+        'player_name': np.repeat(names, 3),
+        'game_id': 'Match 7',
+        'stat_type': stat_types,
+        'line': np.select([stat_types == 'points', stat_types == 'rebounds'], [18.5, 5.5], 4.5),
+        'odds': rng.uniform(1.7, 2.3, players * 3).round(2)
+    })
+
+    collector = OddsCollector()
+    collector.current_odds = pd.DataFrame({
+        'Match': [f"Match {i}" for i in range(matches)],
+        'Home_Team': 'Home', 'Away_Team': 'Away', 'Home_Odds': 1.9, 'Away_Odds': 1.9
+    })
+    base_game_data = collector.get_game_data
+    live_players = [{'name': name, 'points': int(rng.poisson(10)), 'line': 20.5} for name in names]
+    collector.get_game_data = lambda game_id: {**base_game_data(game_id), 'players': live_players, 'quarter': 2}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = PlayerStatsAnalyzer()
+        analyzer.repository = PlayerStatsRepository(os.path.join(tmp_dir, 'player_stats.csv'), os.path.join(tmp_dir, 'index.json'))
+        analyzer.prop_model.repository = analyzer.repository
+        analyzer.quarter_simulator = QuarterSimulator(analyzer.repository, seed=0)
+        analyzer.props_file = os.path.join(tmp_dir, 'player_props.csv')
+        stats.to_csv(analyzer.repository.stats_file, index=False)
+        props_df.to_csv(analyzer.props_file, index=False)
+        analyzer.repository.refresh()
+        holzhauer = HolzhauerStrategy()
+
+        # Por endpoint: cada um lê o jogo e monta a própria análise
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for section in ('quarter_analysis', 'quarter_analysis', 'value_props'):
+                context = GameContext('Match 7', collector.get_game_data('Match 7'), analyzer, holzhauer)
+                getattr(context, section)()
+        per_endpoint = time.perf_counter() - start
+
+        # Contexto compartilhado: um por (jogo, versão do snapshot)
+        contexts = GameContextCache(collector, analyzer, holzhauer)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            collector.snapshot_version += 1
+            for section in ('quarter_analysis', 'quarter_analysis', 'value_props'):
+                getattr(contexts.get('Match 7'), section)()
+        shared = time.perf_counter() - start
+
+    logger.info(
+        f"3 endpoints x {ticks} ticks, {players} jogadores: {per_endpoint / ticks * 1000:.1f}ms por tick com cálculo em cada endpoint, "
+        f"{shared / ticks * 1000:.1f}ms com contexto compartilhado ({per_endpoint / shared:.1f}x)"
+    )
+
+def bench_game_lookup(matches=2000, bookmakers=5, lookups=2000):
+    """get_game_data pelo índice de partidas contra a busca com str.contains em todas as linhas"""
+    import numpy as np
+    import pandas as pd
+    from odds_collector import OddsCollector
+
+    rng = np.random.default_rng(0)
+    home = [f"Home {i}" for i in range(matches)]
+    away = [f"Away {i}" for i in range(matches)]
+    rows = matches * bookmakers
+    collector = OddsCollector()
+    collector.current_odds = pd.DataFrame({
+        'Match': np.repeat([f"{h} vs {a}" for h, a in zip(home, away)], bookmakers),
+        'League': 'NBA',
+        'Home_Team': np.repeat(home, bookmakers),
+        'Away_Team': np.repeat(away, bookmakers),
+        'Bookmaker': np.tile([f"Book {i}" for i in range(bookmakers)], matches),
+        'Home_Odds': rng.uniform(1.5, 3.0, rows).round(2),
+        'Away_Odds': rng.uniform(1.5, 3.0, rows).round(2)
+    })
+    game_ids = [f"Home {i} vs Away {i}" for i in rng.integers(0, matches, lookups)]
+
+    def scan(game_id):
+        # Busca anterior: regex em todas as linhas e a primeira que casar
+        odds_data = collector.current_odds
+        game = odds_data[odds_data['Match'].str.contains(game_id, case=False)].iloc[0]
+        return game['Home_Team'], game['Away_Team'], float(game['Home_Odds']), float(game['Away_Odds'])
+
+    start = time.perf_counter()
+    scanned = [scan(game_id) for game_id in game_ids]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    collector.find_game(game_ids[0])  # Monta o índice, como na publicação do snapshot
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [collector.get_game_data(game_id) for game_id in game_ids]
+    index_time = time.perf_counter() - start
+
+    same = all(
+        (game['home_team'], game['away_team'], game['odds']['home'], game['odds']['away']) == expected
+        for game, expected in zip(indexed, scanned)
+    )
+    logger.info(
+        f"{lookups} buscas em {rows} linhas: {scan_time / lookups * 1e6:.0f}us por busca com str.contains, "
+        f"{index_time / lookups * 1e6:.1f}us com o índice (montagem {build_time * 1000:.1f}ms por snapshot); "
+        f"mesmos jogos: {same}"
+    )
+
+def bench_nba_slate(games=15, players=10, history=20, repeats=20):
+    """Análise da rodada inteira em lote contra analyze_game jogo a jogo, com conferência dos resultados"""
+    import numpy as np
+    from nba_analyzer import NBAAnalyzer
+
+    rng = np.random.default_rng(0)
+    analyzer = NBAAnalyzer()
+
+    def recent_game(i):
+        return {
+            'id': i, 'win': int(rng.integers(0, 2)), 'points': float(rng.normal(110, 10)),
+            'margin': float(rng.normal(0, 10)), **{f'Q{q}_points': float(rng.normal(27, 6)) for q in range(1, 5)}
+        }
+
+    slate_games = []
+    for game in range(games):
+        game_data = {
+            'id': game,
+            **{f'Q{q}_points': rng.normal(27, 5, int(rng.integers(1, history + 1))).tolist() for q in range(1, 5)},
+            'is_home': bool(rng.integers(0, 2)), 'back_to_back': bool(rng.integers(0, 2)),
+            'rest_days': int(rng.integers(0, 4)), 'is_playoff': bool(rng.integers(0, 2)),
+            'last_10_games': [recent_game(i) for i in range(int(rng.integers(1, 11)))],
+            'last_5_games': [recent_game(i) for i in range(5)],
+            'player_stats': {}
+        }
+        player_stats = {
+            f"Player {game}-{i}": {
+                'pts_per_game': float(rng.uniform(5, 35)), 'min_per_game': float(rng.uniform(10, 38)),
+                'plus_minus': float(rng.normal(0, 5)), 'usage_rate': float(rng.uniform(10, 35)),
+                'last_5_games_rating': float(rng.uniform(0, 1.2)), 'season_rating': float(rng.uniform(0, 1)),
+                'vs_opponent_rating': float(rng.uniform(0, 1)), 'height_advantage': float(rng.normal(0, 1)),
+                'minutes_last_game': float(rng.uniform(10, 42)), 'is_back_to_back': bool(rng.integers(0, 2)),
+                'last_5_games_minutes': float(rng.uniform(50, 200)), 'days_rest': int(rng.integers(0, 4))
+            }
+            for i in range(players)
+        }
+        team_stats = {
+            side: {
+                'pace': float(rng.normal(100, 3)), 'three_rate': float(rng.uniform(0.3, 0.45)),
+                'paint_points': float(rng.normal(48, 5)), 'fast_break_points': float(rng.normal(13, 3)),
+                'starters': {position: f"{side} {position}" for position in ('PG', 'SG', 'SF', 'PF', 'C')}
+            }
+            for side in ('home_team', 'away_team')
+        }
+        team_stats['head_to_head'] = [
+            {'winner': 'home' if rng.random() < 0.5 else 'away', 'point_diff': float(rng.normal(0, 10))} for _ in range(8)
+        ]
+        slate_games.append((game_data, player_stats, team_stats))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        per_game = [analyzer.analyze_game(*game) for game in slate_games]
+    per_game_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        slate = analyzer.build_slate(slate_games)
+    build_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        batched = analyzer.analyze_slate(slate)
+    slate_time = (time.perf_counter() - start) / repeats
+
+    def same(a, b):
+        if isinstance(a, dict):
+            return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+        if isinstance(a, list):
+            return isinstance(b, list) and len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+        if isinstance(a, (int, float, np.number)) and not isinstance(a, bool):
+            return bool(np.isclose(a, b, rtol=1e-9, atol=1e-9))
+        return a == b
+
+    logger.info(
+        f"{games} jogos x {players} jogadores: {per_game_time * 1000:.1f}ms jogo a jogo, "
+        f"{slate_time * 1000:.1f}ms em lote (+{build_time * 1000:.1f}ms montando as colunas); "
+        f"mesmos resultados: {same(per_game, batched)}"
+    )
+
+def bench_trend_slopes(series=100000, min_length=3, max_length=10, window=5, repeats=5):
+    """Inclinações por np.polyfit série a série contra as inclinações em forma fechada, em lote"""
+    import numpy as np
+    from trend_utils import ols_slopes, rolling_slopes
+
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(min_length, max_length + 1, series)
+    values = rng.normal(0, 1, (series, max_length)).cumsum(axis=1)
+    values[np.arange(max_length) >= lengths[:, None]] = np.nan  # Séries curtas completadas com NaN
+    rows = [row[:length] for row, length in zip(values, lengths)]
+
+    start = time.perf_counter()
+    expected = np.array([np.polyfit(np.arange(len(row)), row, 1)[0] for row in rows])
+    polyfit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        slopes = ols_slopes(values)
+    batched_time = (time.perf_counter() - start) / repeats
+
+    # Janelas móveis nas séries completas, contra polyfit janela a janela numa amostra
+    full = np.nan_to_num(values)
+    start = time.perf_counter()
+    rolling = rolling_slopes(full, window)
+    rolling_time = time.perf_counter() - start
+    sample = full[:1000]
+    expected_rolling = np.array([
+        [np.polyfit(np.arange(window), row[t:t + window], 1)[0] for t in range(max_length - window + 1)]
+        for row in sample
+    ])
+
+    logger.info(
+        f"{series} séries de {min_length} a {max_length} pontos: {polyfit_time * 1000:.0f}ms com polyfit, "
+        f"{batched_time * 1000:.1f}ms em forma fechada ({polyfit_time / batched_time:.0f}x); "
+        f"mesmas inclinações: {bool(np.allclose(slopes, expected))}; "
+        f"janelas de {window}: {rolling_time * 1000:.1f}ms, "
+        f"iguais ao polyfit: {bool(np.allclose(rolling[:1000], expected_rolling))}"
+    )
+
+BENCHMARKS = {
+    'behavior_replay': bench_behavior_replay,
+    'startup': bench_startup,
+    'batch_inference': bench_batch_inference,
+    'feature_extraction': bench_feature_extraction,
+    'compiled_model': bench_compiled_model,
+    'backtest': bench_backtest,
+    'parameter_sweep': bench_parameter_sweep,
+    'market_consensus': bench_market_consensus,
+    'steam_detection': bench_steam_detection,
+    'best_price_index': bench_best_price_index,
+    'player_stats_repository': bench_player_stats_repository,
+    'value_props': bench_value_props,
+    'rolling_aggregates': bench_rolling_aggregates,
+    'stats_ingest': bench_stats_ingest,
+    'prop_model': bench_prop_model,
+    'quarter_simulation': bench_quarter_simulation,
+    'game_context': bench_game_context,
+    'game_lookup': bench_game_lookup,
+    'nba_slate': bench_nba_slate,
+    'trend_slopes': bench_trend_slopes,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        logger.info(f"Executando benchmark {name}...")
+        BENCHMARKS[name]()
@@ -0,0 +1,117 @@
+import heapq
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class BestPriceIndex:
+    """Índice das melhores cotações por mercado (partida, lado), atualizado por deltas
+
+    Ligado como listener da coleta: com as mesmas linhas do tick anterior, só
+    as cotações que mudaram são aplicadas, e o top-k de um mercado só é
+    recalculado quando a mudança pode afetá-lo; quando as linhas mudam, os
+    mercados são remontados de uma vez. A melhor cotação de um mercado é uma
+    consulta O(1).
+    """
+
+    def __init__(self, k=3):
+        self.k = k
+        self.prices = {}  # (partida, lado) -> {casa: cotação}
+        self.top = {}  # (partida, lado) -> [(cotação, casa), ...] em ordem decrescente
+        self.live_matches = set()
+        self.snapshot_version = None
+        self._last_snapshot = None  # Colunas do tick anterior, para detectar as mudanças
+        self._lock = threading.Lock()
+
+    def on_snapshot(self, odds_data, version=None):
+        """Listener da coleta: aplica as cotações alteradas do snapshot"""
+        try:
+            sides = (
+                ('home', odds_data['Home_Odds'].to_numpy(dtype=float)),
+                ('away', odds_data['Away_Odds'].to_numpy(dtype=float))
+            )
+
+            matches = odds_data['Match'].reset_index(drop=True)
+            bookmakers = odds_data['Bookmaker'].reset_index(drop=True)
+
+            # Deltas: com as mesmas linhas do tick anterior, compara só os preços
+            last = self._last_snapshot
+            same_rows = last is not None and matches.equals(last['matches']) and bookmakers.equals(last['bookmakers'])
+            self._last_snapshot = {'matches': matches, 'bookmakers': bookmakers, **{side: odds.copy() for side, odds in sides}}
+
+            if not same_rows:
+                # Linhas diferentes: os mercados são remontados de uma vez a partir do snapshot
+                self._rebuild(matches, bookmakers, sides, version)
+                return
+
+            with self._lock:
+                for side, odds in sides:
+                    rows = np.flatnonzero(odds != last[side])
+                    for match, bookmaker, price in zip(matches.iloc[rows], bookmakers.iloc[rows], odds[rows]):
+                        self._apply(match, side, bookmaker, float(price))
+                self.snapshot_version = version
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar índice de melhores preços: {e}")
+
+    def _rebuild(self, matches, bookmakers, sides, version):
+        """Monta preços e top-k de todos os mercados do snapshot de uma vez"""
+        prices = {}
+        for side, odds in sides:
+            for match, bookmaker, price in zip(matches, bookmakers, odds):
+                prices.setdefault((match, side), {})[bookmaker] = price
+
+        # Mesma ordem do heapq.nlargest sobre (cotação, casa), mais barata com poucas casas por mercado
+        top = {market: sorted(zip(book_prices.values(), book_prices.keys()), reverse=True)[:self.k]
+               for market, book_prices in prices.items()}
+
+        with self._lock:
+            self.prices, self.top = prices, top
+            self.live_matches = set(matches)
+            self.snapshot_version = version
+
+    def _apply(self, match, side, bookmaker, odds):
+        """Atualiza a cotação de uma casa e, se necessário, o top-k do mercado"""
+        market = (match, side)
+        book_prices = self.prices.setdefault(market, {})
+        book_prices[bookmaker] = odds
+
+        top = self.top.get(market, [])
+        in_top = any(book == bookmaker for _, book in top)
+        if in_top or len(top) < self.k or odds > top[-1][0]:
+            self.top[market] = heapq.nlargest(self.k, ((price, book) for book, price in book_prices.items()))
+
+    def best(self, match, side):
+        """Melhor cotação do mercado como (cotação, casa), ou None"""
+        top = self.top.get((match, side))
+        return top[0] if top else None
+
+    def average(self, match, side):
+        """Cotação média do mercado entre as casas, ou None"""
+        book_prices = self.prices.get((match, side))
+        return sum(book_prices.values()) / len(book_prices) if book_prices else None
+
+    def quotes(self, match, side):
+        """Cotações de todas as casas no mercado, como {casa: cotação}"""
+        return dict(self.prices.get((match, side), {}))
+
+    def top_k(self, match, side):
+        """As k melhores cotações do mercado"""
+        return list(self.top.get((match, side), []))
+
+    def board(self):
+        """Quadro de melhores preços de todos os mercados ao vivo"""
+        with self._lock:
+            board = []
+            for match in sorted(self.live_matches):
+                entry = {'match': match}
+                for side in ('home', 'away'):
+                    top = self.top.get((match, side), [])
+                    entry[side] = {
+                        'best_odds': top[0][0] if top else None,
+                        'bookmaker': top[0][1] if top else None,
+                        'top': [{'odds': odds, 'bookmaker': bookmaker} for odds, bookmaker in top]
+                    }
+                board.append(entry)
+            return board
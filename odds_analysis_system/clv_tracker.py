@@ -0,0 +1,307 @@
+import bisect
+import fcntl
+import io
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+import pandas as pd
+from config import LINE_HISTORY_FILE, CLV_FILE, LINE_RETENTION_HOURS, LINE_COMPACTION_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+LINE_COLUMNS = ['Timestamp', 'Match', 'Side', 'Bookmaker', 'Odds', 'Start_Time']
+
+class CLVTracker:
+    """Closing line value das oportunidades sinalizadas
+
+    Cada coleta é acrescentada ao histórico de linhas (CSV append-only) e cada
+    oportunidade sinalizada ao log de oportunidades (JSONL). Os processos
+    leem o histórico a partir do último offset e mantêm uma linha do tempo
+    ordenada por (partida, lado, casa), então o último preço antes do início
+    do jogo é encontrado por busca binária.
+
+    Quem grava também compacta o histórico a cada `compaction_interval`
+    segundos: partidas já iniciadas ficam só com a linha de fechamento e
+    partidas sem cotações há mais de `retention_hours` saem. O arquivo é
+    trocado de forma atômica e os leitores reindexam ao ver o arquivo novo.
+    """
+
+    def __init__(self, line_file=LINE_HISTORY_FILE, clv_file=CLV_FILE,
+                 retention_hours=LINE_RETENTION_HOURS, compaction_interval=LINE_COMPACTION_INTERVAL):
+        self.line_file = line_file
+        self.lock_file = f"{line_file}.lock"
+        self.clv_file = clv_file
+        self.retention_hours = retention_hours
+        self.compaction_interval = compaction_interval
+        self.timelines = {}  # (partida, lado, casa) -> {'times': [...], 'odds': [...]}
+        self.start_times = {}  # partida -> horário de início (timestamp), quando conhecido
+        self._flagged = set()  # (partida, lado, casa, dia) já registrados por este processo
+        self._offset = 0
+        self._inode = None  # Arquivo indexado; muda quando o histórico é compactado
+        self._last_compaction = 0.0
+        self._lock = threading.Lock()
+
+    def record_snapshot(self, odds_data, version=None):
+        """Listener da coleta: acrescenta as cotações do snapshot ao histórico de linhas"""
+        try:
+            if odds_data.empty:
+                return
+
+            start_times = odds_data['Start_Time'] if 'Start_Time' in odds_data.columns else None
+            lines = pd.concat([
+                pd.DataFrame({
+                    'Timestamp': pd.to_datetime(odds_data['Timestamp']),
+                    'Match': odds_data['Match'],
+                    'Side': side,
+                    'Bookmaker': odds_data['Bookmaker'],
+                    'Odds': odds_data[column],
+                    'Start_Time': start_times
+                })
+                for side, column in (('home', 'Home_Odds'), ('away', 'Away_Odds'))
+            ])
+
+            # Uma única escrita em modo append não se intercala com a de outros processos;
+            # a trava compartilhada só impede a escrita no arquivo que está sendo compactado
+            data = lines.to_csv(header=False, index=False, columns=LINE_COLUMNS).encode('utf-8')
+            with self._locked(fcntl.LOCK_SH):
+                fd = os.open(self.line_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+
+            if time.monotonic() - self._last_compaction >= self.compaction_interval:
+                self.compact()
+
+        except Exception as e:
+            logger.error(f"Erro ao registrar linhas da coleta: {e}")
+
+    def compact(self, now=None):
+        """Reescreve o histórico só com o necessário para o CLV
+
+        Partidas já iniciadas mantêm a última cotação antes do início de cada
+        (lado, casa), com o horário de início; partidas sem cotações nas
+        últimas `retention_hours` horas são removidas.
+        """
+        self._last_compaction = time.monotonic()
+        try:
+            with self._locked(fcntl.LOCK_EX):
+                if not os.path.exists(self.line_file):
+                    return
+
+                lines = pd.read_csv(self.line_file, names=LINE_COLUMNS)
+                kept = self._retained_lines(lines, now or datetime.now())
+                if len(kept) == len(lines):
+                    return
+
+                tmp_file = f"{self.line_file}.{os.getpid()}.tmp"
+                kept.to_csv(tmp_file, header=False, index=False, columns=LINE_COLUMNS)
+                os.replace(tmp_file, self.line_file)
+
+            logger.info(f"Histórico de linhas compactado: {len(lines)} -> {len(kept)} linhas")
+
+        except Exception as e:
+            logger.error(f"Erro ao compactar histórico de linhas: {e}")
+
+    def _retained_lines(self, lines, now):
+        """Linhas que continuam no histórico depois da compactação"""
+        seconds = pd.Series(self._to_seconds(lines['Timestamp']), index=lines.index)
+        now_seconds, cutoff = self._to_seconds([now, now - timedelta(hours=self.retention_hours)])
+
+        # Partidas sem cotações recentes saem inteiras
+        last_seen = seconds.groupby(lines['Match']).transform('max')
+        lines, seconds = lines[last_seen >= cutoff], seconds[last_seen >= cutoff]
+
+        # Início conhecido de cada partida (o último informado, como na indexação)
+        last_start = lines.dropna(subset=['Start_Time']).groupby('Match')['Start_Time'].last()
+        start = lines['Match'].map(pd.Series(self._to_seconds(last_start), index=last_start.index))
+        started = start <= now_seconds
+
+        # Partidas iniciadas: só a linha de fechamento de cada (lado, casa)
+        closing = lines[started & (seconds < start)]
+        closing = closing.loc[
+            seconds[closing.index].groupby([closing['Match'], closing['Side'], closing['Bookmaker']]).idxmax()
+        ]
+        closing = closing.assign(Start_Time=closing['Match'].map(last_start))
+
+        return pd.concat([lines[~started], closing]).sort_index()
+
+    def flag_opportunity(self, match, side, bookmaker, odds, flagged_at=None, start_time=None):
+        """Registra uma oportunidade sinalizada com o preço e o horário (uma vez por dia)"""
+        try:
+            flagged_at = flagged_at or datetime.now()
+            key = (match, side, bookmaker, flagged_at.date())
+            if key in self._flagged:
+                return
+            self._flagged.add(key)
+
+            record = {
+                'match': match,
+                'side': side,
+                'bookmaker': bookmaker,
+                'odds': float(odds),
+                'flagged_at': flagged_at.isoformat(),
+                'start_time': start_time.isoformat() if start_time else None
+            }
+
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            fd = os.open(self.clv_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+        except Exception as e:
+            logger.error(f"Erro ao registrar oportunidade para CLV: {e}")
+
+    def flag_opportunities(self, analyses, odds_data):
+        """Registra as oportunidades recomendadas das análises, com o início de cada partida no snapshot"""
+        try:
+            start_times = {}
+            if 'Start_Time' in odds_data.columns:
+                start_times = pd.to_datetime(odds_data.groupby('Match')['Start_Time'].first()).to_dict()
+
+            for analysis in analyses:
+                if not analysis['recommended']:
+                    continue
+                start_time = start_times.get(analysis['match'])
+                for opportunity in analysis['value_opportunities']:
+                    self.flag_opportunity(
+                        analysis['match'], opportunity['type'], opportunity['bookmaker'], opportunity['odds'],
+                        start_time=start_time.to_pydatetime() if start_time is not None else None
+                    )
+
+        except Exception as e:
+            logger.error(f"Erro ao registrar oportunidades para CLV: {e}")
+
+    def sync(self):
+        """Indexa as linhas acrescentadas ao histórico desde a última leitura"""
+        with self._lock:
+            try:
+                if not os.path.exists(self.line_file):
+                    return
+
+                with open(self.line_file, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    if stat.st_ino != self._inode or stat.st_size < self._offset:
+                        # Arquivo compactado (ou truncado): reindexa do começo
+                        self.timelines = {}
+                        self.start_times = {}
+                        self._offset = 0
+                        self._inode = stat.st_ino
+                    if stat.st_size == self._offset:
+                        return
+
+                    f.seek(self._offset)
+                    data = f.read(stat.st_size - self._offset)
+
+                # Considera apenas linhas completas; o restante é lido na próxima vez
+                complete = data.rfind(b'\n') + 1
+                self._offset += complete
+                if complete:
+                    self._index_lines(pd.read_csv(io.BytesIO(data[:complete]), names=LINE_COLUMNS))
+
+            except Exception as e:
+                logger.error(f"Erro ao indexar histórico de linhas: {e}")
+
+    def _index_lines(self, lines):
+        """Insere as linhas lidas nas linhas do tempo de cada (partida, lado, casa)"""
+        lines = lines.assign(Seconds=self._to_seconds(lines['Timestamp'])).sort_values('Seconds', kind='stable')
+
+        for key, group in lines.groupby(['Match', 'Side', 'Bookmaker'], sort=False):
+            timeline = self.timelines.setdefault(key, {'times': [], 'odds': []})
+            times = group['Seconds'].tolist()
+            odds = group['Odds'].astype(float).tolist()
+
+            # Coletas chegam em ordem; fora de ordem, insere na posição certa
+            if not timeline['times'] or times[0] >= timeline['times'][-1]:
+                timeline['times'].extend(times)
+                timeline['odds'].extend(odds)
+            else:
+                for timestamp, price in zip(times, odds):
+                    position = bisect.bisect_right(timeline['times'], timestamp)
+                    timeline['times'].insert(position, timestamp)
+                    timeline['odds'].insert(position, price)
+
+        starts = lines.dropna(subset=['Start_Time']).groupby('Match')['Start_Time'].last()
+        self.start_times.update(zip(starts.index, self._to_seconds(starts)))
+
+    @contextmanager
+    def _locked(self, mode):
+        """Trava do histórico entre processos (compartilhada para acrescentar, exclusiva para compactar)"""
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _to_seconds(self, values):
+        """Converte datas em segundos desde a época (mesma referência para linhas e inícios)"""
+        return ((pd.to_datetime(values) - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy()
+
+    def closing_price(self, match, side, bookmaker, start_time=None):
+        """Último preço antes do início do jogo, ou None se o início é desconhecido
+
+        Sem o horário de início, a última cotação registrada pode já ser de
+        jogo em andamento e daria um CLV falso.
+        """
+        timeline = self.timelines.get((match, side, bookmaker))
+        if not timeline:
+            return None
+
+        start = self._to_seconds([start_time])[0] if start_time else self.start_times.get(match)
+        if start is None:
+            return None
+
+        position = bisect.bisect_left(timeline['times'], start)
+        return timeline['odds'][position - 1] if position else None
+
+    def compute_clv(self, day=None):
+        """CLV de todas as oportunidades sinalizadas no dia"""
+        day = day or date.today()
+        self.sync()
+
+        results = []
+        for record in self._load_flagged(day):
+            start_time = datetime.fromisoformat(record['start_time']) if record['start_time'] else None
+            closing = self.closing_price(record['match'], record['side'], record['bookmaker'], start_time)
+            results.append({
+                **record,
+                'closing_odds': closing,
+                'clv': record['odds'] / closing - 1 if closing else None
+            })
+
+        values = [result['clv'] for result in results if result['clv'] is not None]
+        return {
+            'date': day.isoformat(),
+            'opportunities': results,
+            'summary': {
+                'total': len(results),
+                'with_closing': len(values),
+                'avg_clv': sum(values) / len(values) if values else 0.0,
+                'positive_rate': sum(value > 0 for value in values) / len(values) if values else 0.0
+            }
+        }
+
+    def _load_flagged(self, day):
+        """Oportunidades do dia, mantendo o primeiro registro de cada (partida, lado, casa)"""
+        if not os.path.exists(self.clv_file):
+            return []
+
+        flagged = {}
+        prefix = day.isoformat()
+        with open(self.clv_file, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not record['flagged_at'].startswith(prefix):
+                    continue
+                flagged.setdefault((record['match'], record['side'], record['bookmaker']), record)
+
+        return list(flagged.values())
@@ -0,0 +1,185 @@
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class CompiledForest:
+    """Random Forest exportado em arrays planos e avaliado com NumPy
+
+    Todas as árvores ficam concatenadas em um único conjunto de arrays de nós
+    (feature, threshold, filhos e probabilidades das folhas). As folhas apontam
+    para si mesmas, então a predição avança todas as árvores de todas as
+    amostras um nível por iteração, sem máscaras e sem depender do sklearn.
+
+    Aceita RandomForestClassifier (folhas com a probabilidade das classes) e
+    RandomForestRegressor (folhas com o valor previsto; `classes_` vazio).
+    Valores ausentes (NaN) seguem o lado que o sklearn aprendeu para cada nó.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 missing_right=None, chunk_size=512):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        # Lado de cada nó para NaN; modelos exportados antes disso mandam tudo à esquerda
+        self.missing_right = np.zeros(len(feature), dtype=bool) if missing_right is None else missing_right
+        self.chunk_size = chunk_size  # Amostras por bloco, para os arrays caberem no cache
+
+    @property
+    def is_classifier(self):
+        """Indica se o modelo exportado é um classificador"""
+        return len(self.classes_) > 0
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Converte um RandomForestClassifier ou RandomForestRegressor treinado"""
+        is_classifier = hasattr(forest, 'classes_')
+        if is_classifier and forest.n_outputs_ > 1:
+            raise ValueError("Classificadores com várias saídas não são suportados")
+
+        features, thresholds, children, values, missing_right, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            nodes = np.arange(tree.node_count) + offset
+
+            # Filhos (esquerdo, direito) intercalados com índices globais; folhas apontam para si
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.stack([
+                np.where(is_leaf, nodes, tree.children_left + offset),
+                np.where(is_leaf, nodes, tree.children_right + offset)
+            ], axis=1).ravel())
+
+            # NaN vai para o lado aprendido no treino (sklearn >= 1.3); antes disso, à esquerda
+            missing_left = getattr(tree, 'missing_go_to_left', None)
+            missing_right.append(
+                np.zeros(tree.node_count, dtype=bool) if missing_left is None
+                else ~np.asarray(missing_left, dtype=bool) & ~is_leaf
+            )
+
+            if is_classifier:
+                # Probabilidade das classes em cada folha (mesma normalização do sklearn)
+                value = tree.value[:, 0, :]
+                totals = value.sum(axis=1, keepdims=True)
+                values.append(np.divide(value, totals, out=np.zeros_like(value), where=totals > 0))
+            else:
+                # Valor previsto de cada saída em cada folha
+                values.append(tree.value[:, :, 0])
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(forest.classes_) if is_classifier else np.empty(0),
+            missing_right=np.concatenate(missing_right)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um modelo exportado com save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def save(self, path):
+        """Salva os arrays do modelo de forma atômica (.npz)"""
+        tmp_file = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_file,
+            feature=self.feature,
+            threshold=self.threshold,
+            children=self.children,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            classes=self.classes_,
+            missing_right=self.missing_right
+        )
+        os.replace(tmp_file, path)
+
+    def predict_proba(self, X):
+        """Probabilidade de cada classe: média das folhas alcançadas em todas as árvores"""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba só existe para classificadores")
+        return self._average_leaves(X)
+
+    def predict(self, X):
+        """Classe mais provável de cada amostra, ou o valor previsto no caso de regressão"""
+        if self.is_classifier:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+        prediction = self._average_leaves(X)
+        return prediction[:, 0] if prediction.shape[1] == 1 else prediction
+
+    def _average_leaves(self, X):
+        """Média dos valores das folhas alcançadas em todas as árvores, em blocos de amostras"""
+        # O sklearn compara as features em float32 com os thresholds em float64
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return np.concatenate([
+            self._predict_chunk(X[start:start + self.chunk_size])
+            for start in range(0, len(X), self.chunk_size)
+        ]) if len(X) else np.empty((0, self.value.shape[1]))
+
+    def _predict_chunk(self, X):
+        """Percorre as árvores de um bloco de amostras, um nível por iteração"""
+        n_samples, n_features = X.shape
+        rows = (np.arange(n_samples, dtype=np.intp) * n_features)[:, None]
+        values = X.ravel()
+        nodes = np.tile(self.roots, (n_samples, 1))
+        has_missing = np.isnan(values).any()
+
+        for _ in range(self.max_depth):
+            x = values[rows + self.feature[nodes]]
+            go_right = x > self.threshold[nodes]
+            if has_missing:
+                go_right = np.where(np.isnan(x), self.missing_right[nodes], go_right)
+            nodes = self.children[2 * nodes + go_right]
+
+        return self.value[nodes].mean(axis=1)
+
+class CompiledScaler:
+    """StandardScaler exportado (média e escala) para normalizar sem o sklearn"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        """Converte um StandardScaler ajustado"""
+        n_features = scaler.n_features_in_
+        # Com with_mean=False o sklearn ainda guarda a média, mas não a subtrai
+        mean = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(n_features)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um scaler exportado com save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['mean'], data['scale'])
+
+    def save(self, path):
+        """Salva média e escala de forma atômica (.npz)"""
+        tmp_file = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_file, mean=self.mean_, scale=self.scale_)
+        os.replace(tmp_file, path)
+
+    def transform(self, X):
+        """Normaliza as features"""
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
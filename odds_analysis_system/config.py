@@ -18,8 +18,17 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 ODDS_FILE = os.path.join(DATA_DIR, 'odds.csv')
 OPPORTUNITIES_FILE = os.path.join(DATA_DIR, 'opportunities.csv')
 PLAYER_STATS_FILE = os.path.join(DATA_DIR, 'player_stats.csv')
+PLAYER_STATS_INDEX_FILE = os.path.join(DATA_DIR, 'player_stats_index.json')  # Índice (jogador, data) -> linha gravada
 PLAYER_PROPS_FILE = os.path.join(DATA_DIR, 'player_props.csv')
 PLAYER_TRENDS_FILE = os.path.join(DATA_DIR, 'player_trends.csv')
+BEHAVIOR_LOG_FILE = os.path.join(DATA_DIR, 'behavior_log.jsonl')
+BEHAVIOR_SNAPSHOT_FILE = os.path.join(DATA_DIR, 'behavior_snapshot.json')
+ODDS_HISTORY_FILE = os.path.join(DATA_DIR, 'odds_history.csv')
+RESULTS_FILE = os.path.join(DATA_DIR, 'match_results.csv')  # Resultados encerrados: Match, Home_Won
+LINE_HISTORY_FILE = os.path.join(DATA_DIR, 'line_history.csv')  # Cotações por (partida, lado, casa) para o CLV
+CLV_FILE = os.path.join(DATA_DIR, 'clv_opportunities.jsonl')  # Oportunidades sinalizadas com preço e horário
+BOOKMAKER_WEIGHTS_FILE = os.path.join(DATA_DIR, 'bookmaker_weights.json')  # Pesos das casas no consenso de mercado
+MODELS_DIR = os.path.join(DATA_DIR, 'models')  # Versões do modelo Holzhauer publicadas pelo treino
 
 # Configurações do servidor
 HOST = os.getenv('HOST', '0.0.0.0')
@@ -31,11 +40,17 @@ UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', 30))
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', 3))
 RETRY_DELAY = int(os.getenv('RETRY_DELAY', 5))
 
+# Modo de estado: 'local' (cada worker coleta) ou 'shared' (um processo coleta e publica snapshots)
+STATE_MODE = os.getenv('STATE_MODE', 'local')
+SHARED_STATE_DIR = os.getenv('SHARED_STATE_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else DATA_DIR)
+ODDS_SNAPSHOT_FILE = os.path.join(SHARED_STATE_DIR, 'odds_snapshot.pkl')
+
 # Thresholds
 ALERT_THRESHOLDS = {
     'odds_movement': float(os.getenv('ODDS_MOVEMENT_THRESHOLD', 5.0)),
     'volatility': float(os.getenv('VOLATILITY_THRESHOLD', 0.1)),
-    'min_ev': float(os.getenv('MIN_EV_THRESHOLD', 5.0))
+    'min_ev': float(os.getenv('MIN_EV_THRESHOLD', 5.0)),
+    'max_arbitrage_profit': float(os.getenv('MAX_ARBITRAGE_PROFIT', 5.0))  # Acima disso a cotação provavelmente está errada
 }
 
 # Configurações de logging
@@ -43,11 +58,25 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_FILE = os.path.join(LOGS_DIR, 'app.log')
 
+# Notificações
+TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+
 # Configurações de atualização
 ALERT_CHECK_INTERVAL = int(os.getenv('ALERT_CHECK_INTERVAL', 60))
+BEHAVIOR_SNAPSHOT_INTERVAL = int(os.getenv('BEHAVIOR_SNAPSHOT_INTERVAL', 500))  # Registros entre snapshots
+BEHAVIOR_RETENTION_MINUTES = int(os.getenv('BEHAVIOR_RETENTION_MINUTES', 120))  # Histórico de comportamento mantido
+LINE_RETENTION_HOURS = int(os.getenv('LINE_RETENTION_HOURS', 48))  # Partidas sem cotações há mais tempo saem do histórico de linhas
+LINE_COMPACTION_INTERVAL = int(os.getenv('LINE_COMPACTION_INTERVAL', 3600))  # Segundos entre compactações do histórico de linhas
 
 # Configurações da estratégia Holzhauer
 CONFIDENCE_THRESHOLD = int(os.getenv('CONFIDENCE_THRESHOLD', 75))
 VALUE_THRESHOLD = int(os.getenv('VALUE_THRESHOLD', 5))
+RETRAIN_INTERVAL = int(os.getenv('RETRAIN_INTERVAL', 3600))  # Segundos entre jobs de retreino
+MIN_NEW_RESULTS = int(os.getenv('MIN_NEW_RESULTS', 20))  # Resultados novos para justificar um retreino
+MODEL_VERSIONS_KEPT = int(os.getenv('MODEL_VERSIONS_KEPT', 5))
 QUARTER_ANALYSIS_WINDOW = int(os.getenv('QUARTER_ANALYSIS_WINDOW', 10))
-TREND_ANALYSIS_WINDOW = int(os.getenv('TREND_ANALYSIS_WINDOW', 5)) 
\ No newline at end of file
+TREND_ANALYSIS_WINDOW = int(os.getenv('TREND_ANALYSIS_WINDOW', 5))
+PROP_MODEL_WINDOW = int(os.getenv('PROP_MODEL_WINDOW', 20))  # Jogos recentes usados na distribuição de cada jogador
+PROP_PRIOR_GAMES = int(os.getenv('PROP_PRIOR_GAMES', 2))  # Peso da média da liga, em jogos, no encolhimento
+QUARTER_SIMULATIONS = int(os.getenv('QUARTER_SIMULATIONS', 10000))  # Simulações por jogador na projeção dos quarters
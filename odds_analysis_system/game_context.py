@@ -0,0 +1,171 @@
+import threading
+from config import VALUE_THRESHOLD
+
+class GameContext:
+    """Análise de um jogo em um snapshot, compartilhada pelos endpoints do jogo
+
+    Dados do jogo e lista de jogadores são lidos uma vez; a simulação dos
+    quarters, a análise por quarter e a avaliação das props são calculadas
+    no primeiro acesso e reaproveitadas enquanto o contexto estiver em cache.
+    """
+
+    def __init__(self, match, game_data, stats_analyzer, holzhauer, resolve_match=None):
+        self.match = match  # Partida resolvida no snapshot, independente do id usado na URL
+        self.game_data = game_data
+        self.resolve_match = resolve_match  # game_id das props -> partida
+        self.players = game_data.get('players', [])
+        self.stats_analyzer = stats_analyzer
+        self.holzhauer = holzhauer
+        self._sections = {}
+        self._lock = threading.RLock()  # As partes dependem da simulação, calculada sob a mesma trava
+
+    def simulation(self):
+        """Quarters restantes de todos os jogadores do jogo, simulados de uma vez"""
+        return self._section('simulation', self._simulate)
+
+    def quarter_analysis(self):
+        """Média, confiança e tendência de cada quarter de cada jogador, com a projeção do total"""
+        return self._section('quarter_analysis', self._analyze_quarters)
+
+    def value_props(self):
+        """Props do jogo com valor, pela distribuição de cada jogador"""
+        return self._section('value_props', self._evaluate_props)
+
+    def _section(self, name, build):
+        """Calcula uma parte do contexto no primeiro acesso"""
+        with self._lock:
+            if name not in self._sections:
+                self._sections[name] = build()
+            return self._sections[name]
+
+    def _simulate(self):
+        """Simula os jogadores com o quarter, os pontos e as linhas atuais do jogo"""
+        return self.stats_analyzer.quarter_simulator.simulate(
+            [player['name'] for player in self.players],
+            current_quarter=self.game_data.get('quarter', 0),
+            current_points={player['name']: player.get('points', 0) for player in self.players},
+            lines={player['name']: player['line'] for player in self.players if player.get('line') is not None}
+        )
+
+    def _analyze_quarters(self):
+        """Análise por quarter de cada jogador a partir da simulação"""
+        projections = self.simulation()['players']
+        analysis = []
+        for player in self.players:
+            projection = projections.get(player['name'])
+            quarter_stats = {}
+            for quarter in range(1, 5):
+                stats = self.holzhauer.analyze_quarter_stats(
+                    player_name=player['name'],
+                    quarter=quarter,
+                    game_situation=self.game_data,
+                    projection=projection
+                )
+                quarter_stats[quarter] = {
+                    'average': stats['average'],
+                    'confidence': stats['confidence'],
+                    'trend': stats['trend']
+                }
+
+            analysis.append({
+                'name': player['name'],
+                'quarter_stats': quarter_stats,
+                'projection': projection['total'] if projection else None,
+                'prob_over': projection['prob_over'] if projection else None
+            })
+        return analysis
+
+    def _evaluate_props(self):
+        """Avalia as props do jogo e fica com o lado de maior EV acima do limiar"""
+        scored = self.stats_analyzer.score_props(match=self.match, resolve_match=self.resolve_match)
+        if scored.empty:
+            return []
+
+        projections = self.simulation()['players']
+        props = []
+        for prop in scored.astype(object).where(scored.notna(), None).to_dict('records'):
+            if prop['prob_over'] is None:
+                continue  # Estatística sem distribuição conhecida
+
+            # Lado recomendado: o de maior EV entre os que têm odds
+            sides = [('over', prop['prob_over'], prop.get('ev_over')), ('under', prop['prob_under'], prop.get('ev_under'))]
+            priced = [side for side in sides if side[2] is not None]
+            if not priced:
+                continue
+            prediction, confidence, ev = max(priced, key=lambda side: side[2])
+
+            value_rating = ev * 100
+            if value_rating < VALUE_THRESHOLD:  # Apenas props com valor significativo
+                continue
+
+            projection = projections.get(prop['player_name'])
+            props.append({
+                'player': prop['player_name'],
+                'type': prop['stat_type'],
+                'line': prop['line'],
+                'prediction': prediction,
+                'confidence': confidence,
+                'value_rating': value_rating,
+                'analysis': {
+                    'prob_over': prop['prob_over'],
+                    'prob_under': prop['prob_under'],
+                    'fair_over_odds': prop['fair_over_odds'],
+                    'fair_under_odds': prop['fair_under_odds'],
+                    'projection': projection['total'] if projection and prop['stat_type'] == 'points' else None
+                }
+            })
+
+        # Ordena por value_rating
+        props.sort(key=lambda x: x['value_rating'], reverse=True)
+        return props
+
+class GameContextCache:
+    """Contextos de análise por jogo, memorizados por (partida, versão do snapshot)
+
+    O id da URL (nome da partida ou de um time, em qualquer grafia) é
+    resolvido pelo `find_game` do coletor, então ids diferentes do mesmo jogo
+    compartilham o contexto. Uma nova coleta publicada muda a versão e
+    descarta os contextos do snapshot anterior; dentro de um tick, todos os
+    endpoints do mesmo jogo compartilham o mesmo contexto.
+    """
+
+    def __init__(self, odds_collector, stats_analyzer, holzhauer):
+        self.odds_collector = odds_collector
+        self.stats_analyzer = stats_analyzer
+        self.holzhauer = holzhauer
+        self.version = None
+        self.contexts = {}  # partida -> GameContext da versão atual
+        self._lock = threading.Lock()
+
+    def get(self, game_id):
+        """Contexto do jogo no snapshot atual, ou None se o jogo não existe"""
+        self.odds_collector.get_current_odds()  # No modo compartilhado, recarrega o snapshot se mudou
+        version = self.odds_collector.snapshot_version
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self.contexts = {}
+
+        match = self.resolve_match(game_id)
+        if match is None:
+            return None
+        with self._lock:
+            context = self.contexts.get(match)
+        if context:
+            return context
+
+        game_data = self.odds_collector.get_game_data(match)
+        if game_data is None:
+            return None
+        context = GameContext(match, game_data, self.stats_analyzer, self.holzhauer, self.resolve_match)
+
+        with self._lock:
+            # Outra requisição pode ter montado o contexto enquanto este era lido
+            if version == self.version:
+                context = self.contexts.setdefault(match, context)
+        return context
+
+    def resolve_match(self, game_id):
+        """Nome da partida no snapshot atual para um id de jogo, ou None se não existe ou é ambíguo"""
+        game = self.odds_collector.find_game(game_id)
+        return game['Match'] if game is not None else None
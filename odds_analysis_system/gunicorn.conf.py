@@ -3,4 +3,6 @@ workers = 4
 threads = 2
 timeout = 120
 accesslog = "-"
-errorlog = "-" 
\ No newline at end of file
+errorlog = "-" 
+
+from gunicorn_hooks import on_starting, on_exit
@@ -17,4 +17,6 @@ bind = '0.0.0.0:10000'
 
 # Limites para plano free
 max_requests = 500
-max_requests_jitter = 50
\ No newline at end of file
+max_requests_jitter = 50
+
+from gunicorn_hooks import on_starting, on_exit
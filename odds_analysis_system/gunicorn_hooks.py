@@ -0,0 +1,20 @@
+# Hooks do gunicorn, importados por gunicorn.conf.py e gunicorn_config.py
+
+# Processos únicos da instalação: no modo compartilhado, o processo de estado coleta,
+# publica snapshots e retreina; no modo local, só o retreino sai dos workers
+def on_starting(server):
+    import config
+    if config.STATE_MODE == 'shared':
+        from state_service import StateService
+        server.state_service = StateService()
+        server.state_service.start()
+    else:
+        from model_trainer import ModelTrainer
+        server.model_trainer = ModelTrainer()
+        server.model_trainer.start_detached()
+
+def on_exit(server):
+    for name in ('state_service', 'model_trainer'):
+        service = getattr(server, name, None)
+        if service:
+            service.stop()
@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import json
 import logging
-from config import DATA_DIR
+import fcntl
+import shutil
+import threading
+from config import DATA_DIR, MODELS_DIR, MODEL_VERSIONS_KEPT, TREND_ANALYSIS_WINDOW
+from compiled_forest import CompiledForest, CompiledScaler
+from best_price_index import BestPriceIndex
+from odds_collector import GAME_DURATION
 import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-import joblib
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +19,37 @@ class HolzhauerNBAAnalyzer:
         self.confidence_threshold = 0.8
         self.high_value_threshold = 5.0
         
-    def analyze_quarter_patterns(self, game_data, current_quarter=1):
-        """Analisa padrões por quarter"""
+    def analyze_quarter_patterns(self, game_data, current_quarter=1, quarter_aggregates=None):
+        """Analisa padrões por quarter: média da janela e tendência dos jogos mais recentes"""
+        if quarter_aggregates is None:
+            # Sem agregados prontos, calcula a partir dos jogos recebidos
+            quarter_aggregates = {
+                f'q{quarter}': {
+                    'mean': game_data[f'quarter_{quarter}_pts'].mean(),
+                    'recent_mean': game_data[f'quarter_{quarter}_pts'].tail(TREND_ANALYSIS_WINDOW).mean()
+                }
+                for quarter in range(1, 5) if f'quarter_{quarter}_pts' in game_data.columns
+            }
+        
         patterns = {}
         for quarter in range(1, 5):
+            aggregates = quarter_aggregates.get(f'q{quarter}')
+            if not aggregates or pd.isna(aggregates['mean']):
+                patterns[f'q{quarter}'] = {'média': 0, 'tendência': 'estável'}
+                continue
+            
+            mean, recent_mean = aggregates['mean'], aggregates['recent_mean']
+            if recent_mean > mean * 1.1:
+                trend = 'alta'
+            elif recent_mean < mean * 0.9:
+                trend = 'baixa'
+            else:
+                trend = 'estável'
+            
             patterns[f'q{quarter}'] = {
-                'média': 0,
-                'tendência': 'estável'
+                'média': mean,
+                'média_recente': recent_mean,
+                'tendência': trend
             }
         return patterns
         
@@ -47,8 +75,8 @@ class HolzhauerNBAAnalyzer:
         }
         
     def adjust_confidence_by_momentum(self, base_confidence, momentum_factor):
-        """Ajusta confiança baseado no momento"""
-        return min(base_confidence * momentum_factor, 1.0)
+        """Ajusta confiança baseado no momento (aceita valores ou Series, elemento a elemento)"""
+        return np.minimum(base_confidence * momentum_factor, 1.0)
         
     def detect_momentum_shifts(self, player_stats, game_situation):
         """Detecta mudanças de momento"""
@@ -77,69 +105,342 @@ class HolzhauerNBAAnalyzer:
         return 'estável'
 
 class HolzhauerStrategy:
-    def __init__(self):
+    def __init__(self, best_prices=None):
         self.model_file = os.path.join(DATA_DIR, 'holzhauer_model.joblib')
         self.scaler_file = os.path.join(DATA_DIR, 'holzhauer_scaler.joblib')
+        
+        # Versões exportadas em arrays NumPy: carregam rápido e não importam o sklearn
+        self.compiled_model_file = os.path.join(DATA_DIR, 'holzhauer_model.npz')
+        self.compiled_scaler_file = os.path.join(DATA_DIR, 'holzhauer_scaler.npz')
         self.min_confidence = 0.75
-        self.model = self._load_model()
-        self.scaler = self._load_scaler()
+        
+        # Índice de melhores preços mantido pela coleta (consultado quando está no mesmo snapshot)
+        self.best_prices = best_prices
+        
+        # Versões publicadas pelo treino: um diretório por versão e um ponteiro para a atual
+        self.models_dir = MODELS_DIR
+        self.current_model_file = os.path.join(MODELS_DIR, 'current.json')
+        self.model_version = None
+        self.model_metadata = {}
+        self._current_mtime = None
+        
+        # Modelo e scaler são carregados no primeiro uso (sklearn/joblib são importados só então)
+        self._model = None
+        self._scaler = None
+        self._model_lock = threading.RLock()  # Troca modelo e scaler juntos, sem interromper a inferência
+        
+        # Resultado da última análise em lote, reaproveitado enquanto o snapshot não mudar
+        self._batch_cache = {'version': None, 'results': [], 'by_match': {}}
+        
+        # Feature store: features de todas as partidas por versão do snapshot
+        self.feature_columns = ['odds_value', 'market_efficiency', 'volatility', 'momentum', 'value_ratio']
+        self._feature_cache = {'version': None, 'frame': None}
         
         # Parâmetros da estratégia Holzhauer
         self.momentum_window = 10  # Janela para análise de momentum
         self.volatility_threshold = 0.1
         self.efficiency_threshold = 0.02
         self.value_threshold = 0.1
+        self.backtest_folds = 5  # Janelas do backtest walk-forward
+        
+    @property
+    def model(self):
+        """Modelo Random Forest, carregado sob demanda"""
+        if self._model is None and not self.refresh_model():
+            self._model = self._load_model()
+        return self._model
+        
+    @model.setter
+    def model(self, value):
+        self._model = value
+        
+    @property
+    def scaler(self):
+        """Scaler das features, carregado sob demanda"""
+        if self._scaler is None and not self.refresh_model():
+            self._scaler = self._load_scaler()
+        return self._scaler
+        
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
+        
+    def refresh_model(self):
+        """Passa a usar a versão publicada mais recente do modelo, se o ponteiro mudou"""
+        try:
+            mtime = os.stat(self.current_model_file).st_mtime_ns
+        except FileNotFoundError:
+            return False
+            
+        with self._model_lock:
+            if mtime == self._current_mtime:
+                return self.model_version is not None
+            self._current_mtime = mtime
+            
+            try:
+                with open(self.current_model_file, encoding='utf-8') as f:
+                    metadata = json.load(f)
+                    
+                version_dir = os.path.join(self.models_dir, metadata['version'])
+                model = CompiledForest.load(os.path.join(version_dir, 'model.npz'))
+                scaler = CompiledScaler.load(os.path.join(version_dir, 'scaler.npz'))
+                
+            except Exception as e:
+                logger.error(f"Erro ao carregar versão publicada do modelo: {e}")
+                return self.model_version is not None
+                
+            # Troca modelo e scaler de uma vez; confianças do modelo antigo deixam de valer
+            self._model = model
+            self._scaler = scaler
+            self.model_version = metadata['version']
+            self.model_metadata = metadata
+            self._batch_cache = {'version': None, 'results': [], 'by_match': {}}
+            
+        logger.info(f"Modelo Holzhauer na versão {metadata['version']}")
+        return True
         
     def analyze_opportunity(self, match_data):
         """Analisa uma oportunidade usando a estratégia Holzhauer"""
         try:
+            self.refresh_model()
+            
             # Extrai features
-            features = self._extract_features(match_data)
-            if features is None:
+            features = self._build_feature_frame(match_data)
+            if features.empty:
                 return None
                 
-            # Normaliza features
-            features_scaled = self.scaler.transform([features])
-            
             # Predição
-            confidence = self.model.predict_proba(features_scaled)[0][1]
+            confidence = self._predict_confidences(features[self.feature_columns])[0]
             
-            # Análise detalhada
-            analysis = {
-                'confidence': confidence,
-                'recommended': confidence >= self.min_confidence,
-                'momentum': self._analyze_momentum(match_data),
-                'market_efficiency': self._analyze_market_efficiency(match_data),
-                'value_opportunities': self._find_value_opportunities(match_data),
-                'risk_assessment': self._assess_risk(match_data)
-            }
+            match = features.index[0]
+            value_opportunities = self._find_value_opportunities(match_data).get(match, [])
+            return self._build_analysis(features.iloc[0], confidence, value_opportunities)
             
-            # Adiciona insights
-            analysis['insights'] = self._generate_insights(analysis)
+        except Exception as e:
+            logger.error(f"Erro ao analisar oportunidade: {e}")
+            return None
             
-            return analysis
+    def analyze_opportunities(self, odds_data, snapshot_version=None):
+        """Analisa todas as partidas do snapshot com uma única inferência do modelo"""
+        try:
+            self.refresh_model()
+            
+            if snapshot_version is not None and self._batch_cache['version'] == snapshot_version:
+                return self._batch_cache['results']
+                
+            # Matriz de features de todas as partidas, calculada em uma passada
+            features = self._get_feature_frame(odds_data, snapshot_version)
+            if features.empty:
+                return []
+                
+            # Um único transform do scaler e um único predict_proba para o lote
+            confidences = self._predict_confidences(features[self.feature_columns])
+            value_opportunities = self._find_value_opportunities(odds_data, snapshot_version)
+            
+            results = []
+            for (match, row), confidence in zip(features.to_dict('index').items(), confidences):
+                analysis = self._build_analysis(row, confidence, value_opportunities.get(match, []))
+                analysis['match'] = match
+                results.append(analysis)
+                
+            results.sort(key=lambda x: x['confidence'], reverse=True)
+            
+            if snapshot_version is not None:
+                self._batch_cache = {
+                    'version': snapshot_version,
+                    'results': results,
+                    'by_match': {analysis['match']: analysis for analysis in results}
+                }
+                
+            return results
             
         except Exception as e:
-            logger.error(f"Erro ao analisar oportunidade: {e}")
+            logger.error(f"Erro ao analisar oportunidades em lote: {e}")
+            return []
+            
+    def get_match_analysis(self, odds_data, match, snapshot_version=None):
+        """Retorna a análise de uma partida a partir da análise em lote do snapshot"""
+        if snapshot_version is None:
+            match_data = odds_data[odds_data['Match'] == match]
+            return self.analyze_opportunity(match_data) if not match_data.empty else None
+            
+        self.analyze_opportunities(odds_data, snapshot_version)
+        return self._batch_cache['by_match'].get(match)
+        
+    def get_opportunities(self, odds_data=None, snapshot_version=None):
+        """Retorna as oportunidades recomendadas (da última análise em lote, se não houver dados)"""
+        if odds_data is not None and not odds_data.empty:
+            results = self.analyze_opportunities(odds_data, snapshot_version)
+        else:
+            results = self._batch_cache['results']
+        return [analysis for analysis in results if analysis['recommended']]
+        
+    def get_match_features(self, odds_data, match, snapshot_version=None):
+        """Retorna as features de uma partida do feature store (partida, versão do snapshot)"""
+        features = self._get_feature_frame(odds_data, snapshot_version)
+        if match not in features.index:
             return None
+        return features.loc[match, self.feature_columns].to_dict()
+        
+    def _predict_confidences(self, features):
+        """Normaliza a matriz de features e retorna a probabilidade da classe positiva"""
+        with self._model_lock:
+            model, scaler = self.model, self.scaler
+            
+        features_scaled = scaler.transform(np.asarray(features, dtype=float))
+        return model.predict_proba(features_scaled)[:, 1]
+        
+    def _build_analysis(self, features, confidence, value_opportunities):
+        """Monta a análise detalhada de uma partida a partir das suas features"""
+        analysis = {
+            'confidence': float(confidence),
+            'recommended': bool(confidence >= self.min_confidence),
+            'features': {column: float(features[column]) for column in self.feature_columns},
+            'momentum': self._analyze_momentum(features),
+            'market_efficiency': self._analyze_market_efficiency(features),
+            'value_opportunities': value_opportunities,
+            'risk_assessment': self._assess_risk(features)
+        }
+        
+        # Adiciona insights
+        analysis['insights'] = self._generate_insights(analysis)
+        
+        return analysis
+        
+    def _get_feature_frame(self, odds_data, snapshot_version=None):
+        """Retorna as features do snapshot, reaproveitando o cache da mesma versão"""
+        if snapshot_version is not None and self._feature_cache['version'] == snapshot_version:
+            return self._feature_cache['frame']
+            
+        frame = self._build_feature_frame(odds_data)
+        if snapshot_version is not None:
+            self._feature_cache = {'version': snapshot_version, 'frame': frame}
+        return frame
+        
+    def _build_feature_frame(self, odds_data):
+        """Calcula as features de todas as partidas em uma única passada agrupada"""
+        frame = odds_data.groupby('Match', sort=False).agg(
+            first_odds=('Home_Odds', 'first'),
+            odds_value=('Home_Odds', 'last'),
+            home_max=('Home_Odds', 'max'),
+            home_min=('Home_Odds', 'min'),
+            away_max=('Away_Odds', 'max'),
+            away_min=('Away_Odds', 'min'),
+            volatility=('Home_Odds', 'std'),
+            liquidity=('Home_Odds', 'size')
+        )
+        
+        # Volatilidade de uma única cotação é zero
+        frame['volatility'] = frame['volatility'].fillna(0)
+        
+        # Eficiência do mercado (spread entre casas)
+        frame['home_spread'] = frame['home_max'] - frame['home_min']
+        frame['away_spread'] = frame['away_max'] - frame['away_min']
+        frame['market_efficiency'] = 1 - (frame['home_spread'] + frame['away_spread']) / 2
+        
+        # Momentum do mercado (variação entre a primeira e a última cotação)
+        change = (frame['odds_value'] - frame['first_odds']) / frame['first_odds']
+        frame['momentum_change'] = change.where(frame['liquidity'] >= 2, 0)
+        frame['momentum'] = frame['momentum_change'].abs()
+        
+        # Ratio valor/probabilidade
+        fair_odds = 1 / frame['odds_value']
+        frame['value_ratio'] = fair_odds / frame['odds_value'] - 1
+        
+        return frame
+        
+    def backtest_signals(self, history, results):
+        """Candidatos para o backtest: aposta no mandante com a confiança de um modelo walk-forward
+        
+        O modelo publicado não é usado, pois foi treinado com as mesmas partidas
+        do histórico. Cada janela de tempo recebe as confianças de um modelo
+        treinado só com as partidas encerradas antes dela (janela de treino
+        expansiva); linhas antes da primeira janela, ou de janelas sem dados de
+        treino suficientes, ficam sem candidato.
+        """
+        features = self._build_expanding_features(history)
+        matrix = features[self.feature_columns].to_numpy(dtype=float)
+        confidence = np.full(len(history), np.nan)
+        
+        for window, training_data in self._walk_forward_folds(history, results):
+            if training_data['result'].nunique() < 2:
+                continue  # Sem as duas classes não há o que treinar
+            model, scaler = self._fit(training_data)
+            confidence[window] = model.predict_proba(scaler.transform(matrix[window]))[:, 1]
+            
+        keep = ~np.isnan(confidence)
+        return pd.DataFrame({
+            'Timestamp': history['Timestamp'].to_numpy()[keep],
+            'Match': history['Match'].to_numpy()[keep],
+            'Side': 'home',
+            'Bookmaker': history['Bookmaker'].to_numpy()[keep],
+            'Odds': history['Home_Odds'].to_numpy(dtype=float)[keep],
+            'Probability': confidence[keep],
+            'Score': confidence[keep] - self.min_confidence,
+            'Volatility': features['volatility'].to_numpy()[keep]
+        })
+        
+    def _walk_forward_folds(self, history, results):
+        """Janelas do backtest (máscaras sobre o histórico) e o dataset de treino de cada uma
+        
+        Uma partida conta como encerrada GAME_DURATION depois da sua última
+        cotação. Os limites das janelas são quantis desses encerramentos, e o
+        treino de cada janela usa só as partidas encerradas até o seu início.
+        """
+        timestamps = pd.to_datetime(history['Timestamp'])
+        settled_at = timestamps.groupby(history['Match']).max() + GAME_DURATION
+        settled_at = settled_at[settled_at.index.isin(results['Match'])]
+        if settled_at.empty:
+            return
+            
+        bounds = list(settled_at.quantile(np.arange(1, self.backtest_folds + 1) / (self.backtest_folds + 1)))
+        for start, end in zip(bounds, bounds[1:] + [timestamps.max()]):
+            window = ((timestamps > start) & (timestamps <= end)).to_numpy()
+            if not window.any():
+                continue
+                
+            trained = settled_at.index[settled_at <= start]
+            yield window, self.build_training_set(
+                history[(timestamps <= start).to_numpy()], results[results['Match'].isin(trained)]
+            )
             
-    def _analyze_momentum(self, match_data):
+
+    def _build_expanding_features(self, history):
+        """Mesmas features de _build_feature_frame, acumuladas linha a linha (histórico em ordem temporal)"""
+        grouped = history.groupby('Match', sort=False)
+        home = history['Home_Odds'].astype(float)
+        count = grouped.cumcount() + 1
+        
+        # Desvio padrão acumulado a partir das somas de x e x²
+        sums = home.groupby(history['Match'], sort=False).cumsum()
+        squares = (home ** 2).groupby(history['Match'], sort=False).cumsum()
+        variance = ((squares - sums ** 2 / count) / (count - 1)).where(count >= 2, 0).clip(lower=0)
+        
+        home_spread = grouped['Home_Odds'].cummax() - grouped['Home_Odds'].cummin()
+        away_spread = grouped['Away_Odds'].cummax() - grouped['Away_Odds'].cummin()
+        
+        first_odds = grouped['Home_Odds'].transform('first')
+        momentum = ((home - first_odds) / first_odds).where(count >= 2, 0)
+        
+        return pd.DataFrame({
+            'odds_value': home,
+            'market_efficiency': 1 - (home_spread + away_spread) / 2,
+            'volatility': np.sqrt(variance),
+            'momentum': momentum.abs(),
+            'value_ratio': (1 / home) / home - 1
+        })
+        
+    def _analyze_momentum(self, features):
         """Analisa momentum do mercado"""
         try:
-            odds_series = match_data['Home_Odds'].values
-            if len(odds_series) < 2:
+            if features['liquidity'] < 2:
                 return {'trend': 'neutral', 'strength': 0}
                 
-            # Calcula variação percentual
-            momentum = (odds_series[-1] - odds_series[0]) / odds_series[0]
-            
-            # Determina força e direção
-            strength = abs(momentum)
-            trend = 'up' if momentum > 0 else 'down'
+            momentum = float(features['momentum_change'])
             
             return {
-                'trend': trend,
-                'strength': strength,
+                'trend': 'up' if momentum > 0 else 'down',
+                'strength': abs(momentum),
                 'recent_change': momentum
             }
             
@@ -147,20 +448,15 @@ class HolzhauerStrategy:
             logger.error(f"Erro ao analisar momentum: {e}")
             return {'trend': 'neutral', 'strength': 0}
             
-    def _analyze_market_efficiency(self, match_data):
+    def _analyze_market_efficiency(self, features):
         """Analisa eficiência do mercado"""
         try:
-            # Calcula spread entre casas
-            home_spread = match_data['Home_Odds'].max() - match_data['Home_Odds'].min()
-            away_spread = match_data['Away_Odds'].max() - match_data['Away_Odds'].min()
-            
-            # Calcula eficiência
-            efficiency = 1 - (home_spread + away_spread) / 2
+            efficiency = float(features['market_efficiency'])
             
             return {
                 'efficiency_score': efficiency,
-                'home_spread': home_spread,
-                'away_spread': away_spread,
+                'home_spread': float(features['home_spread']),
+                'away_spread': float(features['away_spread']),
                 'is_efficient': efficiency > self.efficiency_threshold
             }
             
@@ -168,47 +464,45 @@ class HolzhauerStrategy:
             logger.error(f"Erro ao analisar eficiência: {e}")
             return {'efficiency_score': 0, 'is_efficient': False}
             
-    def _find_value_opportunities(self, match_data):
-        """Encontra oportunidades de valor"""
+    def _find_value_opportunities(self, odds_data, snapshot_version=None):
+        """Encontra oportunidades de valor de todas as partidas nas melhores cotações de cada lado"""
         try:
-            opportunities = []
-            
-            # Analisa cada casa de apostas
-            for _, row in match_data.iterrows():
-                # Calcula valor esperado
-                home_ev = self._calculate_ev(row['Home_Odds'], 'home')
-                away_ev = self._calculate_ev(row['Away_Odds'], 'away')
-                
-                if home_ev > self.value_threshold:
-                    opportunities.append({
-                        'type': 'home',
-                        'odds': row['Home_Odds'],
-                        'ev': home_ev,
-                        'bookmaker': row['Bookmaker']
-                    })
-                    
-                if away_ev > self.value_threshold:
-                    opportunities.append({
-                        'type': 'away',
-                        'odds': row['Away_Odds'],
-                        'ev': away_ev,
-                        'bookmaker': row['Bookmaker']
-                    })
+            best_prices = self._price_index(odds_data, snapshot_version)
+            
+            opportunities = {}
+            for match in best_prices.live_matches:
+                # EV das k melhores cotações de cada lado, consultadas no índice
+                candidates = [
+                    {'type': side, 'odds': odds, 'ev': float(self._calculate_ev(odds, side)), 'bookmaker': bookmaker}
+                    for side in ('home', 'away')
+                    for odds, bookmaker in best_prices.top_k(match, side)
+                ]
+                candidates = [candidate for candidate in candidates if candidate['ev'] > self.value_threshold]
+                if candidates:
+                    opportunities[match] = sorted(candidates, key=lambda x: x['ev'], reverse=True)
                     
-            return sorted(opportunities, key=lambda x: x['ev'], reverse=True)
+            return opportunities
             
         except Exception as e:
             logger.error(f"Erro ao encontrar oportunidades: {e}")
-            return []
+            return {}
+            
+    def _price_index(self, odds_data, snapshot_version=None):
+        """Índice de melhores preços das cotações: o da coleta, se estiver no mesmo snapshot, ou um montado na hora"""
+        if (self.best_prices is not None and snapshot_version is not None
+                and self.best_prices.snapshot_version == snapshot_version):
+            return self.best_prices
             
-    def _assess_risk(self, match_data):
+        best_prices = BestPriceIndex()
+        best_prices.on_snapshot(odds_data, snapshot_version)
+        return best_prices
+        
+    def _assess_risk(self, features):
         """Avalia risco da operação"""
         try:
-            # Calcula volatilidade
-            volatility = match_data['Home_Odds'].std()
-            
-            # Analisa liquidez
-            liquidity = len(match_data)  # Número de casas oferecendo odds
+            # Volatilidade e liquidez (número de casas oferecendo odds)
+            volatility = float(features['volatility'])
+            liquidity = int(features['liquidity'])
             
             # Calcula score de risco
             risk_score = (volatility * 0.6) + ((1/liquidity) * 0.4)
@@ -279,90 +573,208 @@ class HolzhauerStrategy:
             return 0
             
     def _load_model(self):
-        """Carrega ou cria novo modelo"""
+        """Carrega o modelo exportado, o modelo do joblib ou cria novo modelo"""
+        try:
+            if self._is_compiled_current(self.compiled_model_file, self.model_file):
+                return CompiledForest.load(self.compiled_model_file)
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo exportado: {e}")
+            
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        
         try:
             if os.path.exists(self.model_file):
-                return joblib.load(self.model_file)
+                model = joblib.load(self.model_file)
+                self._export_model(model)
+                return model
             return RandomForestClassifier(n_estimators=100, max_depth=10)
         except Exception as e:
             logger.error(f"Erro ao carregar modelo: {e}")
             return RandomForestClassifier(n_estimators=100, max_depth=10)
             
     def _load_scaler(self):
-        """Carrega ou cria novo scaler"""
+        """Carrega o scaler exportado, o scaler do joblib ou cria novo scaler"""
+        try:
+            if self._is_compiled_current(self.compiled_scaler_file, self.scaler_file):
+                return CompiledScaler.load(self.compiled_scaler_file)
+        except Exception as e:
+            logger.error(f"Erro ao carregar scaler exportado: {e}")
+            
+        import joblib
+        from sklearn.preprocessing import StandardScaler
+        
         try:
             if os.path.exists(self.scaler_file):
-                return joblib.load(self.scaler_file)
+                scaler = joblib.load(self.scaler_file)
+                self._export_scaler(scaler)
+                return scaler
             return StandardScaler()
         except Exception as e:
             logger.error(f"Erro ao carregar scaler: {e}")
             return StandardScaler()
-
-    def _extract_features(self, match_data):
-        """Extrai features relevantes para análise"""
-        try:
-            # Valor das odds
-            odds_value = match_data['Home_Odds'].values[-1]
-            
-            # Eficiência do mercado (spread entre casas)
-            market_efficiency = self._analyze_market_efficiency(match_data)
-            
-            # Volatilidade histórica
-            volatility = self._calculate_volatility(match_data)
-            
-            # Momentum do mercado
-            momentum = self._analyze_momentum(match_data)
-            
-            # Ratio valor/probabilidade
-            value_ratio = self._calculate_value_ratio(match_data)
             
-            return [odds_value, market_efficiency['efficiency_score'], volatility, momentum['strength'], value_ratio]
-            
-        except Exception as e:
-            logger.error(f"Erro ao extrair features: {e}")
-            return None
-    
-    def _calculate_volatility(self, match_data):
-        """Calcula volatilidade histórica"""
+    def _is_compiled_current(self, compiled_file, source_file):
+        """Verifica se a versão exportada existe e não é mais antiga que o joblib"""
+        if not os.path.exists(compiled_file):
+            return False
+        if not os.path.exists(source_file):
+            return True
+        return os.path.getmtime(compiled_file) >= os.path.getmtime(source_file)
+        
+    def _export_model(self, model):
+        """Exporta o Random Forest treinado para arrays NumPy"""
         try:
-            return match_data['Home_Odds'].std()
-        except:
-            return 0
-    
-    def _calculate_value_ratio(self, match_data):
-        """Calcula ratio valor/probabilidade"""
+            CompiledForest.from_sklearn(model).save(self.compiled_model_file)
+        except Exception as e:
+            logger.error(f"Erro ao exportar modelo: {e}")
+            
+    def _export_scaler(self, scaler):
+        """Exporta média e escala do scaler ajustado"""
         try:
-            implied_prob = 1 / match_data['Home_Odds'].values[-1]
-            fair_odds = 1 / match_data['Home_Odds'].values[-1]
-            return (fair_odds / match_data['Home_Odds'].values[-1]) - 1
-        except:
-            return 0
-    
+            CompiledScaler.from_sklearn(scaler).save(self.compiled_scaler_file)
+        except Exception as e:
+            logger.error(f"Erro ao exportar scaler: {e}")
+
+    def build_training_set(self, history, results):
+        """Monta o dataset de treino: features do último snapshot de cada partida encerrada e o resultado
+        
+        As features saem de _build_feature_frame sobre as cotações de um único
+        snapshot (uma linha por casa), como na inferência, e não sobre o
+        histórico inteiro da partida.
+        """
+        settled = results.drop_duplicates('Match', keep='last').set_index('Match')['Home_Won']
+        history = history[history['Match'].isin(settled.index)]
+        if history.empty:
+            return pd.DataFrame(columns=self.feature_columns + ['result'])
+            
+        if 'Timestamp' in history.columns:
+            # Cotações da última coleta de cada partida
+            timestamps = pd.to_datetime(history['Timestamp'])
+            history = history[timestamps == timestamps.groupby(history['Match']).transform('max')]
+            
+        training_data = self._build_feature_frame(history)[self.feature_columns]
+        training_data['result'] = settled.reindex(training_data.index).astype(int).to_numpy()
+        return training_data.reset_index(drop=True)
+        
     def train_model(self, training_data):
-        """Treina o modelo com novos dados"""
+        """Treina o modelo com novos dados e publica uma nova versão"""
         try:
-            X = training_data[['odds_value', 'market_efficiency', 'volatility', 
-                             'momentum', 'value_ratio']]
-            y = training_data['result']
+            model, scaler = self._fit(training_data)
             
-            # Atualiza scaler
-            self.scaler.fit(X)
-            X_scaled = self.scaler.transform(X)
+            # Publica a versão e troca o modelo em uso
+            self._publish_model(model, scaler, {'samples': len(training_data)})
+            self.refresh_model()
             
-            # Treina modelo
-            self.model.fit(X_scaled, y)
-            
-            # Salva modelo e scaler
-            joblib.dump(self.model, self.model_file)
-            joblib.dump(self.scaler, self.scaler_file)
-            
-            logger.info("Modelo treinado e salvo com sucesso")
+            logger.info(f"Modelo treinado e salvo com sucesso (versão {self.model_version})")
             return True
             
         except Exception as e:
             logger.error(f"Erro ao treinar modelo: {e}")
             return False
+            
+    def _fit(self, training_data):
+        """Ajusta scaler e floresta novos com o dataset, sem publicar"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+        
+        X = training_data[self.feature_columns].to_numpy(dtype=float)
+        y = training_data['result']
+        
+        # Estimadores novos: o modelo em uso continua servindo até a troca
+        scaler = StandardScaler()
+        model = RandomForestClassifier(n_estimators=100, max_depth=10)
+        
+        # Atualiza scaler
+        scaler.fit(X)
+        X_scaled = scaler.transform(X)
+        
+        # Treina modelo
+        model.fit(X_scaled, y)
+        return model, scaler
+        
+    def _publish_model(self, model, scaler, metadata):
+        """Grava os artefatos em um diretório de versão novo e atualiza o ponteiro de forma atômica"""
+        os.makedirs(self.models_dir, exist_ok=True)
+        
+        # Uma publicação por vez entre processos: versão, ponteiro e limpeza das antigas
+        with open(os.path.join(self.models_dir, '.publish.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return self._write_version(model, scaler, metadata)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+                
+    def _write_version(self, model, scaler, metadata):
+        """Grava a versão e troca o ponteiro; exige a trava de publicação"""
+        import joblib
+        
+        version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        version_dir = os.path.join(self.models_dir, version)
+        tmp_dir = os.path.join(self.models_dir, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir)
+        
+        metadata = {'version': version, 'trained_at': datetime.now().isoformat(), **metadata}
+        
+        # Artefatos completos ficam prontos antes de o diretório da versão existir
+        joblib.dump(model, os.path.join(tmp_dir, 'model.joblib'))
+        joblib.dump(scaler, os.path.join(tmp_dir, 'scaler.joblib'))
+        CompiledForest.from_sklearn(model).save(os.path.join(tmp_dir, 'model.npz'))
+        CompiledScaler.from_sklearn(scaler).save(os.path.join(tmp_dir, 'scaler.npz'))
+        with open(os.path.join(tmp_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_dir, version_dir)
+        
+        # O ponteiro só muda depois que a versão está completa em disco
+        tmp_file = f"{self.current_model_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_file, self.current_model_file)
+        
+        self._remove_old_versions(keep=version)
+        return version
+        
+    def _remove_old_versions(self, keep):
+        """Remove versões antigas, mantendo as MODEL_VERSIONS_KEPT mais recentes"""
+        try:
+            versions = sorted(
+                name for name in os.listdir(self.models_dir)
+                if not name.startswith('.') and os.path.isdir(os.path.join(self.models_dir, name))
+            )
+            for name in versions[:-MODEL_VERSIONS_KEPT]:
+                if name != keep:
+                    shutil.rmtree(os.path.join(self.models_dir, name), ignore_errors=True)
+                    
+        except Exception as e:
+            logger.error(f"Erro ao remover versões antigas do modelo: {e}")
     
+    def is_healthy(self):
+        """Health check para monitoramento (não força o carregamento do modelo)"""
+        return True
+
+    def analyze_quarter_stats(self, player_name, quarter, game_situation, projection=None):
+        """Média, confiança e tendência de um quarter do jogador a partir da projeção simulada do jogo"""
+        try:
+            quarter_projection = (projection or {}).get('quarters', {}).get(f'q{quarter}')
+            if not quarter_projection:
+                # Quarter já jogado ou jogador sem projeção
+                return {'average': None, 'confidence': 0.0, 'trend': 'estável'}
+
+            # Confiança cai com a dispersão das simulações (coeficiente de variação)
+            mean, std = quarter_projection['mean'], quarter_projection['std']
+            confidence = 1 / (1 + std / mean) if mean > 0 else 0.0
+
+            return {
+                'average': mean,
+                'confidence': confidence,
+                'trend': quarter_projection['trend'],
+                'range': (quarter_projection['p10'], quarter_projection['p90'])
+            }
+
+        except Exception as e:
+            logger.error(f"Erro ao analisar quarter {quarter} de {player_name}: {e}")
+            return {'average': None, 'confidence': 0.0, 'trend': 'estável'}
+
     def get_strategy_insights(self, opportunity):
         """Gera insights detalhados sobre a oportunidade"""
         try:
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from config import BOOKMAKER_WEIGHTS_FILE
+
+logger = logging.getLogger(__name__)
+
+class MarketConsensus:
+    """Consenso de mercado com casas ponderadas pela precisão na linha de fechamento
+
+    Cada cotação é convertida em probabilidade sem margem (devig). O preço
+    justo de cada mercado é a média ponderada dessas probabilidades, com pesos
+    por casa calculados a partir do erro histórico contra o consenso de
+    fechamento; casas cujo preço supera o justo por mais de
+    `outlier_threshold` são marcadas como fora do consenso.
+    """
+
+    def __init__(self, weights_file=BOOKMAKER_WEIGHTS_FILE, outlier_threshold=0.03):
+        self.weights_file = weights_file
+        self.outlier_threshold = outlier_threshold
+        self.weights = {}  # casa -> peso (média 1; casas sem histórico pesam 1)
+        self._weights_mtime = None
+        self._cache = {'version': None, 'result': None}
+
+    def compute(self, odds_data, snapshot_version=None):
+        """Preço justo ponderado de todos os mercados do snapshot e casas fora do consenso"""
+        try:
+            self._load_weights()
+            if snapshot_version is not None and self._cache['version'] == snapshot_version:
+                return self._cache['result']
+
+            match_codes, matches = pd.factorize(odds_data['Match'])
+            bookmaker_codes, bookmakers = pd.factorize(odds_data['Bookmaker'])
+            home_odds = odds_data['Home_Odds'].to_numpy(dtype=float)
+            away_odds = odds_data['Away_Odds'].to_numpy(dtype=float)
+
+            # Probabilidade do mandante sem a margem da casa
+            home_prob = self._devig(home_odds, away_odds)
+            weights = np.array([self.weights.get(name, 1.0) for name in bookmakers])[bookmaker_codes]
+
+            # Médias ponderadas por mercado em uma passada (bincount pelos códigos das partidas)
+            markets = len(matches)
+            weight_sum = np.bincount(match_codes, weights, markets)
+            fair_prob = np.bincount(match_codes, weights * home_prob, markets) / weight_sum
+            deviation = home_prob - fair_prob[match_codes]
+            dispersion = np.sqrt(np.bincount(match_codes, weights * deviation ** 2, markets) / weight_sum)
+
+            consensus = pd.DataFrame({
+                'Match': matches,
+                'Fair_Home_Prob': fair_prob,
+                'Fair_Home_Odds': 1 / fair_prob,
+                'Fair_Away_Odds': 1 / (1 - fair_prob),
+                'Dispersion': dispersion,
+                'Bookmakers': np.bincount(match_codes, minlength=markets)
+            })
+
+            # Casas pagando acima do preço justo (valor esperado positivo contra o consenso)
+            outliers = pd.concat([
+                pd.DataFrame({
+                    'Match': matches[match_codes],
+                    'Bookmaker': bookmakers[bookmaker_codes],
+                    'Side': side,
+                    'Odds': odds,
+                    'Fair_Odds': 1 / prob,
+                    'Edge': odds * prob - 1
+                })
+                for side, odds, prob in (
+                    ('home', home_odds, fair_prob[match_codes]),
+                    ('away', away_odds, 1 - fair_prob[match_codes])
+                )
+            ])
+            outliers = outliers[outliers['Edge'] > self.outlier_threshold]
+            outliers = outliers.sort_values('Edge', ascending=False).reset_index(drop=True)
+
+            result = {'markets': consensus, 'outliers': outliers}
+            if snapshot_version is not None:
+                self._cache = {'version': snapshot_version, 'result': result}
+            return result
+
+        except Exception as e:
+            logger.error(f"Erro ao calcular consenso de mercado: {e}")
+            return {'markets': pd.DataFrame(), 'outliers': pd.DataFrame()}
+
+    def update_weights(self, history):
+        """Recalcula os pesos pelo erro de cada casa contra o consenso de fechamento de cada partida"""
+        try:
+            home_prob = self._devig(history['Home_Odds'].to_numpy(dtype=float), history['Away_Odds'].to_numpy(dtype=float))
+            timestamps = pd.to_datetime(history['Timestamp'])
+            closing_time = timestamps.groupby(history['Match']).transform('max')
+            is_closing = (timestamps == closing_time).to_numpy()
+
+            # Consenso de fechamento: média das casas no último snapshot de cada partida
+            closing_prob = pd.Series(home_prob[is_closing]).groupby(history['Match'].to_numpy()[is_closing]).mean()
+            target = history['Match'].map(closing_prob).to_numpy(dtype=float)
+
+            # Erro quadrático médio das cotações anteriores ao fechamento, por casa
+            errors = pd.Series((home_prob - target) ** 2)[~is_closing]
+            mse = errors.groupby(history['Bookmaker'].to_numpy()[~is_closing]).mean()
+            if mse.empty:
+                return self.weights
+
+            weights = 1 / (mse + 1e-6)
+            weights = weights / weights.mean()
+            self.weights = {name: float(weight) for name, weight in weights.items()}
+            self._save_weights()
+
+            logger.info(f"Pesos de {len(self.weights)} casas atualizados")
+            return self.weights
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar pesos das casas: {e}")
+            return self.weights
+
+    def _devig(self, home_odds, away_odds):
+        """Probabilidade do mandante com a margem removida proporcionalmente"""
+        home_implied = 1 / home_odds
+        return home_implied / (home_implied + 1 / away_odds)
+
+    def _load_weights(self):
+        """Recarrega os pesos do arquivo quando ele muda"""
+        try:
+            mtime = os.stat(self.weights_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._weights_mtime:
+            return
+
+        with open(self.weights_file, encoding='utf-8') as f:
+            self.weights = json.load(f)
+        self._weights_mtime = mtime
+        self._cache = {'version': None, 'result': None}
+
+    def _save_weights(self):
+        """Grava os pesos de forma atômica"""
+        tmp_file = f"{self.weights_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.weights, f, ensure_ascii=False)
+        os.replace(tmp_file, self.weights_file)
@@ -0,0 +1,142 @@
+import fcntl
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import pandas as pd
+from config import ODDS_HISTORY_FILE, RESULTS_FILE, RETRAIN_INTERVAL, MIN_NEW_RESULTS, MODELS_DIR
+
+logger = logging.getLogger(__name__)
+
+def train_job(history_file=ODDS_HISTORY_FILE, results_file=RESULTS_FILE, min_new_results=MIN_NEW_RESULTS):
+    """Monta o dataset com o histórico e os resultados encerrados, retreina do zero e publica uma nova versão"""
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    with open(os.path.join(MODELS_DIR, '.train.lock'), 'a') as lock:
+        # Um job por vez: se outro processo já está treinando, este não repete o ajuste
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Outro job de treino em andamento, pulando")
+            return None
+
+        try:
+            return _train(history_file, results_file, min_new_results)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _train(history_file, results_file, min_new_results):
+    """Executa o job de treino; exige a trava de treino"""
+    from holzhauer_strategy import HolzhauerStrategy
+    from market_consensus import MarketConsensus
+
+    try:
+        if not os.path.exists(history_file):
+            logger.info("Sem histórico para treinar o modelo")
+            return None
+
+        history = pd.read_csv(history_file)
+        if not {'Timestamp', 'Match', 'Bookmaker', 'Home_Odds', 'Away_Odds'}.issubset(history.columns):
+            logger.info("Histórico sem cotações no formato da coleta")
+            return None
+
+        # Pesos das casas no consenso acompanham o histórico mais recente
+        MarketConsensus().update_weights(history)
+
+        if not os.path.exists(results_file):
+            logger.info("Sem resultados encerrados para treinar o modelo")
+            return None
+
+        strategy = HolzhauerStrategy()
+        training_data = strategy.build_training_set(history, pd.read_csv(results_file))
+
+        # Só retreina quando há resultados novos desde a versão publicada
+        strategy.refresh_model()
+        new_results = len(training_data) - strategy.model_metadata.get('samples', 0)
+        if new_results < min_new_results:
+            logger.info(f"Apenas {new_results} resultados novos, retreino adiado")
+            return None
+
+        if training_data['result'].nunique() < 2:
+            logger.info("Resultados de uma única classe, retreino adiado")
+            return None
+
+        if strategy.train_model(training_data):
+            return strategy.model_version
+        return None
+
+    except Exception as e:
+        logger.error(f"Erro no job de treino: {e}")
+        return None
+
+class ModelTrainer:
+    """Agenda o retreino do modelo Holzhauer em um processo Python separado
+
+    O job roda fora do processo web, ajusta scaler e floresta do zero com o
+    dataset completo, grava uma nova versão dos artefatos e atualiza o
+    ponteiro da versão atual; cada HolzhauerStrategy troca de modelo sozinha
+    ao ver o ponteiro mudar. Deve haver um único agendamento por instalação:
+    o processo de estado no modo compartilhado, o master do gunicorn no modo
+    local (start_detached) ou o próprio servidor quando roda sozinho.
+    """
+
+    def __init__(self, interval=RETRAIN_INTERVAL):
+        self.interval = interval
+        self.is_running = False
+        self.training_thread = None
+        self.process = None
+
+    def start(self):
+        """Inicia o agendamento do retreino em uma thread"""
+        if not self.is_running:
+            self.is_running = True
+            self.training_thread = threading.Thread(target=self._training_loop, daemon=True)
+            self.training_thread.start()
+            logger.info("Iniciou agendamento de retreino do modelo")
+
+    def start_detached(self):
+        """Inicia o agendamento em um processo próprio, sem threads no processo atual
+
+        Para processos que fazem fork depois, como o master do gunicorn.
+        """
+        if self.process and self.process.poll() is None:
+            return
+
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--loop', str(self.interval)], cwd=base_dir
+        )
+        logger.info(f"Iniciou agendamento de retreino do modelo (pid {self.process.pid})")
+
+    def stop(self):
+        """Para o agendamento e o job em andamento"""
+        self.is_running = False
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            logger.info("Parou job de treino")
+
+    def run_once(self):
+        """Executa um job de treino em processo separado e espera terminar"""
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__)], cwd=base_dir)
+        return self.process.wait() == 0
+
+    def _training_loop(self):
+        """Loop do agendamento: um job a cada intervalo"""
+        while self.is_running:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erro ao executar job de treino: {e}")
+            time.sleep(self.interval)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 2 and sys.argv[1] == '--loop':
+        # Agendamento destacado: um job a cada intervalo, neste mesmo processo
+        while True:
+            train_job()
+            time.sleep(int(sys.argv[2]))
+    else:
+        train_job()
@@ -3,10 +3,19 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 from config import DATA_DIR
+from trend_utils import ols_slope, ols_slopes
 import os
 
 logger = logging.getLogger(__name__)
 
+# Estatísticas de jogador usadas na análise em lote da rodada
+PLAYER_STAT_COLUMNS = {
+    'pts_per_game', 'min_per_game', 'plus_minus', 'usage_rate',
+    'last_5_games_rating', 'season_rating', 'vs_opponent_rating',
+    'height_advantage', 'speed_advantage', 'historical_advantage', 'style_advantage',
+    'minutes_last_game', 'is_back_to_back', 'last_5_games_minutes', 'days_rest'
+}
+
 class NBAAnalyzer:
     def __init__(self):
         self.quarter_patterns = {
@@ -30,168 +39,331 @@ class NBAAnalyzer:
             'playoff': 1.2
         }
         
+        self.score_weights = {
+            'quarters': 0.2,
+            'players': 0.3,
+            'matchups': 0.2,
+            'situation': 0.15,
+            'momentum': 0.15
+        }
+        
     def analyze_game(self, game_data, player_stats, team_stats):
-        """Análise completa do jogo usando estratégia Holzhauer"""
-        try:
-            analysis = {
-                'quarter_analysis': self._analyze_quarters(game_data),
-                'player_analysis': self._analyze_key_players(player_stats),
-                'matchup_analysis': self._analyze_matchups(team_stats),
-                'situation_analysis': self._analyze_situation(game_data),
-                'momentum_factors': self._analyze_momentum(game_data)
-            }
-            
-            # Calcula score final
-            analysis['holzhauer_score'] = self._calculate_holzhauer_score(analysis)
-            
-            # Gera recomendações
-            analysis['recommendations'] = self._generate_recommendations(analysis)
-            
-            return analysis
+        """Análise completa do jogo usando estratégia Holzhauer (uma rodada de um jogo só)"""
+        results = self.analyze_slate(self.build_slate([(game_data, player_stats, team_stats)]))
+        return results[0] if results else None
             
-        except Exception as e:
-            logger.error(f"Erro na análise do jogo: {e}")
-            return None
-            
-    def _analyze_quarters(self, game_data):
-        """Analisa padrões por quarter"""
-        try:
-            quarter_stats = {}
-            
-            for quarter, params in self.quarter_patterns.items():
-                stats = {
-                    'avg_points': np.mean(game_data[f'{quarter}_points']),
-                    'variance': np.std(game_data[f'{quarter}_points']),
-                    'trend': self._calculate_trend(game_data[f'{quarter}_points']),
-                    'weight': params['weight']
-                }
-                
-                # Identifica padrões específicos
-                stats['patterns'] = {
-                    'slow_start': stats['avg_points'] < 25,
-                    'strong_finish': stats['avg_points'] > 30,
-                    'consistent': stats['variance'] < params['variance']
-                }
-                
-                quarter_stats[quarter] = stats
-                
-            return quarter_stats
-            
-        except Exception as e:
-            logger.error(f"Erro na análise de quarters: {e}")
-            return {}
-            
-    def _analyze_key_players(self, player_stats):
-        """Analisa desempenho dos jogadores chave"""
+    def analyze_slate(self, slate):
+        """Análise de todos os jogos da noite de uma vez, a partir das colunas montadas por build_slate
+
+        Estatísticas e tendências por quarter, impacto/forma/fadiga dos
+        jogadores, fatores situacionais, momentum das equipes e o score
+        Holzhauer saem de operações sobre arrays com todos os jogos; só os
+        confrontos e os detalhes de momentum, que dependem de listas de jogos
+        e titulares, são analisados jogo a jogo. Retorna uma análise por jogo.
+        Dados ausentes contam campo a campo: um jogo sem `is_playoff` ainda
+        recebe os demais fatores situacionais.
+        """
         try:
-            player_analysis = {}
-            
-            for player, stats in player_stats.items():
-                # Calcula impacto do jogador
-                impact_category = self._determine_player_impact(stats)
-                impact_factor = self.player_impact[impact_category]
-                
+            games = len(slate['game_ids'])
+            quarter_analysis, quarter_score = self._slate_quarters(slate['quarters'], slate['has_quarters'])
+            player_analysis, player_score = self._slate_players(slate['players'], games)
+            situation_analysis, situation_score = self._slate_situation(slate['situation'])
+            team_momentum = self._slate_team_momentum(slate['last_10_wins'])
+            recent_games = self._slate_recent_games(slate['recent_games'])
+            head_to_head = self._slate_head_to_head(slate['head_to_head'])
+            scores = self._combine_scores(quarter_score, player_score, situation_score, team_momentum)
+
+            results = []
+            for i, (game_data, team_stats) in enumerate(zip(slate['game_data'], slate['team_stats'])):
                 analysis = {
-                    'impact_category': impact_category,
-                    'impact_factor': impact_factor,
-                    'form_rating': self._calculate_form(stats),
-                    'matchup_advantage': self._calculate_matchup_advantage(stats),
-                    'fatigue_factor': self._calculate_fatigue(stats)
+                    'quarter_analysis': quarter_analysis[i],
+                    'player_analysis': player_analysis[i],
+                    'matchup_analysis': {
+                        'pace_advantage': self._calculate_pace_advantage(team_stats),
+                        'style_matchup': self._analyze_style_matchup(team_stats),
+                        'historical_matchup': head_to_head[i] if head_to_head[i] is not None else self._analyze_historical_matchup(team_stats),
+                        'key_battles': self._identify_key_battles(team_stats)
+                    },
+                    'situation_analysis': situation_analysis[i],
+                    'momentum_factors': {
+                        'team_momentum': float(team_momentum[i]),
+                        'player_momentum': self._calculate_player_momentum(game_data),
+                        'recent_performance': recent_games[i] if recent_games[i] is not None else self._analyze_recent_games(game_data),
+                        'momentum_shifts': self._identify_momentum_shifts(game_data)
+                    },
+                    'holzhauer_score': float(scores[i])
                 }
-                
-                player_analysis[player] = analysis
-                
-            return player_analysis
+                analysis['recommendations'] = self._generate_recommendations(analysis)
+                results.append(analysis)
+            return results
             
         except Exception as e:
-            logger.error(f"Erro na análise de jogadores: {e}")
-            return {}
-            
-    def _analyze_matchups(self, team_stats):
-        """Analisa confrontos específicos"""
-        try:
-            return {
-                'pace_advantage': self._calculate_pace_advantage(team_stats),
-                'style_matchup': self._analyze_style_matchup(team_stats),
-                'historical_matchup': self._analyze_historical_matchup(team_stats),
-                'key_battles': self._identify_key_battles(team_stats)
-            }
-        except Exception as e:
-            logger.error(f"Erro na análise de confrontos: {e}")
-            return {}
-            
-    def _analyze_situation(self, game_data):
-        """Analisa fatores situacionais"""
-        try:
-            situation = {}
-            
-            # Analisa vantagem de casa
-            if game_data['is_home']:
-                situation['home_factor'] = self.situation_factors['home_court']
-            
-            # Analisa calendário
-            if game_data['back_to_back']:
-                situation['schedule_factor'] = self.situation_factors['back_to_back']
-            elif game_data['rest_days'] >= 2:
-                situation['schedule_factor'] = self.situation_factors['rest_advantage']
-            
-            # Analisa importância do jogo
-            if game_data['is_playoff']:
-                situation['importance_factor'] = self.situation_factors['playoff']
-            
-            return situation
-            
-        except Exception as e:
-            logger.error(f"Erro na análise situacional: {e}")
-            return {}
-            
-    def _analyze_momentum(self, game_data):
-        """Analisa fatores de momentum"""
-        try:
-            return {
-                'team_momentum': self._calculate_team_momentum(game_data),
-                'player_momentum': self._calculate_player_momentum(game_data),
-                'recent_performance': self._analyze_recent_games(game_data),
-                'momentum_shifts': self._identify_momentum_shifts(game_data)
-            }
-        except Exception as e:
-            logger.error(f"Erro na análise de momentum: {e}")
-            return {}
+            logger.error(f"Erro na análise da rodada: {e}")
+            return []
             
-    def _calculate_holzhauer_score(self, analysis):
-        """Calcula score final baseado na estratégia Holzhauer"""
-        try:
-            score = 0
-            weights = {
-                'quarters': 0.2,
-                'players': 0.3,
-                'matchups': 0.2,
-                'situation': 0.15,
-                'momentum': 0.15
+    def build_slate(self, games):
+        """Colunas da rodada a partir de (game_data, player_stats, team_stats) de cada jogo
+
+        Séries de tamanhos diferentes são completadas com NaN no final.
+        """
+        games = list(games)
+        game_data = [game[0] or {} for game in games]
+        
+        def padded(series_list, width=None):
+            width = max((len(series) for series in series_list), default=0) if width is None else width
+            values = np.full((len(series_list), width), np.nan)
+            for row, series in enumerate(series_list):
+                values[row, :len(series)] = series
+            return values
+        
+        # Jogos sem a série de algum quarter ficam sem análise por quarter
+        has_quarters = np.array([all(f'{quarter}_points' in data for quarter in self.quarter_patterns) for data in game_data], dtype=bool)
+        series = {
+            quarter: [
+                np.asarray(data[f'{quarter}_points'], dtype=float) if has else np.zeros(0)
+                for data, has in zip(game_data, has_quarters)
+            ]
+            for quarter in self.quarter_patterns
+        }
+        width = max((len(values) for quarter_series in series.values() for values in quarter_series), default=0)
+        quarters = {quarter: padded(quarter_series, width) for quarter, quarter_series in series.items()}
+        
+        players = [
+            (row, player, stats)
+            for row, (_, player_stats, _) in enumerate(games)
+            for player, stats in (player_stats or {}).items()
+        ]
+        player_columns = {stat for _, _, stats in players for stat in stats}
+        
+        return {
+            'game_ids': [data.get('id', row) for row, data in enumerate(game_data)],
+            'quarters': quarters,
+            'has_quarters': has_quarters,
+            'players': {
+                'game': np.array([row for row, _, _ in players], dtype=int),
+                'name': [player for _, player, _ in players],
+                **{
+                    stat: np.array([stats.get(stat, np.nan) for _, _, stats in players], dtype=float)
+                    for stat in player_columns & PLAYER_STAT_COLUMNS
+                }
+            },
+            'situation': {
+                column: np.array([data.get(column, np.nan) for data in game_data], dtype=float)
+                for column in ('is_home', 'back_to_back', 'rest_days', 'is_playoff')
+            },
+            'last_10_wins': padded([[game['win'] for game in data.get('last_10_games', [])] for data in game_data]),
+            'recent_games': self._series_columns(
+                [data.get('last_5_games') for data in game_data], ('win', 'points', 'margin'), padded
+            ),
+            'head_to_head': self._series_columns(
+                [(stats or {}).get('head_to_head') for _, _, stats in games], ('winner', 'point_diff'), padded
+            ),
+            'game_data': game_data,
+            'team_stats': [game[2] or {} for game in games]
+        }
+        
+    def _series_columns(self, series_list, fields, padded):
+        """Colunas (com NaN no final) de listas de jogos; válidas só as listas com todos os campos"""
+        valid = np.array([
+            isinstance(series, list) and all(isinstance(game, dict) and all(field in game for field in fields) for game in series)
+            for series in series_list
+        ], dtype=bool)
+        series_list = [series if is_valid else [] for series, is_valid in zip(series_list, valid)]
+        columns = {
+            field: padded([[game[field] for game in series] for series in series_list])
+            for field in fields if field != 'winner'
+        }
+        if 'winner' in fields:
+            columns['home_wins'] = np.array([sum(1 for game in series if game['winner'] == 'home') for series in series_list])
+        return {'valid': valid, 'counts': np.array([len(series) for series in series_list]), **columns}
+        
+    def _slate_quarters(self, quarters, has_quarters):
+        """Médias, desvios, tendências e padrões de cada quarter de todos os jogos"""
+        games = len(has_quarters)
+        quarter_analysis = [{} for _ in range(games)]
+        if not has_quarters.any():
+            return quarter_analysis, np.zeros(games)
+        
+        names = list(quarters)
+        values = np.stack([quarters[quarter] for quarter in names], axis=1)  # jogos x quarters x jogos anteriores
+        means = self._row_means(values)
+        stds = np.sqrt(self._row_means((values - means[..., None]) ** 2))
+        slopes = ols_slopes(values.reshape(-1, values.shape[2])).reshape(means.shape)
+        weights = np.array([self.quarter_patterns[quarter]['weight'] for quarter in names])
+        variances = np.array([self.quarter_patterns[quarter]['variance'] for quarter in names])
+        
+        for i in np.flatnonzero(has_quarters):
+            for j, quarter in enumerate(names):
+                avg_points, variance = float(means[i, j]), float(stds[i, j])
+                quarter_analysis[i][quarter] = {
+                    'avg_points': avg_points,
+                    'variance': variance,
+                    'trend': self._trend_result(slopes[i, j]),
+                    'weight': float(weights[j]),
+                    'patterns': {
+                        'slow_start': avg_points < 25,
+                        'strong_finish': avg_points > 30,
+                        'consistent': bool(variance < variances[j])
+                    }
+                }
+        
+        return quarter_analysis, np.where(has_quarters, np.mean(means * weights, axis=1), 0)
+        
+    def _slate_players(self, players, games):
+        """Impacto, forma, vantagem e fadiga de todos os jogadores da rodada"""
+        player_analysis = [{} for _ in range(games)]
+        rows = players['game']
+        if not len(rows):
+            return player_analysis, np.zeros(games)
+        
+        def column(stat, default=np.nan):
+            return np.nan_to_num(players.get(stat, np.full(len(rows), default)), nan=default)
+        
+        # Categoria de impacto; sem as estatísticas, 'rotation'
+        impact_score = (
+            players.get('pts_per_game', np.nan) * 0.4 +
+            players.get('min_per_game', np.nan) * 0.2 +
+            players.get('plus_minus', np.nan) * 0.2 +
+            players.get('usage_rate', np.nan) * 0.2
+        ) * np.ones(len(rows))
+        categories = np.select(
+            [impact_score > 25, impact_score > 20, impact_score > 15],
+            ['superstar', 'star', 'starter'],
+            'rotation'
+        )
+        impact_factor = np.vectorize(self.player_impact.get, otypes=[float])(categories)
+        
+        # Forma: 0.5 sem as avaliações
+        form = (
+            players.get('last_5_games_rating', np.nan) * 0.4 +
+            players.get('season_rating', np.nan) * 0.3 +
+            players.get('vs_opponent_rating', np.nan) * 0.3
+        ) * np.ones(len(rows))
+        form = np.where(np.isnan(form), 0.5, np.clip(form, 0, 1))
+        
+        # Vantagem no confronto (como em _calculate_matchup_advantage)
+        matchup = (
+            column('height_advantage', 0) * 0.2 +
+            column('speed_advantage', 0) * 0.2 +
+            column('historical_advantage', 0) * 0.3 +
+            column('style_advantage', 0) * 0.3
+        )
+        
+        # Fadiga: cada fator só conta se a estatística existir
+        fatigue = (
+            1 -
+            0.1 * (column('minutes_last_game') > 35) -
+            0.2 * (column('is_back_to_back', 0) != 0) -
+            0.1 * (column('last_5_games_minutes') > 175) +
+            0.1 * (column('days_rest') >= 2)
+        )
+        
+        for row, name in enumerate(players['name']):
+            player_analysis[rows[row]][name] = {
+                'impact_category': str(categories[row]),
+                'impact_factor': float(impact_factor[row]),
+                'form_rating': float(form[row]),
+                'matchup_advantage': float(matchup[row]),
+                'fatigue_factor': float(fatigue[row])
             }
+        
+        # Pontuação média por jogo
+        totals = np.bincount(rows, weights=impact_factor * form, minlength=games)
+        counts = np.bincount(rows, minlength=games)
+        return player_analysis, np.divide(totals, counts, out=np.zeros(games), where=counts > 0)
+        
+    def _slate_situation(self, situation):
+        """Fatores situacionais de todos os jogos (só os que se aplicam)"""
+        factors = self.situation_factors
+        is_set = {column: np.nan_to_num(values) != 0 for column, values in situation.items()}
+        home = np.where(is_set['is_home'], factors['home_court'], np.nan)
+        schedule = np.select(
+            [is_set['back_to_back'], situation['rest_days'] >= 2],
+            [factors['back_to_back'], factors['rest_advantage']],
+            np.nan
+        )
+        importance = np.where(is_set['is_playoff'], factors['playoff'], np.nan)
+        
+        values = np.stack([home, schedule, importance], axis=1)
+        keys = ('home_factor', 'schedule_factor', 'importance_factor')
+        situation_analysis = [
+            {key: float(value) for key, value in zip(keys, row) if not np.isnan(value)}
+            for row in values
+        ]
+        return situation_analysis, np.nan_to_num(self._row_means(values), nan=1.0)
+        
+    def _slate_team_momentum(self, wins):
+        """Momentum de todas as equipes: vitórias recentes com mais peso"""
+        if not wins.size:
+            return np.zeros(len(wins))
+        weights = 1.1 ** (10 - np.arange(wins.shape[1]))
+        counts = np.sum(~np.isnan(wins), axis=1)
+        totals = np.nansum(wins * weights, axis=1)
+        return np.divide(totals, counts, out=np.zeros(len(wins)), where=counts > 0)
+        
+    def _slate_recent_games(self, recent):
+        """Jogos recentes de todas as equipes (_analyze_recent_games); None onde faltam dados"""
+        wins = np.sum(np.nan_to_num(recent['win']) != 0, axis=1)
+        avg_points = self._row_means(recent['points'])
+        avg_margin = self._row_means(recent['margin'])
+        slopes = ols_slopes(recent['points'])
+        return [
+            {
+                'wins': int(wins[i]),
+                'avg_points': float(avg_points[i]),
+                'avg_margin': float(avg_margin[i]),
+                'trend': self._trend_result(slopes[i])
+            } if recent['valid'][i] else None
+            for i in range(len(recent['valid']))
+        ]
+        
+    def _slate_head_to_head(self, head_to_head):
+        """Histórico de confrontos de todos os jogos (_analyze_historical_matchup); None onde faltam dados"""
+        diffs, counts = head_to_head['point_diff'], head_to_head['counts']
+        avg_diff = self._row_means(diffs)
+        
+        # Tendência dos últimos 5 confrontos de cada jogo, realinhados para o início da linha
+        last = np.full((len(counts), 5), np.nan)
+        for i, count in enumerate(counts):
+            if count:
+                last[i, :min(count, 5)] = diffs[i, max(count - 5, 0):count]
+        slopes = ols_slopes(last)
+        return [
+            {
+                'total_games': int(counts[i]),
+                'home_wins': int(head_to_head['home_wins'][i]),
+                'avg_point_diff': float(avg_diff[i]),
+                'recent_trend': self._trend_result(slopes[i])
+            } if head_to_head['valid'][i] else None
+            for i in range(len(counts))
+        ]
+        
+    def _row_means(self, values):
+        """Média do último eixo ignorando NaN (NaN onde não há valores)"""
+        counts = np.sum(~np.isnan(values), axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nansum(values, axis=-1) / counts
+        
+    def _trend_result(self, slope):
+        """Resultado de tendência a partir da inclinação (NaN: menos de 2 pontos)"""
+        slope = float(slope)
+        if np.isnan(slope):
+            return {'direction': 'neutral', 'strength': 0}
+        return {
+            'direction': 'up' if slope > 0 else 'down' if slope < 0 else 'neutral',
+            'strength': abs(slope),
+            'slope': slope
+        }
             
-            # Pontuação por quarters
-            quarter_score = np.mean([q['avg_points'] * q['weight'] 
-                                   for q in analysis['quarter_analysis'].values()])
-            score += quarter_score * weights['quarters']
-            
-            # Pontuação por jogadores
-            player_score = np.mean([p['impact_factor'] * p['form_rating']
-                                  for p in analysis['player_analysis'].values()])
-            score += player_score * weights['players']
-            
-            # Outros fatores
-            situation_score = np.mean(list(analysis['situation_analysis'].values()))
-            momentum_score = np.mean(list(analysis['momentum_factors'].values()))
-            
-            score += situation_score * weights['situation']
-            score += momentum_score * weights['momentum']
-            
-            return score
-            
-        except Exception as e:
-            logger.error(f"Erro no cálculo do score Holzhauer: {e}")
-            return 0
+    def _combine_scores(self, quarter_score, player_score, situation_score, momentum_score):
+        """Combina as pontuações com os pesos Holzhauer (escalares ou arrays de vários jogos)"""
+        weights = self.score_weights
+        return (
+            quarter_score * weights['quarters'] +
+            player_score * weights['players'] +
+            situation_score * weights['situation'] +
+            momentum_score * weights['momentum']
+        )
             
     def _generate_recommendations(self, analysis):
         """Gera recomendações baseadas na análise"""
@@ -235,72 +407,13 @@ class NBAAnalyzer:
     def _calculate_trend(self, data_series):
         """Calcula tendência de uma série de dados"""
         try:
-            if len(data_series) < 2:
-                return {'direction': 'neutral', 'strength': 0}
-            
-            # Calcula inclinação da linha de tendência
-            x = np.arange(len(data_series))
-            slope, _ = np.polyfit(x, data_series, 1)
-            
-            # Determina força e direção
-            strength = abs(slope)
-            direction = 'up' if slope > 0 else 'down' if slope < 0 else 'neutral'
-            
-            return {
-                'direction': direction,
-                'strength': strength,
-                'slope': slope
-            }
+            # Inclinação da linha de tendência em forma fechada; força e direção saem dela
+            return self._trend_result(ols_slope(data_series))
             
         except Exception as e:
             logger.error(f"Erro ao calcular tendência: {e}")
             return {'direction': 'neutral', 'strength': 0}
 
-    def _determine_player_impact(self, stats):
-        """Determina categoria de impacto do jogador"""
-        try:
-            impact_score = (
-                stats['pts_per_game'] * 0.4 +
-                stats['min_per_game'] * 0.2 +
-                stats['plus_minus'] * 0.2 +
-                stats['usage_rate'] * 0.2
-            )
-            
-            if impact_score > 25:
-                return 'superstar'
-            elif impact_score > 20:
-                return 'star'
-            elif impact_score > 15:
-                return 'starter'
-            else:
-                return 'rotation'
-            
-        except Exception as e:
-            logger.error(f"Erro ao determinar impacto: {e}")
-            return 'rotation'
-
-    def _calculate_form(self, stats):
-        """Calcula rating de forma atual"""
-        try:
-            # Pesos para diferentes fatores
-            weights = {
-                'recent_games': 0.4,
-                'season_avg': 0.3,
-                'vs_opponent': 0.3
-            }
-            
-            form_score = (
-                stats['last_5_games_rating'] * weights['recent_games'] +
-                stats['season_rating'] * weights['season_avg'] +
-                stats['vs_opponent_rating'] * weights['vs_opponent']
-            )
-            
-            return min(max(form_score, 0), 1)  # Normaliza entre 0 e 1
-            
-        except Exception as e:
-            logger.error(f"Erro ao calcular forma: {e}")
-            return 0.5
-
     def _calculate_matchup_advantage(self, stats):
         """Calcula vantagem no confronto direto"""
         try:
@@ -318,22 +431,6 @@ class NBAAnalyzer:
             logger.error(f"Erro ao calcular vantagem: {e}")
             return 0
 
-    def _calculate_fatigue(self, stats):
-        """Calcula fator de fadiga"""
-        try:
-            fatigue_factors = {
-                'minutes_last_game': -0.1 if stats['minutes_last_game'] > 35 else 0,
-                'back_to_back': -0.2 if stats['is_back_to_back'] else 0,
-                'recent_workload': -0.1 if stats['last_5_games_minutes'] > 175 else 0,
-                'rest_days': 0.1 if stats['days_rest'] >= 2 else 0
-            }
-            
-            return 1 + sum(fatigue_factors.values())
-            
-        except Exception as e:
-            logger.error(f"Erro ao calcular fadiga: {e}")
-            return 1
-
     def _calculate_pace_advantage(self, team_stats):
         """Calcula vantagem no ritmo de jogo"""
         try:
@@ -416,22 +513,6 @@ class NBAAnalyzer:
             logger.error(f"Erro ao identificar confrontos chave: {e}")
             return []
 
-    def _calculate_team_momentum(self, game_data):
-        """Calcula momentum da equipe"""
-        try:
-            recent_games = game_data['last_10_games']
-            
-            momentum_score = sum([
-                game['win'] * (1.1 ** (10 - i))  # Jogos mais recentes têm mais peso
-                for i, game in enumerate(recent_games)
-            ]) / len(recent_games)
-            
-            return momentum_score
-            
-        except Exception as e:
-            logger.error(f"Erro ao calcular momentum da equipe: {e}")
-            return 0
-
     def _calculate_player_momentum(self, game_data):
         """Calcula momentum dos jogadores"""
         try:
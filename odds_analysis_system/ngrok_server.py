@@ -1,5 +1,5 @@
 from pyngrok import ngrok
-from app import app
+from app import create_app
 import config
 from ngrok_config import setup_ngrok
 import sys
@@ -15,7 +15,7 @@ def start_server():
         print(f'\n * Servidor público disponível em: {public_url}\n')
         
         # Iniciar servidor
-        app.run(
+        create_app().run(
             host=config.HOST,
             port=config.PORT,
             debug=config.DEBUG
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from config import ODDS_FILE, OPPORTUNITIES_FILE
+from best_price_index import BestPriceIndex
 
 class OddsAnalyzer:
     def __init__(self):
@@ -17,53 +18,39 @@ class OddsAnalyzer:
         ev_percentage = (ev / stake) * 100
         return ev, ev_percentage
 
-    def analyze_odds(self):
-        """Analyze odds data and identify opportunities"""
+    def analyze_odds(self, best_prices=None):
+        """Analyze odds data and identify opportunities
+
+        Best and average prices come from the collector's best-price index;
+        without one, an index is built from the odds file.
+        """
         try:
-            # Load odds data
-            df = pd.read_csv(ODDS_FILE)
+            if best_prices is None:
+                best_prices = BestPriceIndex()
+                best_prices.on_snapshot(pd.read_csv(ODDS_FILE))
             opportunities = []
 
-            # Group by match to compare bookmaker odds
-            for match in df['Match'].unique():
-                match_data = df[df['Match'] == match]
-                
-                # Calculate average odds for each outcome
-                avg_home_odds = match_data['Home_Odds'].mean()
-                avg_away_odds = match_data['Away_Odds'].mean()
-                
-                # Calculate implied probabilities
-                implied_prob_home = self.calculate_implied_probability(avg_home_odds)
-                implied_prob_away = self.calculate_implied_probability(avg_away_odds)
-                
-                # Find best available odds
-                best_home_odds = match_data['Home_Odds'].max()
-                best_away_odds = match_data['Away_Odds'].max()
-                
-                # Calculate EV using average probabilities and best odds
-                home_ev, home_ev_pct = self.calculate_ev(implied_prob_home, best_home_odds)
-                away_ev, away_ev_pct = self.calculate_ev(implied_prob_away, best_away_odds)
-                
-                # Record opportunities that meet threshold
-                if home_ev_pct > self.min_ev_threshold:
-                    opportunities.append({
-                        'Match': match,
-                        'Type': 'Home',
-                        'Best_Odds': best_home_odds,
-                        'Implied_Prob': implied_prob_home,
-                        'EV': home_ev,
-                        'EV_Percentage': home_ev_pct
-                    })
-                
-                if away_ev_pct > self.min_ev_threshold:
-                    opportunities.append({
-                        'Match': match,
-                        'Type': 'Away',
-                        'Best_Odds': best_away_odds,
-                        'Implied_Prob': implied_prob_away,
-                        'EV': away_ev,
-                        'EV_Percentage': away_ev_pct
-                    })
+            for match in sorted(best_prices.live_matches):
+                for side in ('home', 'away'):
+                    best = best_prices.best(match, side)
+                    if not best:
+                        continue
+                    best_odds = best[0]
+
+                    # EV of the best available odds against the average implied probability
+                    implied_prob = self.calculate_implied_probability(best_prices.average(match, side))
+                    ev, ev_pct = self.calculate_ev(implied_prob, best_odds)
+
+                    # Record opportunities that meet threshold
+                    if ev_pct > self.min_ev_threshold:
+                        opportunities.append({
+                            'Match': match,
+                            'Type': side.capitalize(),
+                            'Best_Odds': best_odds,
+                            'Implied_Prob': implied_prob,
+                            'EV': ev,
+                            'EV_Percentage': ev_pct
+                        })
             
             # Create and save opportunities DataFrame
             if opportunities:
@@ -79,6 +66,32 @@ class OddsAnalyzer:
             print(f"Error analyzing odds: {e}")
             return pd.DataFrame()
 
+    def backtest_signals(self, history, results):
+        """Backtest candidates: EV of each bookmaker's odds against the snapshot's average implied probability
+
+        Nothing is trained here, so the settled results are not used.
+        """
+        snapshots = history.groupby(['Timestamp', 'Match'], sort=False).ngroup()
+        
+        frames = []
+        for side, column in (('home', 'Home_Odds'), ('away', 'Away_Odds')):
+            avg_odds = history[column].groupby(snapshots).transform('mean')
+            implied_prob = self.calculate_implied_probability(avg_odds.to_numpy(dtype=float))
+            odds = history[column].to_numpy(dtype=float)
+            _, ev_pct = self.calculate_ev(implied_prob, odds)
+            
+            frames.append(pd.DataFrame({
+                'Timestamp': history['Timestamp'].to_numpy(),
+                'Match': history['Match'].to_numpy(),
+                'Side': side,
+                'Bookmaker': history['Bookmaker'].to_numpy(),
+                'Odds': odds,
+                'Probability': implied_prob,
+                'Score': ev_pct - self.min_ev_threshold
+            }))
+            
+        return pd.concat(frames, ignore_index=True)
+
 if __name__ == "__main__":
     analyzer = OddsAnalyzer()
     opportunities = analyzer.analyze_odds()
@@ -1,20 +1,31 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import os
-from config import DATA_DIR, ODDS_FILE
+import re
+from config import DATA_DIR, ODDS_FILE, UPDATE_INTERVAL
 import time
 import threading
 
 logger = logging.getLogger(__name__)
 
+GAME_DURATION = timedelta(hours=3)  # Depois disso o horário de início passa para o dia seguinte
+
+def _game_key(text):
+    """Chave normalizada de partida ou time: minúsculas, só letras e números separados por espaço"""
+    return ' '.join(re.findall(r'\w+', str(text).casefold()))
+
 class OddsCollector:
     def __init__(self):
         self.is_running = False
         self.collection_thread = None
         self.current_odds = pd.DataFrame()
         self.last_update = None
+        self.update_interval = UPDATE_INTERVAL
+        self.snapshot_version = 0  # Incrementa a cada nova coleta publicada
+        self.listeners = []  # Callbacks chamados com (odds, versão) a cada coleta
+        self._games = {'odds': None}  # Índice das partidas do snapshot atual, montado na publicação
         
     def start_collection(self):
         """Inicia a coleta de odds em uma thread separada"""
@@ -37,7 +48,7 @@ class OddsCollector:
         while self.is_running:
             try:
                 self.collect_odds()
-                time.sleep(30)  # Coleta a cada 30 segundos
+                time.sleep(self.update_interval)
             except Exception as e:
                 logger.error(f"Erro no loop de coleta: {e}")
                 time.sleep(5)
@@ -51,6 +62,9 @@ class OddsCollector:
             # Atualiza dados em memória
             self.current_odds = pd.DataFrame(odds_data)
             self.last_update = datetime.now()
+            self.snapshot_version += 1
+            self._index_games(self.current_odds)
+            self._notify_listeners()
             
             # Tenta salvar em arquivo, mas não falha se não conseguir
             try:
@@ -67,13 +81,31 @@ class OddsCollector:
             logger.error(f"Erro ao coletar odds: {e}")
             return pd.DataFrame()
     
+    def add_listener(self, callback):
+        """Registra um callback chamado com (odds, versão) a cada nova coleta"""
+        self.listeners.append(callback)
+    
+    def _notify_listeners(self):
+        """Notifica os listeners sobre a nova coleta"""
+        for callback in self.listeners:
+            try:
+                callback(self.current_odds, self.snapshot_version)
+            except Exception as e:
+                logger.error(f"Erro ao notificar listener da coleta: {e}")
+    
+    def is_healthy(self):
+        """Indica se a última coleta é recente"""
+        if not self.last_update:
+            return False
+        return (datetime.now() - self.last_update).total_seconds() < self.update_interval * 3
+    
     def _generate_sample_data(self):
         """Gera dados de exemplo mais realistas para teste"""
         games = [
-            {"home": "Lakers", "away": "Warriors", "league": "NBA"},
-            {"home": "Celtics", "away": "Nets", "league": "NBA"},
-            {"home": "Bucks", "away": "Heat", "league": "NBA"},
-            {"home": "Nuggets", "away": "Suns", "league": "NBA"}
+            {"home": "Lakers", "away": "Warriors", "league": "NBA", "start": "19:30"},
+            {"home": "Celtics", "away": "Nets", "league": "NBA", "start": "20:00"},
+            {"home": "Bucks", "away": "Heat", "league": "NBA", "start": "21:00"},
+            {"home": "Nuggets", "away": "Suns", "league": "NBA", "start": "22:30"}
         ]
         
         bookmakers = ["bet365", "Betano", "Sportingbet"]
@@ -82,6 +114,8 @@ class OddsCollector:
         timestamp = datetime.now()
         
         for game in games:
+            start_time = self._start_time(game['start'], timestamp)
+            
             # Gera odds base para o jogo
             base_home_odd = np.random.uniform(1.5, 3.0)
             base_away_odd = np.random.uniform(1.5, 3.0)
@@ -99,11 +133,19 @@ class OddsCollector:
                     'Bookmaker': bookmaker,
                     'Home_Odds': round(base_home_odd + home_variation, 2),
                     'Away_Odds': round(base_away_odd + away_variation, 2),
-                    'Timestamp': timestamp
+                    'Timestamp': timestamp,
+                    'Start_Time': start_time
                 })
         
         return data
     
+    def _start_time(self, clock, timestamp):
+        """Início do jogo no horário `clock` (HH:MM): o de hoje, ontem ou amanhã que ainda não terminou"""
+        hour, minute = map(int, clock.split(':'))
+        start = timestamp.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        candidates = [start + timedelta(days=days) for days in (-1, 0, 1)]
+        return next(candidate for candidate in candidates if candidate + GAME_DURATION >= timestamp)
+    
     def get_current_odds(self):
         """Retorna as odds mais recentes da memória"""
         if self.current_odds.empty:
@@ -113,9 +155,8 @@ class OddsCollector:
 
     def get_game_data(self, game_id):
         """Retorna dados do jogo"""
-        odds_data = self.get_current_odds()
-        if not odds_data.empty:
-            game = odds_data[odds_data['Match'].str.contains(game_id, case=False)].iloc[0]
+        game = self.find_game(game_id)
+        if game is not None:
             return {
                 'id': game_id,
                 'home_team': game['Home_Team'],
@@ -128,13 +169,53 @@ class OddsCollector:
             }
         return None
 
+    def find_game(self, game_id):
+        """Primeira linha da partida no snapshot atual, por nome da partida ou de um dos times
+
+        O nome da partida tem prioridade; um time que aparece em mais de uma
+        partida é ambíguo. Ids ambíguos ou desconhecidos retornam None.
+        """
+        games = self._index_games(self.get_current_odds())
+        key = _game_key(game_id)
+        if key in games['matches']:
+            return games['matches'][key]
+
+        matches = games['teams'].get(key, [])
+        if len(matches) > 1:
+            logger.warning(f"Jogo ambíguo '{game_id}': {', '.join(games['matches'][match]['Match'] for match in matches)}")
+            return None
+        return games['matches'][matches[0]] if matches else None
+
     def get_live_games(self):
         """Retorna lista de jogos ativos"""
-        odds_data = self.get_current_odds()
+        games = self._index_games(self.get_current_odds())
+        return [
+            {column: game[column] for column in ('Match', 'League', 'Home_Team', 'Away_Team')}
+            for game in games['matches'].values()
+        ]
+
+    def _index_games(self, odds_data):
+        """Índice do snapshot: chave da partida -> primeira linha e chave do time -> partidas
+
+        Montado uma vez por snapshot publicado; reaproveitado enquanto as odds
+        em memória forem as mesmas.
+        """
+        if self._games['odds'] is odds_data:
+            return self._games
+
+        matches, teams = {}, {}
         if not odds_data.empty:
-            games = odds_data.drop_duplicates('Match')[['Match', 'League', 'Home_Team', 'Away_Team']]
-            return games.to_dict('records')
-        return []
+            for game in odds_data.drop_duplicates('Match').to_dict('records'):
+                key = _game_key(game['Match'])
+                if key in matches:
+                    continue  # Grafias diferentes da mesma partida: vale a primeira
+                matches[key] = game
+                for team in (game.get('Home_Team'), game.get('Away_Team')):
+                    if isinstance(team, str):
+                        teams.setdefault(_game_key(team), []).append(key)
+
+        self._games = {'odds': odds_data, 'matches': matches, 'teams': teams}
+        return self._games
 
 if __name__ == "__main__":
     collector = OddsCollector()
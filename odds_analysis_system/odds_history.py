@@ -1,8 +1,8 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import os
-from config import DATA_DIR
+from config import ODDS_HISTORY_FILE
+from trend_utils import ols_slopes
 import json
 import logging
 
@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 class OddsHistory:
     def __init__(self):
-        self.history_file = os.path.join(DATA_DIR, 'odds_history.csv')
+        self.history_file = ODDS_HISTORY_FILE
         self.max_history_days = 7  # Mantém histórico dos últimos 7 dias
         self._initialize_history()
 
@@ -197,25 +197,32 @@ class OddsHistory:
                 'volatile': []     # Odds instáveis
             }
             
+            # Só partidas com pelo menos 3 pontos
+            sizes = history_df.groupby('Match', sort=False)['Match'].transform('size')
+            history_df = history_df[sizes >= 3]
+            history_df = history_df.assign(Position=history_df.groupby('Match', sort=False).cumcount())
+            
+            # Volatilidade, cotação atual e inclinação de todas as partidas de uma vez, por lado
+            sides = {}
+            for side in ['Home', 'Away']:
+                odds_col = f'{side}_Odds'
+                grouped = history_df.groupby('Match', sort=False)[odds_col]
+                series = history_df.pivot(index='Match', columns='Position', values=odds_col)
+                sides[side] = {
+                    'volatility': (grouped.std() / grouped.mean()).to_dict(),
+                    'current': history_df.drop_duplicates('Match', keep='last').set_index('Match')[odds_col].to_dict(),
+                    'slope': dict(zip(series.index, ols_slopes(series.to_numpy())))
+                }
+            
             for match in history_df['Match'].unique():
-                match_data = history_df[history_df['Match'] == match].copy()
-                if len(match_data) < 3:  # Precisa de pelo menos 3 pontos
-                    continue
-                    
                 for side in ['Home', 'Away']:
-                    odds_col = f'{side}_Odds'
-                    odds_series = match_data[odds_col]
-                    
-                    # Calcula volatilidade
-                    volatility = odds_series.std() / odds_series.mean()
-                    
-                    # Determina tendência
-                    slope = np.polyfit(range(len(odds_series)), odds_series, 1)[0]
+                    volatility = sides[side]['volatility'][match]
+                    slope = sides[side]['slope'][match]
                     
                     trend_info = {
                         'Match': match,
                         'Side': side,
-                        'Current_Odds': odds_series.iloc[-1],
+                        'Current_Odds': sides[side]['current'][match],
                         'Volatility': volatility
                     }
                     
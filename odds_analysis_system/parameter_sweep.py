@@ -0,0 +1,90 @@
+import itertools
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from backtester import simulate
+from config import SHARED_STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Arrays do histórico abertos em memória mapeada em cada processo do pool
+_arrays = {}
+
+def _open_arrays(arrays_dir, names):
+    """Initializer do pool: mapeia os arrays gravados pelo processo principal"""
+    global _arrays
+    _arrays = {name: np.load(os.path.join(arrays_dir, f"{name}.npy"), mmap_mode='r') for name in names}
+
+def _evaluate(params):
+    """Avalia uma combinação de parâmetros sobre os arrays mapeados"""
+    metrics, _, _ = simulate(**_arrays, **params)
+    return {**params, **metrics}
+
+class ParameterSweep:
+    """Busca de parâmetros da estratégia sobre o histórico com um pool de processos
+
+    Os candidatos do histórico são gerados uma única vez e gravados como
+    arrays .npy (na memória compartilhada, se disponível); cada processo do
+    pool os abre com mmap, então as tarefas só transportam os parâmetros.
+    Parâmetros aceitos são os de `simulate`: min_score (deslocamento sobre o
+    threshold da estratégia, ex.: min_confidence ou min_ev_threshold),
+    kelly_fraction, max_stake (teto do Kelly) e max_volatility.
+    """
+
+    def __init__(self, backtester, strategy, workers=None):
+        self.backtester = backtester
+        self.strategy = strategy
+        self.workers = workers or os.cpu_count()
+
+    def grid(self, **values):
+        """Todas as combinações dos valores informados por parâmetro"""
+        names = list(values)
+        return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+    def random(self, samples, seed=None, **ranges):
+        """Amostras uniformes dentro de (mínimo, máximo) por parâmetro"""
+        rng = np.random.default_rng(seed)
+        return [
+            {name: float(rng.uniform(low, high)) for name, (low, high) in ranges.items()}
+            for _ in range(samples)
+        ]
+
+    def run(self, param_sets, rank_by='roi', min_bets=30):
+        """Avalia as combinações em paralelo e retorna a tabela ordenada pelo critério escolhido"""
+        try:
+            _, arrays = self.backtester.prepare(self.strategy.backtest_signals(self.backtester.history, self.backtester.results))
+
+            # Parâmetros não informados seguem a configuração do backtester
+            defaults = {
+                'kelly_fraction': self.backtester.kelly_fraction,
+                'max_stake': self.backtester.max_stake,
+                'bankroll': self.backtester.bankroll
+            }
+            param_sets = [{**defaults, **params} for params in param_sets]
+
+            with tempfile.TemporaryDirectory(dir=SHARED_STATE_DIR) as arrays_dir:
+                for name, values in arrays.items():
+                    np.save(os.path.join(arrays_dir, f"{name}.npy"), values)
+
+                chunksize = max(1, len(param_sets) // (self.workers * 4))
+                with ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_open_arrays,
+                    initargs=(arrays_dir, list(arrays))
+                ) as executor:
+                    rows = list(executor.map(_evaluate, param_sets, chunksize=chunksize))
+
+            table = pd.DataFrame(rows)
+            table = table[table['bets'] >= min_bets]
+            table = table.sort_values([rank_by, 'max_drawdown'], ascending=[False, True], kind='stable')
+            table.insert(0, 'rank', range(1, len(table) + 1))
+
+            logger.info(f"Busca de parâmetros: {len(param_sets)} combinações avaliadas")
+            return table.reset_index(drop=True)
+
+        except Exception as e:
+            logger.error(f"Erro na busca de parâmetros: {e}")
+            return pd.DataFrame()
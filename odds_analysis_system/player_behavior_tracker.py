@@ -1,13 +1,33 @@
 import pandas as pd
-from datetime import datetime
-import numpy as np
+from datetime import datetime, timedelta
+from collections import deque
+import threading
+from config import BEHAVIOR_RETENTION_MINUTES
 
 class PlayerBehaviorTracker:
-    def __init__(self):
+    def __init__(self, store=None, retention_minutes=BEHAVIOR_RETENTION_MINUTES):
         self.behavior_log = []
         self.emotional_states = {}
         self.interaction_history = []
         
+        # Persistência opcional (log de escrita antecipada compartilhado entre workers)
+        self.store = store
+        self.retention_minutes = retention_minutes  # Histórico mantido na memória e no snapshot
+        self._recovered = False  # O estado é recuperado do store no primeiro uso, não na importação
+        self._lock = threading.RLock()
+        
+        # Índice incremental de trigramas de eventos por jogador
+        self.sequence_window_minutes = 15
+        self.sequence_index = {}  # jogador -> {trigrama: agregados}
+        self._sequence_entries = {}  # jogador -> trigramas dentro da janela, em ordem
+        self._last_events = {}  # jogador -> últimas 3 observações
+        
+        # Acumulador de correlações entre pares de eventos por jogador
+        self.correlation_window_minutes = 30
+        self.correlation_index = {}  # jogador -> {(tipo1, tipo2): agregados}
+        self._correlation_entries = {}  # jogador -> pares dentro da janela, em ordem
+        self._observation_times = {}  # jogador -> timestamps dentro da janela
+        
     def register_observation(self, player_name, timestamp, observation_type, details):
         """Registra uma observação sobre o comportamento do jogador"""
         observation = {
@@ -19,8 +39,7 @@ class PlayerBehaviorTracker:
             'impacto_emocional': self._calculate_emotional_impact(observation_type, details)
         }
         
-        self.behavior_log.append(observation)
-        self._update_emotional_state(player_name, observation)
+        self._commit_record('observation', observation)
         return observation
         
     def register_interaction(self, player1, player2, interaction_type, details):
@@ -34,11 +53,143 @@ class PlayerBehaviorTracker:
             'impacto': self._calculate_interaction_impact(interaction_type)
         }
         
-        self.interaction_history.append(interaction)
+        self._commit_record('interaction', interaction)
         return interaction
         
+    def sync(self):
+        """Aplica os registros gravados no log por este ou por outros workers"""
+        if not self.store:
+            return
+            
+        with self._lock:
+            if not self._recovered:
+                self._recover()
+                return
+                
+            records = self.store.read_new_records()
+            if records is None:
+                # Log rotacionado mais de uma vez desde a última leitura
+                self._recover()
+                return
+                
+            for record in records:
+                self._apply_record(record)
+            self._maybe_snapshot()
+            
+    def _commit_record(self, record_type, data):
+        """Grava o registro no log (se houver) e aplica ao estado em memória"""
+        if not self.store:
+            self._apply_record({'type': record_type, 'data': data}, from_log=False)
+            return
+            
+        with self._lock:
+            self.store.append({'type': record_type, 'data': data})
+            self.sync()
+            
+    def _apply_record(self, record, from_log=True):
+        """Aplica um registro de observação ou interação ao estado em memória"""
+        data = dict(record['data'])
+        if from_log:
+            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+            
+        if record['type'] == 'observation':
+            self.behavior_log.append(data)
+            self._update_emotional_state(data['jogador'], data)
+            self._index_observation(data)
+        elif record['type'] == 'interaction':
+            self.interaction_history.append(data)
+            
+    def _index_observation(self, observation):
+        """Alimenta os índices de sequências e de correlações com a observação"""
+        self._index_sequence(observation['jogador'], observation)
+        self._accumulate_correlations(observation['jogador'], observation)
+        
+    def _recover(self):
+        """Reconstrói o estado a partir do último snapshot e do log que o segue"""
+        try:
+            self._reset_state()
+            snapshot = self.store.load_snapshot()
+            if snapshot:
+                self._load_state(snapshot)
+                
+            records = self.store.read_new_records()
+            if records is None:
+                # O segmento do snapshot não existe mais: os que sobraram são posteriores a ele
+                records = self.store.replay_log()
+                
+            for record in records:
+                self._apply_record(record)
+            self._recovered = True
+                
+        except Exception as e:
+            print(f"Erro ao recuperar estado do log de comportamento: {e}")
+            
+    def _reset_state(self):
+        """Esvazia o estado em memória antes de recarregá-lo"""
+        self.behavior_log = []
+        self.emotional_states = {}
+        self.interaction_history = []
+        self.sequence_index = {}
+        self._sequence_entries = {}
+        self._last_events = {}
+        self.correlation_index = {}
+        self._correlation_entries = {}
+        self._observation_times = {}
+        
+    def _maybe_snapshot(self):
+        """Salva o estado completo e rotaciona o log a cada `snapshot_interval` registros"""
+        if self.store.segment_records < self.store.snapshot_interval:
+            return
+            
+        if not self.store.compact(self._apply_record, self._snapshot_state):
+            self._recover()
+            
+    def _snapshot_state(self):
+        """Estado gravado no snapshot: só o histórico dentro da retenção"""
+        self._prune_history()
+        return {
+            'behavior_log': self.behavior_log,
+            'interaction_history': self.interaction_history,
+            'emotional_states': self.emotional_states
+        }
+        
+    def _load_state(self, snapshot):
+        """Carrega o estado do snapshot e reconstrói os índices das janelas de análise"""
+        for observation in snapshot['behavior_log']:
+            observation['timestamp'] = datetime.fromisoformat(observation['timestamp'])
+        for interaction in snapshot['interaction_history']:
+            interaction['timestamp'] = datetime.fromisoformat(interaction['timestamp'])
+            
+        self.behavior_log = snapshot['behavior_log']
+        self.interaction_history = snapshot['interaction_history']
+        self.emotional_states = self._load_emotional_states(snapshot['emotional_states'])
+        self._prune_history()  # Snapshots antigos guardavam o histórico inteiro
+        
+        # Os índices só guardam o que está dentro das janelas; o que começou antes já teria expirado
+        current_time = datetime.now()
+        window_seconds = max(self.sequence_window_minutes, self.correlation_window_minutes) * 60
+        for observation in self.behavior_log:
+            if (current_time - observation['timestamp']).total_seconds() <= window_seconds:
+                self._index_observation(observation)
+                
+    def _prune_history(self):
+        """Descarta observações e interações mais antigas que a retenção, para o snapshot não crescer com o histórico"""
+        cutoff = datetime.now() - timedelta(minutes=self.retention_minutes)
+        self.behavior_log = [observation for observation in self.behavior_log if observation['timestamp'] >= cutoff]
+        self.interaction_history = [
+            interaction for interaction in self.interaction_history if interaction['timestamp'] >= cutoff
+        ]
+        
+    def _load_emotional_states(self, states):
+        """Converte os timestamps dos fatores de influência de volta para datetime"""
+        for state in states.values():
+            for factor in state['fatores_influência']:
+                factor['timestamp'] = datetime.fromisoformat(factor['timestamp'])
+        return states
+        
     def get_player_emotional_state(self, player_name):
         """Retorna o estado emocional atual do jogador"""
+        self.sync()
         if player_name not in self.emotional_states:
             return {
                 'estado': 'neutro',
@@ -180,6 +331,7 @@ class PlayerBehaviorTracker:
         
     def _get_recent_observations(self, player_name, time_window_minutes):
         """Obtém observações recentes de um jogador"""
+        self.sync()
         current_time = datetime.now()
         return [
             obs for obs in self.behavior_log
@@ -362,14 +514,21 @@ class PlayerBehaviorTracker:
         }
         
         try:
-            # Obtém observações recentes
             recent_obs = self._get_recent_observations(player_name, time_window_minutes)
-            
-            if recent_obs:
-                # Identifica padrões de sequência
+            if time_window_minutes == self.sequence_window_minutes:
+                # Padrões lidos direto do índice incremental, sem reagrupar as janelas
+                self._expire_sequence_index(player_name)
+                patterns = self._summarize_sequence_index(
+                    self.sequence_index.get(player_name, {})
+                )
+            else:
+                # Janela fora do padrão do índice: reconstrói a partir do log
                 patterns = self._identify_sequence_patterns(recent_obs)
+
+            if recent_obs:
+                # Padrões de sequência identificados
                 sequence_analysis['padrões_identificados'] = patterns
-                
+
                 # Analisa sequência atual
                 current_sequence = self._analyze_current_sequence(recent_obs)
                 sequence_analysis['sequência_atual'] = current_sequence
@@ -400,34 +559,112 @@ class PlayerBehaviorTracker:
     
     def _identify_sequence_patterns(self, observations):
         """Identifica padrões nas sequências de eventos"""
-        patterns = []
-        
+        index = {}
+
         try:
             # Analisa sequências de 3 eventos
             for i in range(len(observations) - 2):
-                sequence = observations[i:i+3]
+                pattern = self._build_sequence_pattern(observations[i:i+3])
+
+                if self._is_significant_pattern(pattern):
+                    self._add_to_sequence_index(index, pattern, 1)
+
+        except Exception as e:
+            print(f"Erro ao identificar padrões de sequência: {e}")
+
+        return self._summarize_sequence_index(index)
+
+    def _build_sequence_pattern(self, sequence):
+        """Monta o padrão de uma janela de 3 eventos"""
+        return {
+            'eventos': [obs['tipo'] for obs in sequence],
+            'impactos': [obs['impacto_emocional'] for obs in sequence],
+            'duração': (sequence[-1]['timestamp'] - sequence[0]['timestamp']).total_seconds(),
+            'resultado': self._determine_sequence_result(sequence),
+            'início': sequence[0]['timestamp']
+        }
+
+    def _index_sequence(self, player_name, observation):
+        """Atualiza o índice de trigramas do jogador com a nova observação"""
+        try:
+            last_events = self._last_events.setdefault(player_name, deque(maxlen=3))
+            last_events.append(observation)
+
+            if len(last_events) < 3:
+                return
+
+            pattern = self._build_sequence_pattern(list(last_events))
+            if not self._is_significant_pattern(pattern):
+                return
+
+            index = self.sequence_index.setdefault(player_name, {})
+            self._add_to_sequence_index(index, pattern, 1)
+            self._sequence_entries.setdefault(player_name, deque()).append(pattern)
+            self._expire_sequence_index(player_name)
+
+        except Exception as e:
+            print(f"Erro ao indexar sequência: {e}")
+
+    def _expire_sequence_index(self, player_name):
+        """Remove do índice os trigramas que saíram da janela de análise"""
+        entries = self._sequence_entries.get(player_name)
+        if not entries:
+            return
+
+        index = self.sequence_index[player_name]
+        current_time = datetime.now()
+        window_seconds = self.sequence_window_minutes * 60
+
+        while entries and (current_time - entries[0]['início']).total_seconds() > window_seconds:
+            self._add_to_sequence_index(index, entries.popleft(), -1)
+
+    def _add_to_sequence_index(self, index, pattern, sign):
+        """Soma (sign=1) ou retira (sign=-1) um padrão dos agregados do trigrama"""
+        key = tuple(pattern['eventos'])
+        stats = index.get(key)
+
+        if stats is None:
+            stats = index[key] = {
+                'ocorrências': 0,
+                'soma_impactos': [0.0, 0.0, 0.0],
+                'soma_duração': 0.0,
+                'resultados': {'explosão': 0, 'queda': 0, 'neutro': 0}
+            }
+
+        stats['ocorrências'] += sign
+        for i, impact in enumerate(pattern['impactos']):
+            stats['soma_impactos'][i] += sign * impact
+        stats['soma_duração'] += sign * pattern['duração']
+        stats['resultados'][pattern['resultado']] += sign
+
+        if stats['ocorrências'] <= 0:
+            del index[key]
+
+    def _summarize_sequence_index(self, index):
+        """Converte os agregados do índice em padrões com confiabilidade"""
+        patterns = []
+
+        try:
+            for key, stats in index.items():
+                count = stats['ocorrências']
+                impacts = [total / count for total in stats['soma_impactos']]
+
                 pattern = {
-                    'eventos': [obs['tipo'] for obs in sequence],
-                    'impactos': [obs['impacto_emocional'] for obs in sequence],
-                    'duração': (sequence[-1]['timestamp'] - sequence[0]['timestamp']).total_seconds(),
-                    'resultado': self._determine_sequence_result(sequence)
+                    'eventos': list(key),
+                    'impactos': impacts,
+                    'duração': stats['soma_duração'] / count,
+                    'resultado': max(stats['resultados'].items(), key=lambda x: x[1])[0],
+                    'ocorrências': count,
+                    'impacto_médio': sum(impacts)
                 }
-                
-                if self._is_significant_pattern(pattern):
-                    patterns.append(pattern)
-            
-            # Agrupa padrões similares
-            grouped_patterns = self._group_similar_patterns(patterns)
-            
-            # Calcula confiabilidade dos padrões
-            for pattern in grouped_patterns:
                 pattern['confiabilidade'] = self._calculate_pattern_reliability(pattern)
-                
+                patterns.append(pattern)
+
         except Exception as e:
-            print(f"Erro ao identificar padrões de sequência: {e}")
-            
-        return grouped_patterns
-    
+            print(f"Erro ao resumir índice de sequências: {e}")
+
+        return patterns
+
     def _analyze_current_sequence(self, observations):
         """Analisa a sequência atual de eventos"""
         try:
@@ -620,34 +857,6 @@ class PlayerBehaviorTracker:
             print(f"Erro ao verificar significância do padrão: {e}")
             return False
     
-    def _group_similar_patterns(self, patterns):
-        """Agrupa padrões similares"""
-        grouped = []
-        
-        try:
-            for pattern in patterns:
-                found_group = False
-                for group in grouped:
-                    if self._is_similar_sequence(group['eventos'], pattern['eventos']):
-                        # Atualiza estatísticas do grupo
-                        group['ocorrências'] = group.get('ocorrências', 1) + 1
-                        group['impacto_médio'] = (
-                            group.get('impacto_médio', sum(group['impactos'])) +
-                            sum(pattern['impactos'])
-                        ) / 2
-                        found_group = True
-                        break
-                        
-                if not found_group:
-                    pattern['ocorrências'] = 1
-                    pattern['impacto_médio'] = sum(pattern['impactos'])
-                    grouped.append(pattern)
-                    
-        except Exception as e:
-            print(f"Erro ao agrupar padrões similares: {e}")
-            
-        return grouped
-    
     def _calculate_pattern_reliability(self, pattern):
         """Calcula a confiabilidade de um padrão"""
         try:
@@ -743,14 +952,23 @@ class PlayerBehaviorTracker:
         }
         
         try:
-            # Obtém observações recentes
-            recent_obs = self._get_recent_observations(player_name, time_window_minutes)
-            
-            if len(recent_obs) < 3:
-                return correlation_analysis
-                
-            # Identifica correlações
-            correlations = self._identify_event_correlations(recent_obs)
+            self.sync()
+            if time_window_minutes == self.correlation_window_minutes:
+                # Leitura direta dos agregados mantidos a cada observação
+                self._expire_correlations(player_name)
+                if len(self._observation_times.get(player_name, [])) < 3:
+                    return correlation_analysis
+                correlations = self._summarize_correlation_index(
+                    self.correlation_index.get(player_name, {})
+                )
+            else:
+                # Janela fora do padrão do acumulador: reconstrói a partir do log
+                recent_obs = self._get_recent_observations(player_name, time_window_minutes)
+                if len(recent_obs) < 3:
+                    return correlation_analysis
+                correlations = self._identify_event_correlations(recent_obs)
+
+            # Correlações identificadas
             correlation_analysis['correlações_identificadas'] = correlations
             
             # Calcula multiplicadores
@@ -776,31 +994,123 @@ class PlayerBehaviorTracker:
     
     def _identify_event_correlations(self, observations):
         """Identifica correlações entre eventos"""
-        correlations = []
-        
+        index = {}
+
         try:
             # Analisa pares de eventos
             for i in range(len(observations) - 1):
                 for j in range(i + 1, min(i + 3, len(observations))):
-                    event1 = observations[i]
-                    event2 = observations[j]
-                    
-                    correlation = {
-                        'eventos': [event1['tipo'], event2['tipo']],
-                        'impacto_combinado': self._calculate_combined_impact(event1, event2),
-                        'tempo_entre': (event2['timestamp'] - event1['timestamp']).total_seconds(),
-                        'força_correlação': self._calculate_correlation_strength(event1, event2)
-                    }
-                    
+                    correlation = self._build_correlation(observations[i], observations[j])
+
                     if correlation['força_correlação'] > 0.3:  # Correlação significativa
-                        correlations.append(correlation)
-                        
+                        self._add_to_correlation_index(index, correlation, 1)
+
+        except Exception as e:
+            print(f"Erro ao identificar correlações: {e}")
+
+        return self._summarize_correlation_index(index)
+
+    def _build_correlation(self, event1, event2):
+        """Calcula as estatísticas de um par de eventos"""
+        return {
+            'eventos': [event1['tipo'], event2['tipo']],
+            'impacto_combinado': self._calculate_combined_impact(event1, event2),
+            'tempo_entre': (event2['timestamp'] - event1['timestamp']).total_seconds(),
+            'força_correlação': self._calculate_correlation_strength(event1, event2),
+            'início': event1['timestamp']
+        }
+
+    def _accumulate_correlations(self, player_name, observation):
+        """Atualiza os agregados de pares com a nova observação"""
+        try:
+            self._observation_times.setdefault(player_name, deque()).append(observation['timestamp'])
+
+            # Pareia com as duas observações anteriores do jogador
+            previous_events = list(self._last_events.get(player_name, []))[:-1]
+            index = self.correlation_index.setdefault(player_name, {})
+            entries = self._correlation_entries.setdefault(player_name, deque())
+
+            for event in previous_events[-2:]:
+                correlation = self._build_correlation(event, observation)
+
+                if correlation['força_correlação'] > 0.3:  # Correlação significativa
+                    self._add_to_correlation_index(index, correlation, 1)
+                    entries.append(correlation)
+
+            self._expire_correlations(player_name)
+
+        except Exception as e:
+            print(f"Erro ao acumular correlações: {e}")
+
+    def _expire_correlations(self, player_name):
+        """Remove dos agregados os pares que saíram da janela de análise"""
+        current_time = datetime.now()
+        window_seconds = self.correlation_window_minutes * 60
+
+        times = self._observation_times.get(player_name)
+        while times and (current_time - times[0]).total_seconds() > window_seconds:
+            times.popleft()
+
+        entries = self._correlation_entries.get(player_name)
+        if not entries:
+            return
+
+        index = self.correlation_index[player_name]
+        while entries and (current_time - entries[0]['início']).total_seconds() > window_seconds:
+            self._add_to_correlation_index(index, entries.popleft(), -1)
+
+    def _add_to_correlation_index(self, index, correlation, sign):
+        """Soma (sign=1) ou retira (sign=-1) um par dos agregados do seu tipo"""
+        key = tuple(correlation['eventos'])
+        stats = index.get(key)
+
+        if stats is None:
+            stats = index[key] = {
+                'ocorrências': 0,
+                'soma_impacto': 0.0,
+                'soma_tempo': 0.0,
+                'soma_força': 0.0,
+                'soma_força_quadrado': 0.0,
+                'sinérgico': self._are_events_synergistic(*key),
+                'antagônico': self._are_events_antagonistic(*key)
+            }
+
+        strength = correlation['força_correlação']
+        stats['ocorrências'] += sign
+        stats['soma_impacto'] += sign * correlation['impacto_combinado']
+        stats['soma_tempo'] += sign * correlation['tempo_entre']
+        stats['soma_força'] += sign * strength
+        stats['soma_força_quadrado'] += sign * strength ** 2
+
+        if stats['ocorrências'] <= 0:
+            del index[key]
+
+    def _summarize_correlation_index(self, index):
+        """Converte os agregados em correlações ordenadas por força"""
+        correlations = []
+
+        try:
+            for key, stats in index.items():
+                count = stats['ocorrências']
+                mean_strength = stats['soma_força'] / count
+
+                correlations.append({
+                    'eventos': list(key),
+                    'impacto_combinado': stats['soma_impacto'] / count,
+                    'tempo_entre': stats['soma_tempo'] / count,
+                    'força_correlação': mean_strength,
+                    'variância_força': max(stats['soma_força_quadrado'] / count - mean_strength ** 2, 0),
+                    'ocorrências': count,
+                    'sinérgico': stats['sinérgico'],
+                    'antagônico': stats['antagônico']
+                })
+
             # Ordena por força de correlação
             correlations.sort(key=lambda x: x['força_correlação'], reverse=True)
-            
+
         except Exception as e:
-            print(f"Erro ao identificar correlações: {e}")
-            
+            print(f"Erro ao resumir correlações: {e}")
+
         return correlations
     
     def _calculate_combined_impact(self, event1, event2):
@@ -884,15 +1194,21 @@ class PlayerBehaviorTracker:
             if not correlations:
                 return multipliers
                 
-            # Média das forças de correlação
-            avg_strength = sum(c['força_correlação'] for c in correlations) / len(correlations)
+            # Média das forças de correlação, ponderada pelas ocorrências de cada par
+            weights = [c.get('ocorrências', 1) for c in correlations]
+            total_weight = sum(weights)
+            avg_strength = sum(
+                c['força_correlação'] * w for c, w in zip(correlations, weights)
+            ) / total_weight
             
             # Ajusta multiplicadores
             multipliers['impacto_emocional'] = 1 + (avg_strength * 0.5)
             multipliers['confiança_previsão'] = 1 + (avg_strength * 0.3)
             
             # Ajusta janela de tempo baseado na proximidade dos eventos
-            avg_time = sum(c['tempo_entre'] for c in correlations) / len(correlations)
+            avg_time = sum(
+                c['tempo_entre'] * w for c, w in zip(correlations, weights)
+            ) / total_weight
             if avg_time < 120:  # Eventos muito próximos
                 multipliers['janela_tempo'] = 0.7  # Janela menor
             elif avg_time > 600:  # Eventos distantes
@@ -909,16 +1225,24 @@ class PlayerBehaviorTracker:
             if not correlations:
                 return 0.5
                 
-            # Fatores de confiança
-            correlation_count = len(correlations)
-            avg_strength = sum(c['força_correlação'] for c in correlations) / correlation_count
+            # Fatores de confiança (cada tipo de par pesa pelas suas ocorrências)
+            weights = [c.get('ocorrências', 1) for c in correlations]
+            correlation_count = sum(weights)
+            avg_strength = sum(
+                c['força_correlação'] * w for c, w in zip(correlations, weights)
+            ) / correlation_count
+            
+            # Consistência das correlações (variância interna + entre tipos)
+            strength_variance = sum(
+                w * (c.get('variância_força', 0) + (c['força_correlação'] - avg_strength) ** 2)
+                for c, w in zip(correlations, weights)
+            ) / correlation_count
             
             # Penaliza se houver poucos dados
             if correlation_count < 3:
                 avg_strength *= 0.7
                 
             # Ajusta baseado na consistência das correlações
-            strength_variance = np.var([c['força_correlação'] for c in correlations])
             consistency_factor = 1 - min(strength_variance, 0.5)
             
             return min(avg_strength * consistency_factor, 1.0)
@@ -997,6 +1321,10 @@ class PlayerBehaviorTracker:
         """Retorna o estado emocional atual do jogador"""
         return self.get_player_emotional_state('current_player')  # Assumindo jogador atual
 
+    def is_healthy(self):
+        """Health check para monitoramento"""
+        return True
+
     def get_recent_history(self, time_window_minutes=30):
         """Retorna o histórico recente de comportamento"""
         observations = self._get_recent_observations('current_player', time_window_minutes)
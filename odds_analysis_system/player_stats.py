@@ -5,6 +5,9 @@ import requests
 import os
 from config import DATA_DIR
 from holzhauer_strategy import HolzhauerNBAAnalyzer
+from player_stats_repository import PlayerStatsRepository
+from prop_model import PropProbabilityModel
+from quarter_simulator import QuarterSimulator
 
 class PlayerStatsAnalyzer:
     def __init__(self):
@@ -12,12 +15,14 @@ class PlayerStatsAnalyzer:
         self.props_file = os.path.join(DATA_DIR, 'player_props.csv')
         self.trends_file = os.path.join(DATA_DIR, 'player_trends.csv')
         self.holzhauer = HolzhauerNBAAnalyzer()
+        self.repository = PlayerStatsRepository(self.stats_file)
+        self.prop_model = PropProbabilityModel(self.repository)
+        self.quarter_simulator = QuarterSimulator(self.repository)
         
     def get_player_stats(self, player_name):
         """Retorna estatísticas do jogador"""
         try:
-            df = pd.read_csv(self.stats_file)
-            player_stats = df[df['player_name'] == player_name].copy()
+            player_stats = self.repository.player(player_name)
             
             if player_stats.empty:
                 return None
@@ -31,161 +36,216 @@ class PlayerStatsAnalyzer:
     def analyze_player_trends(self, player_name, stat_type):
         """Analisa tendências de um jogador para uma estatística específica"""
         try:
-            df = pd.read_csv(self.stats_file)
-            player_stats = df[df['player_name'] == player_name].copy()
+            profile = self._trend_profiles({player_name: [stat_type]}).get(player_name)
+            return profile.get(stat_type) if profile else None
             
-            if player_stats.empty:
-                return None
-                
-            # Análise básica
-            recent_games = player_stats.sort_values('game_date').tail(10)
-            
-            analysis = {
-                'média_últimos_10': recent_games[stat_type].mean(),
-                'tendência': self.holzhauer._analyze_trend(recent_games[stat_type]),
-                'média_casa': recent_games[recent_games['is_home']][stat_type].mean(),
-                'média_fora': recent_games[~recent_games['is_home']][stat_type].mean(),
-                'consistência': recent_games[stat_type].std(),
-                'máximo_10_jogos': recent_games[stat_type].max(),
-                'mínimo_10_jogos': recent_games[stat_type].min()
-            }
+        except Exception as e:
+            print(f"Erro ao analisar tendências do jogador: {e}")
+            return None
+    
+    def _trend_profiles(self, stat_types_by_player):
+        """Perfis de tendência de vários jogadores a partir dos agregados mantidos pelo repositório"""
+        profiles = {}
+        for player_name, stat_types in stat_types_by_player.items():
+            aggregates = self.repository.aggregates(player_name)
+            if not aggregates:
+                continue
+            recent_games = self.repository.recent(player_name, self.repository.window)
             
-            # Análise por quarter (estilo Holzhauer)
+            # Análise por quarter (estilo Holzhauer) e hot streaks não dependem da estatística
             quarters_analysis = self.holzhauer.analyze_quarter_patterns(
                 recent_games,
-                current_quarter=1  # Default para análise inicial
+                current_quarter=1,  # Default para análise inicial
+                quarter_aggregates=aggregates['quarters']
             )
-            analysis['quarters'] = quarters_analysis
-            
-            # Análise de hot streaks
             streaks = self.holzhauer.identify_hot_streaks(recent_games)
-            analysis['streaks'] = streaks
-            
-            return analysis
             
-        except Exception as e:
-            print(f"Erro ao analisar tendências do jogador: {e}")
-            return None
+            profiles[player_name] = {
+                stat_type: {
+                    'média_últimos_10': aggregates['stats'][stat_type]['mean'],
+                    'tendência': self.holzhauer._analyze_trend(recent_games[stat_type]),
+                    'média_casa': aggregates['stats'][stat_type]['home_mean'],
+                    'média_fora': aggregates['stats'][stat_type]['away_mean'],
+                    'consistência': aggregates['stats'][stat_type]['std'],
+                    'máximo_10_jogos': aggregates['stats'][stat_type]['max'],
+                    'mínimo_10_jogos': aggregates['stats'][stat_type]['min'],
+                    'quarters': quarters_analysis,
+                    'streaks': streaks
+                }
+                for stat_type in stat_types if stat_type in aggregates['stats']
+            }
+        
+        return profiles
     
     def find_value_props(self, live_odds):
         """Encontra props com valor baseado nas tendências e estratégia Holzhauer"""
         try:
             props_df = pd.read_csv(self.props_file)
-            value_props = []
+            if props_df.empty:
+                return []
             
-            for _, prop in props_df.iterrows():
-                player_name = prop['player_name']
-                stat_type = prop['stat_type']
-                line = prop['line']
-                
-                # Análise do jogador
-                analysis = self.analyze_player_trends(player_name, stat_type)
-                if not analysis:
-                    continue
-                
-                # Análise Holzhauer de oportunidades prime
-                current_game_stats = {
-                    'current_quarter': 1,  # Atualizar com dados reais
-                    f'current_{stat_type}': 0,  # Atualizar com dados reais
-                    'last_3_minutes': {
-                        'points': [],  # Últimos 3 minutos de pontuação
-                    },
-                    'current_pace': 0,  # Ritmo atual
-                    'average_pace': 0,  # Ritmo médio
-                    'time_remaining': 0,  # Tempo restante
-                    'quarter': 1  # Quarter atual
-                }
-                
-                # Atualiza estatísticas do jogo atual se disponíveis
-                if live_odds and live_odds.get('game_stats'):
-                    game_stats = live_odds['game_stats']
-                    current_game_stats.update({
-                        'current_quarter': game_stats.get('quarter', 1),
-                        f'current_{stat_type}': game_stats.get(f'current_{stat_type}', 0),
-                        'last_3_minutes': game_stats.get('last_3_minutes', {'points': []}),
-                        'current_pace': game_stats.get('current_pace', 0),
-                        'average_pace': game_stats.get('average_pace', 0),
-                        'time_remaining': game_stats.get('time_remaining', 0),
-                        'quarter': game_stats.get('quarter', 1)
-                    })
-                
-                prime_opps = self.holzhauer.find_prime_opportunities(
-                    player_stats=pd.read_csv(self.stats_file),
-                    current_game_stats=current_game_stats
-                )
-                
-                # Combina análises tradicionais com estratégia Holzhauer
-                for opp in prime_opps:
-                    if opp['stat_type'] == stat_type:
-                        # Análise de momento
-                        game_plan = self.holzhauer.generate_game_plan(
-                            player_stats=pd.read_csv(self.stats_file),
-                            opponent_stats=None,
-                            game_situation=current_game_stats
-                        )
-                        
-                        # Ajusta confiança baseado no momento
-                        base_confidence = opp['confidence']
-                        momentum_factor = game_plan['momentum']['overall_factor']
-                        adjusted_confidence = self.holzhauer.adjust_confidence_by_momentum(
-                            base_confidence,
-                            momentum_factor
-                        )
-                        
-                        # Analisa possibilidade de explosão de pontuação
-                        momentum_shift = self.holzhauer.detect_momentum_shifts(
-                            player_stats=pd.read_csv(self.stats_file),
-                            game_situation={
-                                **current_game_stats,
-                                'last_points': self._get_recent_points(player_name)
-                            }
-                        )
-                        
-                        # Analisa matchup com defensor
-                        if live_odds and live_odds.get('defender_stats'):
-                            matchup_analysis = self.holzhauer.analyze_matchup_history(
-                                player_stats=pd.read_csv(self.stats_file),
-                                opponent_stats=live_odds['defender_stats'],
-                                current_matchup={
-                                    'defender_id': live_odds['defender_stats']['player_id'],
-                                    'game_situation': current_game_stats
-                                }
-                            )
-                        else:
-                            matchup_analysis = None
-                            
-                        # Analisa humor e fatores emocionais
-                        if live_odds and live_odds.get('player_events'):
-                            mood_analysis = self.holzhauer.analyze_player_mood(
-                                player_name=player_name,
-                                game_date=datetime.now(),
-                                recent_events=live_odds['player_events']
-                            )
-                        else:
-                            mood_analysis = None
-                        
-                        value_props.append({
-                            'player_name': player_name,
-                            'stat_type': stat_type,
-                            'line': line,
-                            'odds': prop['odds'],
-                            'análise': analysis,
-                            'confiança': adjusted_confidence,
-                            'momento': game_plan['momentum'],
-                            'momentum_shift': momentum_shift,
-                            'matchup_analysis': matchup_analysis,
-                            'mood_analysis': mood_analysis,
-                            'recomendação': 'over' if line < opp['expected_value'] else 'under',
-                            'estratégia': opp['recommendation']
-                        })
+            # Perfis de todos os jogadores das props em uma passada
+            stat_types_by_player = props_df.groupby('player_name', sort=False)['stat_type'].unique().apply(list).to_dict()
+            profiles = self._trend_profiles(stat_types_by_player)
+            
+            # Análises Holzhauer uma vez por jogador
+            contexts = {}
+            opportunities = []
+            for player_name, profile in profiles.items():
+                player_opps, context = self._player_context(player_name, list(profile), live_odds)
+                if player_opps:
+                    contexts[player_name] = context
+                    opportunities.extend({**opp, 'player_name': player_name} for opp in player_opps)
+            
+            opps = pd.DataFrame(opportunities, columns=['player_name', 'stat_type', 'confidence', 'expected_value', 'recommendation'])
+            if opps.empty:
+                return []
+            
+            # Combina análises tradicionais com estratégia Holzhauer: todas as props de uma vez
+            evaluated = props_df[['player_name', 'stat_type', 'line', 'odds']].merge(opps, on=['player_name', 'stat_type'])
+            momentum_factor = evaluated['player_name'].map(
+                {player_name: context['game_plan']['momentum']['overall_factor'] for player_name, context in contexts.items()}
+            )
+            evaluated['confiança'] = self.holzhauer.adjust_confidence_by_momentum(evaluated['confidence'], momentum_factor)
+            evaluated['recomendação'] = np.where(evaluated['line'] < evaluated['expected_value'], 'over', 'under')
+            evaluated['probabilidade_over'] = self.prop_model.probability_over(
+                evaluated['player_name'], evaluated['stat_type'], evaluated['line']
+            )
             
             # Ordena por confiança (estilo Holzhauer)
-            return sorted(value_props, key=lambda x: x['confiança'], reverse=True)
+            evaluated = evaluated.sort_values('confiança', ascending=False, kind='stable')
+            
+            value_props = []
+            for prop in evaluated.to_dict('records'):
+                context = contexts[prop['player_name']]
+                value_props.append({
+                    'player_name': prop['player_name'],
+                    'stat_type': prop['stat_type'],
+                    'line': prop['line'],
+                    'odds': prop['odds'],
+                    'análise': profiles[prop['player_name']][prop['stat_type']],
+                    'confiança': prop['confiança'],
+                    'momento': context['game_plan']['momentum'],
+                    'momentum_shift': context['momentum_shift'],
+                    'matchup_analysis': context['matchup_analysis'],
+                    'mood_analysis': context['mood_analysis'],
+                    'recomendação': prop['recomendação'],
+                    'estratégia': prop['recommendation'],
+                    'probabilidade_over': prop['probabilidade_over'],
+                    'ev_over': prop['probabilidade_over'] * prop['odds'] - 1
+                })
+            
+            return value_props
             
         except Exception as e:
             print(f"Erro ao encontrar props com valor: {e}")
             return []
     
+    def _player_context(self, player_name, stat_types, live_odds):
+        """Oportunidades prime e análises Holzhauer de um jogador, comuns a todas as suas props"""
+        # Análise Holzhauer de oportunidades prime
+        current_game_stats = {
+            'current_quarter': 1,  # Atualizar com dados reais
+            **{f'current_{stat_type}': 0 for stat_type in stat_types},  # Atualizar com dados reais
+            'last_3_minutes': {
+                'points': [],  # Últimos 3 minutos de pontuação
+            },
+            'current_pace': 0,  # Ritmo atual
+            'average_pace': 0,  # Ritmo médio
+            'time_remaining': 0,  # Tempo restante
+            'quarter': 1  # Quarter atual
+        }
+        
+        # Atualiza estatísticas do jogo atual se disponíveis
+        if live_odds and live_odds.get('game_stats'):
+            game_stats = live_odds['game_stats']
+            current_game_stats.update({
+                'current_quarter': game_stats.get('quarter', 1),
+                **{f'current_{stat_type}': game_stats.get(f'current_{stat_type}', 0) for stat_type in stat_types},
+                'last_3_minutes': game_stats.get('last_3_minutes', {'points': []}),
+                'current_pace': game_stats.get('current_pace', 0),
+                'average_pace': game_stats.get('average_pace', 0),
+                'time_remaining': game_stats.get('time_remaining', 0),
+                'quarter': game_stats.get('quarter', 1)
+            })
+        
+        player_stats = self.repository.player(player_name)
+        prime_opps = self.holzhauer.find_prime_opportunities(
+            player_stats=player_stats,
+            current_game_stats=current_game_stats
+        )
+        prime_opps = [opp for opp in prime_opps if opp['stat_type'] in stat_types]
+        if not prime_opps:
+            return [], None
+        
+        # Análise de momento
+        game_plan = self.holzhauer.generate_game_plan(
+            player_stats=player_stats,
+            opponent_stats=None,
+            game_situation=current_game_stats
+        )
+        
+        # Analisa possibilidade de explosão de pontuação
+        momentum_shift = self.holzhauer.detect_momentum_shifts(
+            player_stats=player_stats,
+            game_situation={
+                **current_game_stats,
+                'last_points': player_stats.tail(3)['points'].tolist()
+            }
+        )
+        
+        # Analisa matchup com defensor
+        if live_odds and live_odds.get('defender_stats'):
+            matchup_analysis = self.holzhauer.analyze_matchup_history(
+                player_stats=player_stats,
+                opponent_stats=live_odds['defender_stats'],
+                current_matchup={
+                    'defender_id': live_odds['defender_stats']['player_id'],
+                    'game_situation': current_game_stats
+                }
+            )
+        else:
+            matchup_analysis = None
+            
+        # Analisa humor e fatores emocionais
+        if live_odds and live_odds.get('player_events'):
+            mood_analysis = self.holzhauer.analyze_player_mood(
+                player_name=player_name,
+                game_date=datetime.now(),
+                recent_events=live_odds['player_events']
+            )
+        else:
+            mood_analysis = None
+        
+        return prime_opps, {
+            'game_plan': game_plan,
+            'momentum_shift': momentum_shift,
+            'matchup_analysis': matchup_analysis,
+            'mood_analysis': mood_analysis
+        }
+    
+    def score_props(self, match=None, resolve_match=None):
+        """Probabilidade de over/under e EV das props (todas ou de uma partida) pela distribuição de cada jogador
+
+        `resolve_match` leva o game_id de cada prop à partida, como é feito com o id da URL.
+        """
+        try:
+            props_df = pd.read_csv(self.props_file)
+            if match is not None:
+                game_ids = props_df['game_id'].astype(str)
+                resolve_match = resolve_match or (lambda game_id: game_id)
+                matches = {game_id: resolve_match(game_id) for game_id in game_ids.unique()}
+                props_df = props_df[game_ids.map(matches) == match]
+            if props_df.empty:
+                return props_df
+            
+            scored = self.prop_model.score(props_df)
+            return scored.sort_values('ev_over', ascending=False, ignore_index=True)
+            
+        except Exception as e:
+            print(f"Erro ao calcular probabilidades das props: {e}")
+            return pd.DataFrame()
+    
     def get_live_stats(self, game_id):
         """Obtém estatísticas ao vivo do jogo"""
         # Aqui você implementaria a conexão com uma API de stats ao vivo
@@ -195,17 +255,12 @@ class PlayerStatsAnalyzer:
     def update_player_stats(self, stats_data):
         """Atualiza o arquivo de estatísticas dos jogadores"""
         try:
-            if os.path.exists(self.stats_file):
-                current_stats = pd.read_csv(self.stats_file)
-            else:
-                current_stats = pd.DataFrame()
-            
-            new_stats = pd.DataFrame(stats_data)
-            updated_stats = pd.concat([current_stats, new_stats]).drop_duplicates()
-            updated_stats.to_csv(self.stats_file, index=False)
+            # Grava só as linhas novas ou corrigidas por (jogador, data); o arquivo nunca é reescrito
+            return self.repository.append(stats_data)
             
         except Exception as e:
             print(f"Erro ao atualizar estatísticas: {e}")
+            return None
     
     def get_quarter_predictions(self, player_name, current_stats):
         """Prevê estatísticas para os próximos quarters usando estratégia Holzhauer"""
@@ -216,38 +271,40 @@ class PlayerStatsAnalyzer:
                 return None
                 
             # Gera plano de jogo Holzhauer
-            player_stats = pd.read_csv(self.stats_file)
             game_plan = self.holzhauer.generate_game_plan(
-                player_stats=player_stats[player_stats['player_name'] == player_name],
+                player_stats=self.repository.player(player_name),
                 opponent_stats=None,  # Implementar análise de oponente
                 game_situation=current_stats
             )
             
+            # Simula os quarters restantes com o ritmo atual do jogador
+            projection = self.quarter_simulator.simulate(
+                [player_name],
+                current_quarter=current_stats['current_quarter'],
+                current_points={player_name: current_stats['current_points']}
+            )['players'][player_name]
+
             predictions = {}
             remaining_quarters = range(current_stats['current_quarter'] + 1, 5)
-            
+
             for quarter in remaining_quarters:
-                # Previsão base
-                q_avg = analysis['quarters'][f'q{quarter}']['média']
-                q_trend = analysis['quarters'][f'q{quarter}']['tendência']
-                
+                # Previsão base: média simulada do quarter
+                simulated = projection['quarters'][f'q{quarter}']
+
                 # Ajuste Holzhauer
                 is_high_value = any(
                     target['quarter'] == str(quarter)
                     for target in game_plan['high_value_targets']
                 )
-                
-                # Ajusta previsão baseado no ritmo e estratégia
-                current_pace = current_stats['current_points'] / current_stats['current_quarter']
-                pace_factor = current_pace / analysis['média_últimos_10']
-                
-                predicted_value = q_avg * pace_factor
+
+                predicted_value = simulated['mean']
                 if is_high_value:
                     predicted_value *= 1.2  # Bônus para quarters de alto valor
-                
+
                 predictions[f'q{quarter}'] = {
                     'previsão': predicted_value,
-                    'tendência': q_trend,
+                    'intervalo': (simulated['p10'], simulated['p90']),
+                    'tendência': simulated['trend'],
                     'confiança': self._calculate_quarter_confidence(
                         current_stats, analysis, quarter
                     ),
@@ -283,13 +340,7 @@ class PlayerStatsAnalyzer:
     def _get_recent_points(self, player_name):
         """Obtém pontos recentes do jogador"""
         try:
-            df = pd.read_csv(self.stats_file)
-            player_stats = df[df['player_name'] == player_name].copy()
-            
-            if player_stats.empty:
-                return []
-                
-            return player_stats.sort_values('game_date').tail(3)['points'].tolist()
+            return self.repository.recent(player_name, 3)['points'].tolist()
             
         except Exception as e:
             print(f"Erro ao obter pontos recentes: {e}")
@@ -298,8 +349,7 @@ class PlayerStatsAnalyzer:
     def get_total_bets(self):
         """Retorna o total de apostas realizadas"""
         try:
-            df = pd.read_csv(self.stats_file)
-            return len(df)
+            return len(self.repository.all())
         except Exception as e:
             print(f"Erro ao obter total de apostas: {e}")
             return 0
@@ -307,7 +357,7 @@ class PlayerStatsAnalyzer:
     def get_win_rate(self):
         """Retorna a taxa de vitória das apostas"""
         try:
-            df = pd.read_csv(self.stats_file)
+            df = self.repository.all()
             if len(df) == 0:
                 return 0
             wins = len(df[df['result'] == 'win'])
@@ -319,13 +369,12 @@ class PlayerStatsAnalyzer:
     def get_current_streak(self):
         """Retorna a sequência atual de resultados"""
         try:
-            df = pd.read_csv(self.stats_file)
+            df = self.repository.all()
             if len(df) == 0:
                 return 0
             
-            # Ordena por data e pega os resultados mais recentes
-            df = df.sort_values('game_date', ascending=False)
-            results = df['result'].tolist()
+            # Resultados mais recentes primeiro (o repositório já ordena por data)
+            results = df['result'].tolist()[::-1]
             
             streak = 0
             current_result = results[0]
@@ -0,0 +1,413 @@
+import io
+import json
+import logging
+import os
+import threading
+import pandas as pd
+from config import PLAYER_STATS_FILE, PLAYER_STATS_INDEX_FILE, QUARTER_ANALYSIS_WINDOW, TREND_ANALYSIS_WINDOW
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ['player_name', 'game_date']
+
+class PlayerStatsRepository:
+    """Estatísticas dos jogadores em memória, indexadas por jogador e ordenadas por data
+
+    O CSV é lido uma única vez; depois disso cada consulta só confere o mtime
+    do arquivo. Quando o arquivo cresceu apenas no final (acréscimo), lê só as
+    linhas novas e atualiza os jogadores afetados; qualquer outra mudança
+    recarrega tudo. Os DataFrames devolvidos são compartilhados e não devem
+    ser alterados.
+
+    O arquivo é um log de acréscimos com chave (player_name, game_date): uma
+    linha posterior com a mesma chave corrige a anterior. A ingestão consulta
+    um índice persistente chave -> linha gravada, então só grava linhas novas
+    ou corrigidas e nunca reescreve o arquivo. O índice também é um log
+    (JSONL): cada ingestão acrescenta as chaves que aprendeu e até onde o CSV
+    foi indexado.
+
+    Os agregados dos últimos `window` jogos de cada jogador (média, desvio,
+    extremos, casa/fora, média dos últimos `recent_window` e médias por
+    quarter) são recalculados só para os jogadores que receberam jogos novos,
+    então a leitura das tendências é uma consulta em dicionário.
+    """
+
+    def __init__(self, stats_file=PLAYER_STATS_FILE, index_file=PLAYER_STATS_INDEX_FILE,
+                 window=QUARTER_ANALYSIS_WINDOW, recent_window=TREND_ANALYSIS_WINDOW):
+        self.stats_file = stats_file
+        self.index_file = index_file
+        self.window = window
+        self.recent_window = recent_window
+        self.columns = []
+        self.stats = pd.DataFrame()  # Todas as linhas, ordenadas por game_date
+        self.players = {}  # jogador -> DataFrame ordenado por game_date
+        self._aggregates = {}  # jogador -> agregados da janela dos últimos jogos
+        self._versions = {}  # jogador -> geração da última mudança no seu histórico
+        self._generation = 0  # Cresce a cada ingestão, inclusive entre recargas
+        self._mtime = None
+        self._offset = 0
+        self._tail = b''  # Últimos bytes lidos, para confirmar que o arquivo só cresceu
+        self._keys = None  # (jogador, data) -> texto da última linha gravada
+        self._keys_offset = 0
+        self._keys_tail = b''
+        self._pending_keys = []  # Chaves indexadas ainda não gravadas no índice persistente
+        self._rebuild_index = False
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """Confere o mtime do arquivo e incorpora as mudanças"""
+        with self._lock:
+            try:
+                try:
+                    stat = os.stat(self.stats_file)
+                except FileNotFoundError:
+                    if self._mtime is not None:
+                        self._reset()
+                    return
+                if stat.st_mtime_ns == self._mtime and stat.st_size == self._offset:
+                    return
+
+                if self._mtime is not None and stat.st_size > self._offset and self._is_append(self._offset, self._tail):
+                    self._read_appended(stat.st_size)
+                else:
+                    self._load()
+                self._mtime = stat.st_mtime_ns
+
+            except Exception as e:
+                logger.error(f"Erro ao atualizar estatísticas dos jogadores: {e}")
+
+    def all(self):
+        """Todas as estatísticas, ordenadas por game_date"""
+        self.refresh()
+        return self.stats
+
+    def player(self, player_name):
+        """Estatísticas de um jogador, ordenadas por game_date (vazio se não houver)"""
+        self.refresh()
+        return self.players.get(player_name, self.stats.iloc[0:0])
+
+    def recent(self, player_name, games):
+        """Últimos jogos de um jogador"""
+        return self.player(player_name).tail(games)
+
+    def aggregates(self, player_name):
+        """Agregados da janela de últimos jogos do jogador, ou None"""
+        self.refresh()
+        return self._aggregates.get(player_name)
+
+    def player_version(self, player_name):
+        """Versão do histórico do jogador: muda sempre que ele recebe jogos novos ou corrigidos"""
+        self.refresh()
+        return self._versions.get(player_name)
+
+    def generation(self):
+        """Versão do repositório inteiro: muda a cada ingestão"""
+        self.refresh()
+        return self._generation
+
+    def append(self, rows):
+        """Grava as linhas novas ou corrigidas (por jogador e data) e retorna as contagens da ingestão"""
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0}
+        with self._lock:
+            try:
+                new_rows = pd.DataFrame(rows)
+                if new_rows.empty:
+                    return counts
+
+                self._sync_keys()
+                write_header = not self.columns
+                if write_header:
+                    self.columns = list(new_rows.columns)
+                new_rows = new_rows.reindex(columns=self.columns).dropna(subset=KEY_COLUMNS)
+
+                # Dentro do lote vale o último valor informado de cada campo por chave
+                new_rows = new_rows.groupby(KEY_COLUMNS, sort=False, as_index=False).last()[self.columns]
+                lines = self._csv_lines(new_rows.to_csv(header=False, index=False).encode('utf-8'))
+                keys = self._line_keys(lines)
+                previous = [self._keys.get(key) for key in keys]
+
+                lines, write = self._merge_lines(lines, previous)
+                counts['new'] = sum(old is None for old in previous)
+                counts['updated'] = sum(write) - counts['new']
+                counts['unchanged'] = len(write) - counts['new'] - counts['updated']
+                lines = [line for line, changed in zip(lines, write) if changed]
+                if not lines:
+                    return counts
+
+                # Uma única escrita em modo append; o arquivo nunca é reescrito
+                data = b''.join(line + b'\n' for line in lines)
+                if write_header:
+                    data = (','.join(self.columns) + '\n').encode('utf-8') + data
+                elif self._keys_tail and not self._keys_tail.endswith(b'\n'):
+                    data = b'\n' + data  # Arquivo terminado sem quebra de linha
+                fd = os.open(self.stats_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+
+                self._sync_keys()
+                self._save_keys()
+                logger.info(
+                    f"Estatísticas ingeridas: {counts['new']} novas, {counts['updated']} corrigidas, "
+                    f"{counts['unchanged']} sem mudança"
+                )
+                return counts
+
+            except Exception as e:
+                logger.error(f"Erro ao acrescentar estatísticas dos jogadores: {e}")
+                return counts
+
+    def _merge_lines(self, lines, previous):
+        """Completa as linhas com os valores já gravados da mesma chave e indica quais mudaram
+
+        Um campo vazio na linha nova mantém o valor gravado, então uma linha
+        parcial atualiza só o que informa. Os valores são comparados depois de
+        normalizar o tipo: 5 e 5.0 são o mesmo valor.
+        """
+        write = [old is None for old in previous]
+        positions = [i for i, old in enumerate(previous) if old is not None]
+        if not positions:
+            return lines, write
+
+        new = self._parse_lines([lines[i] for i in positions])
+        old = self._parse_lines([previous[i] for i in positions])
+        merged = new.mask(new == '', old)
+
+        merged_numbers = merged.apply(pd.to_numeric, errors='coerce')
+        old_numbers = old.apply(pd.to_numeric, errors='coerce')
+        same = (merged_numbers == old_numbers) | (merged_numbers.isna() & old_numbers.isna() & (merged == old))
+        changed = ~same.all(axis=1)
+
+        lines = list(lines)
+        merged_lines = self._csv_lines(merged.to_csv(header=False, index=False).encode('utf-8'))
+        for i, line, line_changed in zip(positions, merged_lines, changed):
+            lines[i], write[i] = line, bool(line_changed)
+        return lines, write
+
+    def _parse_lines(self, lines):
+        """Linhas do CSV como texto, sem conversão de tipos (campo vazio vira '')"""
+        return pd.read_csv(io.BytesIO(b'\n'.join(lines)), names=self.columns, header=None,
+                           dtype=str, keep_default_na=False)
+
+    def _csv_lines(self, data):
+        """Linhas de dados do CSV, sem terminadores"""
+        return [line.rstrip(b'\r') for line in data.split(b'\n') if line.strip()]
+
+    def _line_keys(self, lines):
+        """Chave (jogador, data) de cada linha do CSV"""
+        if not lines:
+            return []
+        keys = pd.read_csv(io.BytesIO(b'\n'.join(lines)), names=self.columns, header=None,
+                           usecols=KEY_COLUMNS, dtype=str, keep_default_na=False)
+        return list(zip(keys['player_name'], keys['game_date']))
+
+    def _sync_keys(self):
+        """Carrega o índice de chaves e incorpora as linhas gravadas depois dele"""
+        if self._keys is None:
+            self._load_keys()
+
+        size = os.path.getsize(self.stats_file) if os.path.exists(self.stats_file) else 0
+        if size < self._keys_offset or not self._is_append(self._keys_offset, self._keys_tail):
+            logger.warning("Arquivo de estatísticas reescrito, reconstruindo índice de chaves")
+            self._keys, self._keys_offset, self._keys_tail = {}, 0, b''
+            self._pending_keys, self._rebuild_index = [], True
+        if size == self._keys_offset:
+            return
+
+        with open(self.stats_file, 'rb') as f:
+            f.seek(self._keys_offset)
+            data = f.read(size - self._keys_offset)
+
+        if self._keys_offset == 0:
+            # Cabeçalho: define as colunas do arquivo
+            header_end = data.find(b'\n') + 1 or len(data)
+            self.columns = [column.strip() for column in data[:header_end].decode('utf-8').split(',')]
+            self._keys_offset, self._keys_tail = header_end, data[:header_end][-256:]
+            data = data[header_end:]
+
+        # Considera apenas linhas completas; o restante é lido na próxima vez
+        complete = data.rfind(b'\n') + 1
+        if not complete:
+            return
+        lines = self._csv_lines(data[:complete])
+        indexed = list(zip(self._line_keys(lines), lines))
+        self._keys.update(indexed)
+        self._pending_keys.extend(indexed)
+        self._keys_offset += complete
+        self._keys_tail = (self._keys_tail + data[:complete])[-256:]
+
+    def _load_keys(self):
+        """Reaplica o log do índice de chaves (vazio se não existir)"""
+        self._keys, self._keys_offset, self._keys_tail = {}, 0, b''
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # Registro incompleto: o restante é reindexado a partir do CSV
+                    record = json.loads(line)
+                    self.columns = record['columns']
+                    self._keys.update(((player_name, game_date), row.encode('utf-8')) for player_name, game_date, row in record['keys'])
+                    self._keys_offset = record['offset']
+                    self._keys_tail = record['tail'].encode('latin-1')
+        except Exception as e:
+            logger.warning(f"Índice de chaves inválido, reconstruindo: {e}")
+            self._keys, self._keys_offset, self._keys_tail = {}, 0, b''
+            self._rebuild_index = True
+
+    def _save_keys(self):
+        """Acrescenta ao índice as chaves indexadas desde a última gravação"""
+        keys = self._keys.items() if self._rebuild_index else self._pending_keys
+        record = {
+            'columns': self.columns,
+            'offset': self._keys_offset,
+            'tail': self._keys_tail.decode('latin-1'),
+            'keys': [[player_name, game_date, row.decode('utf-8')] for (player_name, game_date), row in keys]
+        }
+        data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        if self._rebuild_index:
+            # Índice reconstruído: substitui o log de forma atômica
+            tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.index_file)
+        else:
+            fd = os.open(self.index_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        self._pending_keys, self._rebuild_index = [], False
+
+    def _reset(self):
+        """Esvazia o índice"""
+        self.stats = pd.DataFrame()
+        self.players = {}
+        self._aggregates = {}
+        self._versions = {}
+        self._mtime = None
+        self._offset = 0
+        self._tail = b''
+
+    def _load(self):
+        """Lê o arquivo inteiro e reconstrói o índice"""
+        with open(self.stats_file, 'rb') as f:
+            data = f.read()
+
+        self._reset()
+        complete = data.rfind(b'\n') + 1 or len(data)
+        stats = pd.read_csv(io.BytesIO(data[:complete])) if complete else pd.DataFrame()
+        stats.columns = stats.columns.str.strip()
+        self.columns = list(stats.columns)
+        self.stats = stats.iloc[0:0]
+        self._ingest(stats)
+        self._advance(data[:complete])
+
+    def _is_append(self, offset, tail):
+        """Verifica se o conteúdo lido até o offset continua igual no arquivo"""
+        if not tail:
+            return True
+        with open(self.stats_file, 'rb') as f:
+            f.seek(offset - len(tail))
+            return f.read(len(tail)) == tail
+
+    def _read_appended(self, size):
+        """Lê apenas as linhas acrescentadas desde a última leitura"""
+        with open(self.stats_file, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+        # Considera apenas linhas completas; o restante é lido na próxima vez
+        complete = data.rfind(b'\n') + 1
+        if not complete:
+            return
+        self._ingest(pd.read_csv(io.BytesIO(data[:complete]), names=self.columns, header=None))
+        self._advance(data[:complete])
+
+    def _advance(self, data):
+        """Avança o offset de leitura"""
+        self._offset += len(data)
+        self._tail = (self._tail + data)[-256:]
+
+    def _ingest(self, rows):
+        """Incorpora linhas novas ao índice; a última linha de cada (jogador, data) prevalece"""
+        if rows.empty:
+            return
+
+        rows = rows.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        rows = rows.sort_values('game_date', kind='stable', ignore_index=True)
+        corrected = False
+
+        for player_name, games in rows.groupby('player_name', sort=False):
+            current = self.players.get(player_name)
+            if current is None:
+                self.players[player_name] = games.reset_index(drop=True)
+                continue
+
+            # Linhas corrigidas substituem as anteriores da mesma data
+            replaced = current['game_date'].isin(games['game_date'])
+            if replaced.any():
+                corrected = True
+                current = current[~replaced]
+            if current.empty or games['game_date'].iloc[0] >= current['game_date'].iloc[-1]:
+                self.players[player_name] = pd.concat([current, games], ignore_index=True)
+            else:
+                self.players[player_name] = pd.concat([current, games]).sort_values(
+                    'game_date', kind='stable', ignore_index=True
+                )
+
+        if self.stats.empty:
+            self.stats = rows
+        elif corrected:
+            stats = pd.concat([self.stats, rows], ignore_index=True).drop_duplicates(subset=KEY_COLUMNS, keep='last')
+            self.stats = stats.sort_values('game_date', kind='stable', ignore_index=True)
+        elif rows['game_date'].iloc[0] >= self.stats['game_date'].iloc[-1]:
+            self.stats = pd.concat([self.stats, rows], ignore_index=True)
+        else:
+            self.stats = pd.concat([self.stats, rows], ignore_index=True).sort_values('game_date', kind='stable', ignore_index=True)
+
+        self._generation += 1
+        self._versions.update((player_name, self._generation) for player_name in rows['player_name'].unique())
+        self._update_aggregates(rows['player_name'].unique())
+
+    def _update_aggregates(self, player_names):
+        """Recalcula os agregados da janela dos jogadores informados, todos de uma vez"""
+        recent = pd.concat([self.players[player_name].tail(self.window) for player_name in player_names])
+        stat_columns = list(recent.select_dtypes('number').columns)
+        quarter_columns = {
+            f'q{quarter}': f'quarter_{quarter}_pts' for quarter in range(1, 5) if f'quarter_{quarter}_pts' in stat_columns
+        }
+
+        by_player = recent.groupby('player_name', sort=False)[stat_columns]
+        summary = by_player.agg(['mean', 'std', 'max', 'min']).to_dict('index')
+        latest = recent.groupby('player_name', sort=False).tail(self.recent_window)
+        latest = latest.groupby('player_name', sort=False)[stat_columns].mean().to_dict('index')
+        venue = recent.groupby(['player_name', recent['is_home'] == True])[stat_columns].mean().to_dict('index')
+        games = recent.groupby('player_name', sort=False).size().to_dict()
+
+        for player_name in player_names:
+            player_summary = summary[player_name]
+            home = venue.get((player_name, True), {})
+            away = venue.get((player_name, False), {})
+            self._aggregates[player_name] = {
+                'games': games[player_name],
+                'stats': {
+                    stat: {
+                        'mean': player_summary[(stat, 'mean')],
+                        'std': player_summary[(stat, 'std')],
+                        'max': player_summary[(stat, 'max')],
+                        'min': player_summary[(stat, 'min')],
+                        'home_mean': home.get(stat, float('nan')),
+                        'away_mean': away.get(stat, float('nan')),
+                        'recent_mean': latest[player_name][stat]
+                    }
+                    for stat in stat_columns
+                },
+                'quarters': {
+                    quarter: {'mean': player_summary[(column, 'mean')], 'recent_mean': latest[player_name][column]}
+                    for quarter, column in quarter_columns.items()
+                }
+            }
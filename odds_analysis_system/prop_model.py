@@ -0,0 +1,150 @@
+import logging
+import numpy as np
+from scipy import stats
+from config import PROP_PRIOR_GAMES, PROP_MODEL_WINDOW
+
+logger = logging.getLogger(__name__)
+
+def shrink_moments(games, mean, var, league_mean, league_var, prior_games, is_count=True):
+    """Média e variância encolhidas em direção às da liga, que entra com o peso de `prior_games` jogos
+
+    Opera sobre arrays. Nas contagens a variância a priori fica na escala do
+    jogador: mesma dispersão (variância/média) da liga.
+    """
+    shrunk_mean = (games * mean + prior_games * league_mean) / (games + prior_games)
+    prior_var = np.where(is_count, shrunk_mean * league_var / np.maximum(league_mean, 1e-9), league_var)
+    dof = np.maximum(games - 1, 0)
+    shrunk_var = (dof * var + prior_games * prior_var) / (dof + prior_games)
+    return shrunk_mean, shrunk_var
+
+def count_parameters(mean, var):
+    """Sobredispersão e parâmetros (r, p) da binomial negativa com a média e a variância dadas"""
+    overdispersed = var > mean * (1 + 1e-6)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.where(overdispersed, mean ** 2 / (var - mean), 1.0)
+        p = np.where(overdispersed, mean / var, 0.5)
+    return overdispersed, r, p
+
+def count_cdf(values, mean, var):
+    """P(X <= valor) da contagem: binomial negativa com sobredispersão, Poisson sem"""
+    overdispersed, r, p = count_parameters(mean, var)
+    return np.where(overdispersed, stats.nbinom.cdf(values, r, p), stats.poisson.cdf(values, mean))
+
+def count_sf(values, mean, var):
+    """P(X > valor) da contagem: binomial negativa com sobredispersão, Poisson sem"""
+    overdispersed, r, p = count_parameters(mean, var)
+    return np.where(overdispersed, stats.nbinom.sf(values, r, p), stats.poisson.sf(values, mean))
+
+class PropProbabilityModel:
+    """Probabilidade de over das props pela distribuição de cada (jogador, estatística)
+
+    Estatísticas de contagem seguem uma binomial negativa (Poisson quando não
+    há sobredispersão) e as demais uma normal. Média e variância dos últimos
+    `window` jogos do jogador são encolhidas em direção às da liga com peso
+    de `prior_games` jogos, então quem tem poucos jogos fica perto da liga.
+    Os momentos de cada jogador ficam em cache pela versão do seu histórico
+    no repositório; o encolhimento e as probabilidades de todas as props são
+    calculados de uma vez sobre arrays.
+    """
+
+    def __init__(self, repository, prior_games=PROP_PRIOR_GAMES, window=PROP_MODEL_WINDOW):
+        self.repository = repository
+        self.prior_games = prior_games
+        self.window = window
+        self._moments = {}  # jogador -> (versão, {estatística: (jogos, média, variância)})
+        self._league = {'generation': None, 'stats': {}}  # estatística -> (média, variância, contagem?)
+
+    def probability_over(self, players, stat_types, lines):
+        """P(estatística > linha) para cada prop (NaN para estatísticas desconhecidas)"""
+        return self._probabilities(players, stat_types, lines)[0]
+
+    def score(self, props):
+        """Probabilidades, odds justas e EV de todas as props (player_name, stat_type, line[, odds, under_odds])"""
+        try:
+            prob_over, prob_under = self._probabilities(props['player_name'], props['stat_type'], props['line'])
+            scored = props.assign(
+                prob_over=prob_over,
+                prob_under=prob_under,
+                fair_over_odds=1 / prob_over,
+                fair_under_odds=1 / prob_under
+            )
+            if 'odds' in scored.columns:
+                scored['ev_over'] = prob_over * scored['odds'] - 1
+            if 'under_odds' in scored.columns:
+                scored['ev_under'] = prob_under * scored['under_odds'] - 1
+            return scored
+
+        except Exception as e:
+            logger.error(f"Erro ao calcular probabilidades das props: {e}")
+            return props.iloc[0:0]
+
+    def _probabilities(self, players, stat_types, lines):
+        """P(over) e P(under) de cada prop em uma operação sobre os arrays"""
+        league = self._league_stats()
+        players, stat_types = list(players), list(stat_types)
+        moments = {player_name: self._player_moments(player_name) for player_name in set(players)}
+        rows = [moments[player_name].get(stat_type) for player_name, stat_type in zip(players, stat_types)]
+        priors = [league.get(stat_type) for stat_type in stat_types]
+
+        known = np.array([prior is not None for prior in priors])
+        games = np.array([row[0] if row else 0 for row in rows], dtype=float)
+        mean = np.array([row[1] if row else 0.0 for row in rows], dtype=float)
+        var = np.array([row[2] if row else 0.0 for row in rows], dtype=float)
+        league_mean = np.array([prior[0] if prior else np.nan for prior in priors], dtype=float)
+        league_var = np.array([prior[1] if prior else np.nan for prior in priors], dtype=float)
+        is_count = np.array([prior[2] if prior else False for prior in priors])
+        lines = np.asarray(lines, dtype=float)
+
+        shrunk_mean, shrunk_var = shrink_moments(games, mean, var, league_mean, league_var, self.prior_games, is_count)
+        shrunk_var = np.maximum(shrunk_var, 1e-9)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Contagens: binomial negativa com sobredispersão, Poisson sem
+            count_over = count_sf(np.floor(lines), shrunk_mean, shrunk_var)
+            count_under = count_cdf(np.ceil(lines) - 1, shrunk_mean, shrunk_var)
+
+            # Demais estatísticas: normal
+            scale = np.sqrt(shrunk_var)
+            normal_over = stats.norm.sf(lines, shrunk_mean, scale)
+            normal_under = stats.norm.cdf(lines, shrunk_mean, scale)
+
+        prob_over = np.where(known, np.where(is_count, count_over, normal_over), np.nan)
+        prob_under = np.where(known, np.where(is_count, count_under, normal_under), np.nan)
+        return prob_over, prob_under
+
+    def _player_moments(self, player_name):
+        """Jogos, média e variância recentes de cada estatística do jogador, em cache pela versão do histórico"""
+        version = self.repository.player_version(player_name)
+        cached = self._moments.get(player_name)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        games = self.repository.recent(player_name, self.window).select_dtypes('number')
+        values = games.to_numpy(dtype=float)
+        counts = np.sum(~np.isnan(values), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.nanmean(values, axis=0) if len(values) else np.zeros(len(games.columns))
+            variances = np.nanvar(values, axis=0, ddof=1) if len(values) > 1 else np.zeros(len(games.columns))
+
+        moments = {
+            stat: (int(count), float(mean), float(np.nan_to_num(variance)))
+            for stat, count, mean, variance in zip(games.columns, counts, means, variances) if count
+        }
+        self._moments[player_name] = (version, moments)
+        return moments
+
+    def _league_stats(self):
+        """Média, variância e tipo (contagem ou contínua) de cada estatística na liga"""
+        generation = self.repository.generation()
+        if self._league['generation'] == generation:
+            return self._league['stats']
+
+        league = self.repository.all().select_dtypes('number')
+        self._league = {
+            'generation': generation,
+            'stats': {
+                stat: (float(values.mean()), float(values.var()), bool((values.dropna() % 1 == 0).all()))
+                for stat, values in league.items() if values.notna().sum() > 1
+            }
+        }
+        return self._league['stats']
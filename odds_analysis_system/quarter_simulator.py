@@ -0,0 +1,195 @@
+import logging
+import numpy as np
+from config import QUARTER_SIMULATIONS, PROP_PRIOR_GAMES
+from holzhauer_strategy import HolzhauerNBAAnalyzer
+from prop_model import count_cdf, shrink_moments
+
+logger = logging.getLogger(__name__)
+
+QUARTERS = 4
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+GUIDE_BINS = 256  # Faixas da tabela guia na inversão da CDF
+
+class QuarterSimulator:
+    """Simulação Monte Carlo dos quarters restantes de todos os jogadores de um jogo
+
+    Os pontos de cada (jogador, quarter) seguem uma binomial negativa (Poisson
+    sem sobredispersão) com média e variância da janela de agregados do
+    repositório, encolhidas em direção às da liga com peso de `prior_games`
+    jogos. O ritmo do jogo atual escala as médias restantes. Todas as
+    simulações saem de uma vez em um array jogadores x simulações x quarters:
+    a CDF de cada célula é tabelada e as amostras vêm de um único
+    searchsorted sobre uniformes.
+    """
+
+    def __init__(self, repository, sims=QUARTER_SIMULATIONS, prior_games=PROP_PRIOR_GAMES, seed=None):
+        self.repository = repository
+        self.sims = sims
+        self.prior_games = prior_games
+        self.rng = np.random.default_rng(seed)
+        self.patterns = HolzhauerNBAAnalyzer()
+        self._league = {'generation': None, 'quarters': None}  # médias e variâncias da liga por quarter
+
+    def simulate(self, player_names, current_quarter=0, current_points=None, lines=None, pace=None):
+        """Projeta os quarters restantes e o total de cada jogador
+
+        `current_points` e `lines` são dicionários jogador -> valor; `pace`
+        (jogador -> fator) substitui o ritmo calculado pelos pontos atuais.
+        """
+        try:
+            player_names = list(player_names)
+            current_quarter = int(min(max(current_quarter or 0, 0), QUARTERS))
+            current_points = current_points or {}
+            lines = lines or {}
+            remaining = list(range(current_quarter + 1, QUARTERS + 1))
+
+            games, means, variances = self._parameters(player_names)
+            points = np.array([float(current_points.get(name, 0) or 0) for name in player_names])
+            if pace is None:
+                factors = self._pace_factors(means, current_quarter, points)
+            else:
+                factors = np.array([float(pace.get(name, 1.0)) for name in player_names])
+
+            # Ritmo escala a média e mantém a dispersão (variância / média) de cada quarter
+            means = means[:, current_quarter:] * factors[:, None]
+            variances = variances[:, current_quarter:] * factors[:, None]
+
+            cdf = self._cdf_table(means, variances)
+            samples = self._draw(cdf)
+            totals = points[:, None] + samples.sum(axis=2)
+            total_quantiles = self._sample_quantiles(totals)
+            quarter_quantiles = self._table_quantiles(cdf)
+
+            projections = {}
+            for i, name in enumerate(player_names):
+                trends = self._quarter_trends(name)
+                line = lines.get(name)
+                projections[name] = {
+                    'games': int(games[i]),
+                    'current_points': float(points[i]),
+                    'pace': float(factors[i]),
+                    'quarters': {
+                        f'q{quarter}': {
+                            'mean': float(means[i, j]),
+                            'std': float(np.sqrt(variances[i, j])),
+                            **{f'p{int(q * 100)}': int(quarter_quantiles[k, i, j]) for k, q in enumerate(QUANTILES)},
+                            'trend': trends.get(f'q{quarter}', 'estável')
+                        }
+                        for j, quarter in enumerate(remaining)
+                    },
+                    'total': {
+                        'mean': float(totals[i].mean()),
+                        'std': float(totals[i].std()),
+                        **{f'p{int(q * 100)}': float(total_quantiles[k, i]) for k, q in enumerate(QUANTILES)}
+                    },
+                    'line': line,
+                    'prob_over': float(np.mean(totals[i] > line)) if line is not None else None
+                }
+
+            return {'current_quarter': current_quarter, 'quarters': [f'q{quarter}' for quarter in remaining], 'players': projections}
+
+        except Exception as e:
+            logger.error(f"Erro ao simular quarters: {e}")
+            return {'current_quarter': current_quarter, 'quarters': [], 'players': {}}
+
+    def _parameters(self, player_names):
+        """Jogos, médias e variâncias por quarter (jogadores x 4), encolhidas em direção à liga"""
+        league_mean, league_var = self._league_quarters()
+        games = np.zeros(len(player_names))
+        means = np.zeros((len(player_names), QUARTERS))
+        variances = np.zeros((len(player_names), QUARTERS))
+
+        for i, name in enumerate(player_names):
+            aggregates = self.repository.aggregates(name)
+            if not aggregates:
+                continue
+            games[i] = aggregates['games']
+            for quarter in range(QUARTERS):
+                stat = aggregates['stats'].get(f'quarter_{quarter + 1}_pts')
+                if stat:
+                    means[i, quarter] = np.nan_to_num(stat['mean'])
+                    variances[i, quarter] = np.nan_to_num(stat['std']) ** 2
+
+        shrunk_mean, shrunk_var = shrink_moments(games[:, None], means, variances, league_mean, league_var, self.prior_games)
+        return games, shrunk_mean, shrunk_var
+
+    def _league_quarters(self):
+        """Média e variância dos pontos de cada quarter na liga, em cache pela geração do repositório"""
+        generation = self.repository.generation()
+        if self._league['generation'] != generation:
+            league = self.repository.all()
+            columns = [f'quarter_{quarter}_pts' for quarter in range(1, QUARTERS + 1)]
+            values = [league[column].dropna() if column in league.columns else None for column in columns]
+            self._league = {
+                'generation': generation,
+                'quarters': (
+                    np.array([column.mean() if column is not None and len(column) else 0.0 for column in values]),
+                    np.array([column.var() if column is not None and len(column) > 1 else 0.0 for column in values])
+                )
+            }
+        return self._league['quarters']
+
+    def _pace_factors(self, means, current_quarter, points):
+        """Ritmo de cada jogador: pontos até agora sobre o esperado, regredido com o peso de um jogo inteiro"""
+        if current_quarter == 0:
+            return np.ones(len(points))
+        expected = means[:, :current_quarter].sum(axis=1)
+        prior = means.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = (points + prior) / (expected + prior)
+        return np.clip(np.nan_to_num(factors, nan=1.0, posinf=1.0), 0.5, 1.5)
+
+    def _cdf_table(self, means, variances):
+        """CDF de cada (jogador, quarter) em 0..K, com a cauda acumulada no último ponto"""
+        size = int(np.ceil(np.max(means + 8 * np.sqrt(variances), initial=0))) + 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cdf = count_cdf(np.arange(size), np.maximum(means, 1e-9)[..., None], variances[..., None])
+        cdf[..., -1] = 1.0
+        return cdf
+
+    def _draw(self, cdf):
+        """Amostras jogadores x simulações x quarters por inversão da CDF tabelada"""
+        players, quarters, size = cdf.shape
+        if not players or not quarters:
+            return np.zeros((players, self.sims, quarters), dtype=int)
+
+        # Tabela guia: para cada faixa de 1/GUIDE_BINS, o primeiro valor cuja CDF passa do início da faixa
+        flat = cdf.reshape(players * quarters, size)
+        starts = np.arange(GUIDE_BINS) / GUIDE_BINS
+        guide = (flat[:, None, :] <= starts[None, :, None]).sum(axis=2)
+        guide += np.arange(players * quarters)[:, None] * size  # Índices no array achatado
+        flat = flat.ravel()
+
+        uniforms = self.rng.random((players, self.sims, quarters))
+        cells = np.arange(players * quarters).reshape(players, 1, quarters)
+        bins = (uniforms * GUIDE_BINS).astype(np.intp)
+        bins += cells * GUIDE_BINS
+        index = guide.ravel().take(bins)
+        # Avança dentro da faixa até a CDF passar da uniforme; só as poucas amostras atrasadas seguem no laço
+        index, uniforms = index.ravel(), uniforms.ravel()
+        behind = np.flatnonzero(uniforms >= flat.take(index))
+        while len(behind):
+            index[behind] += 1
+            behind = behind[uniforms[behind] >= flat.take(index[behind])]
+        index = index.reshape(players, self.sims, quarters)
+        return index - cells * size
+
+    def _sample_quantiles(self, totals):
+        """Quantis dos totais simulados de cada jogador (uma ordenação, interpolação linear)"""
+        ordered = np.sort(totals, axis=1)
+        positions = np.asarray(QUANTILES) * (ordered.shape[1] - 1)
+        lower, upper = np.floor(positions).astype(int), np.ceil(positions).astype(int)
+        weight = positions - lower
+        return (ordered[:, lower] * (1 - weight) + ordered[:, upper] * weight).T
+
+    def _table_quantiles(self, cdf):
+        """Quantis de cada (jogador, quarter) direto da CDF tabelada"""
+        return np.stack([np.argmax(cdf >= q, axis=-1) for q in QUANTILES])
+
+    def _quarter_trends(self, player_name):
+        """Tendência de cada quarter do jogador (alta/baixa/estável) pelos agregados"""
+        aggregates = self.repository.aggregates(player_name)
+        if not aggregates:
+            return {}
+        patterns = self.patterns.analyze_quarter_patterns(None, quarter_aggregates=aggregates['quarters'])
+        return {quarter: pattern['tendência'] for quarter, pattern in patterns.items()}
@@ -1,12 +1,16 @@
 from flask import Flask
 from waitress import serve
 import config
-from app import app
+from app import create_app, model_trainer
 
 if __name__ == '__main__':
     print(f"\nServidor iniciado em: http://{config.HOST}:{config.PORT}")
     print("Para acessar externamente, use seu IP público e a porta configurada")
     print("\nPressione CTRL+C para parar o servidor\n")
     
+    # Processo único: o retreino roda aqui mesmo
+    if config.STATE_MODE != 'shared':
+        model_trainer.start()
+    
     # Usar waitress como servidor WSGI
-    serve(app, host=config.HOST, port=config.PORT) 
\ No newline at end of file
+    serve(create_app(), host=config.HOST, port=config.PORT) 
\ No newline at end of file
@@ -0,0 +1,136 @@
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+from datetime import datetime
+from config import ODDS_SNAPSHOT_FILE
+from odds_collector import OddsCollector
+from model_trainer import ModelTrainer
+from clv_tracker import CLVTracker
+from alerts import AlertSystem
+from steam_detector import SteamDetector
+from best_price_index import BestPriceIndex
+from holzhauer_strategy import HolzhauerStrategy
+
+logger = logging.getLogger(__name__)
+
+class SnapshotPublisher:
+    """Publica snapshots da coleta em arquivo na memória compartilhada (tmpfs)"""
+
+    def __init__(self, snapshot_file=ODDS_SNAPSHOT_FILE):
+        self.snapshot_file = snapshot_file
+
+    def __call__(self, odds_data, version):
+        """Listener da coleta: grava o snapshot de forma atômica"""
+        snapshot = {
+            'version': version,
+            'published_at': datetime.now(),
+            'odds': odds_data
+        }
+
+        tmp_file = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.snapshot_file)
+
+class SharedOddsCollector(OddsCollector):
+    """Coletor somente-leitura usado pelos workers web no modo compartilhado
+
+    Não coleta nada: lê o último snapshot publicado pelo processo de estado e
+    só o recarrega quando o arquivo muda.
+    """
+
+    def __init__(self, snapshot_file=ODDS_SNAPSHOT_FILE):
+        super().__init__()
+        self.snapshot_file = snapshot_file
+        self._snapshot_mtime = None
+
+    def start_collection(self):
+        """A coleta é feita pelo processo de estado; nada a iniciar no worker"""
+        logger.info("Worker em modo compartilhado, lendo snapshots de odds")
+
+    def stop_collection(self):
+        """Nada a parar no worker"""
+
+    def collect_odds(self):
+        """Recarrega o snapshot publicado se ele mudou desde a última leitura"""
+        try:
+            mtime = os.stat(self.snapshot_file).st_mtime_ns
+            if mtime == self._snapshot_mtime:
+                return self.current_odds
+
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = pickle.load(f)
+
+            self.current_odds = snapshot['odds']
+            self.snapshot_version = snapshot['version']
+            self.last_update = snapshot['published_at']
+            self._index_games(self.current_odds)
+            self._snapshot_mtime = mtime
+            self._notify_listeners()
+
+        except FileNotFoundError:
+            logger.warning("Nenhum snapshot de odds publicado ainda")
+        except Exception as e:
+            logger.error(f"Erro ao carregar snapshot de odds: {e}")
+
+        return self.current_odds
+
+    def get_current_odds(self):
+        """Retorna as odds do snapshot mais recente"""
+        return self.collect_odds()
+
+class StateService:
+    """Processo único dono da coleta e do retreino, que publica snapshots para os workers"""
+
+    def __init__(self, snapshot_file=ODDS_SNAPSHOT_FILE):
+        self.snapshot_file = snapshot_file
+        self.process = None
+
+    def start(self):
+        """Inicia o processo de estado"""
+        if self.process and self.process.is_alive():
+            return
+
+        self.process = multiprocessing.Process(target=self._run, name='state-service', daemon=True)
+        self.process.start()
+        logger.info(f"Serviço de estado iniciado (pid {self.process.pid})")
+
+    def stop(self):
+        """Encerra o processo de estado"""
+        if self.process and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=10)
+            logger.info("Serviço de estado parado")
+
+    def _run(self):
+        """Loop do processo de estado: coleta e publica a cada intervalo"""
+        signal.signal(signal.SIGTERM, lambda *args: os._exit(0))
+
+        collector = OddsCollector()
+        collector.add_listener(SnapshotPublisher(self.snapshot_file))
+        best_prices = BestPriceIndex()
+        collector.add_listener(best_prices.on_snapshot)
+
+        # Linhas, CLV, steam e arbitragem são tratados a cada tick da coleta, não a cada recarga dos workers
+        clv_tracker = CLVTracker()
+        holzhauer = HolzhauerStrategy(best_prices=best_prices)
+        collector.add_listener(clv_tracker.record_snapshot)
+        collector.add_listener(
+            lambda odds_data, version: clv_tracker.flag_opportunities(holzhauer.analyze_opportunities(odds_data, version), odds_data)
+        )
+        alert_system = AlertSystem()
+        alert_system.start()
+        collector.add_listener(SteamDetector(alert_system).on_snapshot)
+        collector.add_listener(lambda odds_data, version: alert_system.check_arbitrage(odds_data, best_prices))
+        ModelTrainer().start()
+
+        while True:
+            try:
+                collector.collect_odds()
+                time.sleep(collector.update_interval)
+            except Exception as e:
+                logger.error(f"Erro no serviço de estado: {e}")
+                time.sleep(5)
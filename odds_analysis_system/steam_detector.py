@@ -0,0 +1,121 @@
+import logging
+import time
+from collections import deque
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class SteamDetector:
+    """Detecta steam: movimentos sincronizados de várias casas no mesmo mercado
+
+    Ligado como listener da coleta, compara cada cotação com a anterior da
+    mesma casa de uma só vez para o snapshot inteiro. Movimentos de pelo menos
+    `min_move` entram na janela do mercado (partida, lado); quando
+    `min_books` casas diferentes se movem na mesma direção dentro de
+    `window_seconds`, um alerta é colocado na fila do AlertSystem com a casa
+    que se moveu primeiro.
+    """
+
+    def __init__(self, alert_system, window_seconds=60, min_move=0.02, min_books=3):
+        self.alert_system = alert_system
+        self.window_seconds = window_seconds
+        self.min_move = min_move
+        self.min_books = min_books
+        self.last_prices = pd.Series(dtype=float)  # (partida, lado, casa) -> última cotação
+        self.moves = {}  # (partida, lado) -> deque de (segundos, casa, direção, variação)
+        self.alerted = {}  # (partida, lado, direção) -> segundos do último alerta
+        self.last_latency = None  # Tempo entre o tick e o alerta na fila, em segundos
+
+    def on_snapshot(self, odds_data, version=None):
+        """Listener da coleta: processa as variações do snapshot e emite alertas de steam"""
+        started = time.perf_counter()
+        try:
+            if odds_data.empty:
+                return []
+
+            prices = self._stack_prices(odds_data)
+            previous = self.last_prices.reindex(prices.index)
+            change = prices / previous - 1
+            moved = change[change.abs() >= self.min_move]
+
+            self.last_prices = prices.combine_first(self.last_prices)
+            if moved.empty:
+                return []
+
+            now = pd.Timestamp(odds_data['Timestamp'].max()).timestamp()
+            alerts = []
+            for (match, side, bookmaker), variation in moved.items():
+                window = self.moves.setdefault((match, side), deque())
+                window.append((now, bookmaker, 1 if variation > 0 else -1, float(variation)))
+
+            for market in {(match, side) for match, side, _ in moved.index}:
+                alert = self._check_market(market, now)
+                if alert:
+                    alerts.append(alert)
+
+            for alert in alerts:
+                self.alert_system.alert_queue.put(alert)
+            if alerts:
+                self.last_latency = time.perf_counter() - started
+
+            return alerts
+
+        except Exception as e:
+            logger.error(f"Erro ao detectar steam: {e}")
+            return []
+
+    def _stack_prices(self, odds_data):
+        """Cotações do snapshot indexadas por (partida, lado, casa)"""
+        prices = pd.concat([
+            pd.Series(
+                odds_data[column].to_numpy(dtype=float),
+                index=pd.MultiIndex.from_arrays(
+                    [odds_data['Match'], [side] * len(odds_data), odds_data['Bookmaker']],
+                    names=['Match', 'Side', 'Bookmaker']
+                )
+            )
+            for side, column in (('home', 'Home_Odds'), ('away', 'Away_Odds'))
+        ])
+        return prices[~prices.index.duplicated(keep='last')]
+
+    def _check_market(self, market, now):
+        """Verifica se os movimentos recentes do mercado formam steam"""
+        window = self.moves[market]
+        while window and now - window[0][0] > self.window_seconds:
+            window.popleft()
+
+        for direction in (1, -1):
+            moves = [move for move in window if move[2] == direction]
+            books = {move[1] for move in moves}
+            if len(books) < self.min_books:
+                continue
+
+            # Um alerta por movimento: só de novo depois que a janela passar
+            key = (*market, direction)
+            if now - self.alerted.get(key, float('-inf')) <= self.window_seconds:
+                continue
+            self.alerted[key] = now
+
+            first_time = moves[0][0]
+            leaders = sorted({move[1] for move in moves if move[0] == first_time})
+            average = sum(move[3] for move in moves) / len(moves)
+            match, side = market
+
+            return {
+                'type': 'Steam',
+                'match': match,
+                'side': side,
+                'direction': 'up' if direction > 0 else 'down',
+                'books': sorted(books),
+                'first_book': leaders[0] if len(leaders) == 1 else None,
+                'leaders': leaders,
+                'average_change': average,
+                'span_seconds': now - first_time,
+                'message': (
+                    f"Steam {'de alta' if direction > 0 else 'de baixa'} nas odds {side}: "
+                    f"{len(books)} casas em {now - first_time:.0f}s ({average:+.1%}), "
+                    f"primeira: {', '.join(leaders)}"
+                )
+            }
+
+        return None
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from alerts import AlertSystem
+from best_price_index import BestPriceIndex
+
+def odds_frame(home, away):
+    """Cotações de uma partida, uma linha por casa"""
+    return pd.DataFrame({
+        'Match': 'Lakers vs Celtics',
+        'Bookmaker': list(home),
+        'Home_Odds': list(home.values()),
+        'Away_Odds': [away[book] for book in home]
+    })
+
+def arbitrage_alerts(odds_data, indexed):
+    """Alertas de arbitragem gerados pelas cotações, com ou sem o índice de melhores preços"""
+    alert_system = AlertSystem()
+    best_prices = None
+    if indexed:
+        best_prices = BestPriceIndex()
+        best_prices.on_snapshot(odds_data)
+    alert_system.check_arbitrage(odds_data, best_prices)
+    return [alert_system.alert_queue.get() for _ in range(alert_system.alert_queue.qsize())]
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_arbitrage_between_bookmakers(indexed):
+    odds_data = odds_frame({'A': 2.10, 'B': 1.85, 'C': 1.90}, {'A': 1.80, 'B': 2.08, 'C': 1.95})
+    alerts = arbitrage_alerts(odds_data, indexed)
+    assert len(alerts) == 1
+    assert alerts[0]['key'] == ('Arbitragem', 'Lakers vs Celtics')
+    assert '4.3% de lucro' in alerts[0]['message']
+    assert '(A)' in alerts[0]['message'] and '(B)' in alerts[0]['message']
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_no_arbitrage_from_bookmaker_without_margin(indexed):
+    # B cota os dois lados acima de 2.0: cotação inválida, não arbitragem
+    odds_data = odds_frame({'A': 1.90, 'B': 2.60, 'C': 1.85}, {'A': 1.90, 'B': 2.40, 'C': 1.95})
+    assert arbitrage_alerts(odds_data, indexed) == []
+
+def test_implausible_profit_is_ignored():
+    odds_data = odds_frame({'A': 3.00, 'B': 1.30}, {'A': 1.40, 'B': 2.90})
+    assert arbitrage_alerts(odds_data, indexed=True) == []
+
+def test_cooldown_by_match_ignores_profit_changes():
+    alert_system = AlertSystem()
+    sent = []
+    alert_system._send_alert = sent.append
+    for profit in (1.2, 1.4):
+        alert_system._process_alert({
+            'type': 'Arbitragem',
+            'match': 'Lakers vs Celtics',
+            'key': ('Arbitragem', 'Lakers vs Celtics'),
+            'message': f"Possível arbitragem com {profit:.1f}% de lucro"
+        })
+    assert len(sent) == 1
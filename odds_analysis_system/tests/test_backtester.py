@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from holzhauer_strategy import HolzhauerStrategy
+from odds_collector import GAME_DURATION
+
+@pytest.fixture
+def season():
+    rng = np.random.default_rng(0)
+    rows, results = [], []
+    for match in range(60):
+        name = f'Time {match} vs Time {match + 60}'
+        start = pd.Timestamp('2024-10-22 19:00') + pd.Timedelta(hours=match)
+        opening = rng.uniform(1.5, 2.5)
+        for minutes in range(50, 0, -10):
+            for bookmaker in ('Bet365', 'Betano'):
+                home = opening + rng.normal(0, 0.05)
+                rows.append({
+                    'Timestamp': start - pd.Timedelta(minutes=minutes), 'Match': name, 'Bookmaker': bookmaker,
+                    'Home_Odds': home, 'Away_Odds': 1 / (1.05 - 1 / home)
+                })
+        results.append({'Match': name, 'Home_Won': int(rng.random() < 1 / opening)})
+    return pd.DataFrame(rows), pd.DataFrame(results)
+
+def signals(history, results):
+    np.random.seed(0)  # A floresta sem random_state usa o gerador global
+    return HolzhauerStrategy().backtest_signals(history, results)
+
+def test_confidences_only_use_matches_settled_before_the_row(season):
+    history, results = season
+    baseline = signals(history, results)
+    assert not baseline.empty
+    assert baseline['Timestamp'].min() > history['Timestamp'].min()
+
+    # Inverte os resultados das partidas encerradas depois do meio do histórico
+    cutoff = history['Timestamp'].quantile(0.5)
+    settled_at = history.groupby('Match')['Timestamp'].max() + GAME_DURATION
+    later = settled_at.index[settled_at > cutoff]
+    flipped = results.assign(Home_Won=np.where(results['Match'].isin(later), 1 - results['Home_Won'], results['Home_Won']))
+
+    changed = signals(history, flipped)
+    before = baseline['Timestamp'] <= cutoff
+    assert before.any()
+    assert np.array_equal(changed['Probability'][before], baseline['Probability'][before])
+    assert not np.array_equal(changed['Probability'][~before], baseline['Probability'][~before])
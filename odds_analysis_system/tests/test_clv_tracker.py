@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+import pytest
+import odds_collector
+from clv_tracker import CLVTracker
+from odds_collector import OddsCollector
+
+class Clock(datetime):
+    """datetime com o now controlado pelo teste"""
+    current = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.setattr(odds_collector, 'datetime', Clock)
+    monkeypatch.setattr(odds_collector, 'ODDS_FILE', str(tmp_path / 'odds.csv'))
+    return OddsCollector()
+
+def tick(collector, at):
+    Clock.current = at
+    return collector.collect_odds()
+
+def test_clv_from_collector_ticks(tmp_path, collector):
+    tracker = CLVTracker(line_file=str(tmp_path / 'line_history.csv'), clv_file=str(tmp_path / 'clv.jsonl'))
+    collector.add_listener(tracker.record_snapshot)
+
+    # Primeira coleta: o snapshot traz o início de cada partida
+    first = tick(collector, datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=19))
+    quote = first[first['Match'] == 'Lakers vs Warriors'].iloc[0]
+    start_time = quote['Start_Time'].to_pydatetime()
+    assert start_time == first['Timestamp'].iloc[0].replace(minute=30)
+
+    # Oportunidade sinalizada pelo caminho dos listeners, com o início do snapshot
+    tracker.flag_opportunities([{
+        'match': quote['Match'], 'recommended': True,
+        'value_opportunities': [{'type': 'home', 'bookmaker': quote['Bookmaker'], 'odds': quote['Home_Odds']}]
+    }], first)
+
+    # Última coleta antes do início (fechamento) e uma já com o jogo em andamento
+    closing = tick(collector, start_time - timedelta(minutes=10))
+    tick(collector, start_time + timedelta(minutes=5))
+    closing_odds = closing[(closing['Match'] == quote['Match']) & (closing['Bookmaker'] == quote['Bookmaker'])]['Home_Odds'].iloc[0]
+
+    result = tracker.compute_clv()['opportunities'][0]
+    assert result['start_time'] == start_time.isoformat()
+    assert result['closing_odds'] == closing_odds
+    assert result['clv'] == pytest.approx(quote['Home_Odds'] / closing_odds - 1)
+
+    # A compactação mantém a linha de fechamento das partidas iniciadas
+    tracker.compact(now=start_time + timedelta(minutes=10))
+    reloaded = CLVTracker(line_file=tracker.line_file, clv_file=tracker.clv_file)
+    assert reloaded.compute_clv()['opportunities'][0]['clv'] == pytest.approx(result['clv'])
+
+def test_start_time_moves_to_next_day_after_the_game(collector):
+    evening = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=19, minutes=30)
+    assert collector._start_time('19:30', evening - timedelta(hours=2)) == evening
+    assert collector._start_time('19:30', evening + timedelta(hours=2)) == evening
+    assert collector._start_time('19:30', evening + timedelta(hours=4)) == evening + timedelta(days=1)
+    assert collector._start_time('22:30', evening.replace(hour=0, minute=30) + timedelta(days=1)) == evening.replace(hour=22, minute=30)
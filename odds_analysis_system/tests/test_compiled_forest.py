@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from compiled_forest import CompiledForest, CompiledScaler
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5))
+    y_class = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int) + (X[:, 2] > 1)
+    y_value = 2 * X[:, 0] - X[:, 3] + rng.normal(0, 0.1, len(X))
+    return X, y_class, y_value
+
+def with_missing(X, fraction=0.2, seed=1):
+    """Cópia de X com uma fração dos valores trocada por NaN"""
+    X = X.copy()
+    X[np.random.default_rng(seed).random(X.shape) < fraction] = np.nan
+    return X
+
+def threshold_ties(forest, X):
+    """Amostras com a feature de cada raiz igual ao threshold (em float32, como o sklearn compara)"""
+    X = X[:len(forest.estimators_)].copy()
+    for i, estimator in enumerate(forest.estimators_):
+        tree = estimator.tree_
+        if tree.children_left[0] >= 0:
+            X[i, tree.feature[0]] = np.float32(tree.threshold[0])
+    return X
+
+@pytest.mark.parametrize('n_estimators', [1, 25])
+def test_classifier_matches_sklearn(data, n_estimators):
+    X, y, _ = data
+    forest = RandomForestClassifier(n_estimators=n_estimators, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    for X_test in (X, with_missing(X), threshold_ties(forest, X)):
+        np.testing.assert_allclose(compiled.predict_proba(X_test), forest.predict_proba(X_test), atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(X_test), forest.predict(X_test))
+
+@pytest.mark.parametrize('n_estimators', [1, 25])
+def test_regressor_matches_sklearn(data, n_estimators):
+    X, _, y = data
+    forest = RandomForestRegressor(n_estimators=n_estimators, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    for X_test in (X, with_missing(X), threshold_ties(forest, X)):
+        np.testing.assert_allclose(compiled.predict(X_test), forest.predict(X_test), rtol=1e-12, atol=1e-12)
+
+    with pytest.raises(AttributeError):
+        compiled.predict_proba(X)
+
+def test_missing_values_seen_in_training(data):
+    X, y, y_value = data
+    X_train = with_missing(X, seed=2)
+    classifier = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train, y)
+    regressor = RandomForestRegressor(n_estimators=10, random_state=0).fit(X_train, y_value)
+    X_test = with_missing(X, seed=3)
+
+    np.testing.assert_allclose(
+        CompiledForest.from_sklearn(classifier).predict_proba(X_test), classifier.predict_proba(X_test), atol=1e-12
+    )
+    np.testing.assert_allclose(
+        CompiledForest.from_sklearn(regressor).predict(X_test), regressor.predict(X_test), rtol=1e-12, atol=1e-12
+    )
+
+def test_single_leaf_and_empty_input(data):
+    X, _, _ = data
+    forest = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, np.zeros(len(X), dtype=int))
+    compiled = CompiledForest.from_sklearn(forest)
+
+    np.testing.assert_allclose(compiled.predict_proba(X[:10]), forest.predict_proba(X[:10]))
+    assert compiled.predict_proba(X[:0]).shape == (0, 1)
+    assert compiled.predict(X[:0]).shape == (0,)
+
+def test_chunks_match_single_pass(data):
+    X, y, _ = data
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+    chunked = CompiledForest.from_sklearn(forest)
+    chunked.chunk_size = 7
+
+    np.testing.assert_array_equal(chunked.predict_proba(X), compiled.predict_proba(X))
+
+def test_save_and_load(tmp_path, data):
+    X, y, y_value = data
+    for forest in (RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y),
+                   RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y_value)):
+        path = str(tmp_path / 'model.npz')
+        CompiledForest.from_sklearn(forest).save(path)
+        loaded = CompiledForest.load(path)
+
+        X_test = with_missing(X)
+        np.testing.assert_allclose(loaded.predict(X_test), forest.predict(X_test), rtol=1e-12, atol=1e-12)
+
+def test_load_model_exported_without_missing_sides(tmp_path, data):
+    X, y, _ = data
+    compiled = CompiledForest.from_sklearn(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y))
+    path = str(tmp_path / 'legacy.npz')
+    np.savez(path, feature=compiled.feature, threshold=compiled.threshold, children=compiled.children,
+             value=compiled.value, roots=compiled.roots, max_depth=compiled.max_depth, classes=compiled.classes_)
+
+    np.testing.assert_allclose(CompiledForest.load(path).predict_proba(X), compiled.predict_proba(X))
+
+@pytest.mark.parametrize('options', [{}, {'with_mean': False}, {'with_std': False}])
+def test_scaler_matches_sklearn(tmp_path, data, options):
+    X, _, _ = data
+    X = np.column_stack([X, np.full(len(X), 3.0)])  # Feature constante: escala 1 no sklearn
+    scaler = StandardScaler(**options).fit(X)
+    compiled = CompiledScaler.from_sklearn(scaler)
+
+    np.testing.assert_allclose(compiled.transform(X), scaler.transform(X), rtol=1e-12, atol=1e-12)
+
+    path = str(tmp_path / 'scaler.npz')
+    compiled.save(path)
+    np.testing.assert_array_equal(CompiledScaler.load(path).transform(X), compiled.transform(X))
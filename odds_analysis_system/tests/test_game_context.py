@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from game_context import GameContextCache
+from holzhauer_strategy import HolzhauerStrategy
+from odds_collector import OddsCollector
+from player_stats import PlayerStatsAnalyzer
+from player_stats_repository import PlayerStatsRepository
+
+@pytest.fixture
+def contexts(tmp_path):
+    rng = np.random.default_rng(0)
+    names = ['LeBron James', 'Jayson Tatum', 'Stephen Curry']
+    pd.DataFrame({
+        'player_name': np.repeat(names, 10),
+        'game_date': np.tile(pd.date_range('2024-10-22', periods=10).strftime('%Y-%m-%d'), len(names)),
+        'is_home': True,
+        'points': rng.poisson(25, 10 * len(names))
+    }).to_csv(tmp_path / 'player_stats.csv', index=False)
+    pd.DataFrame({
+        'player_name': names,
+        'game_id': ['Lakers', 'lakers vs celtics', 'Warriors vs Suns'],
+        'stat_type': 'points',
+        'line': 24.5,
+        'odds': 1.9
+    }).to_csv(tmp_path / 'player_props.csv', index=False)
+
+    collector = OddsCollector()
+    collector.current_odds = pd.DataFrame({
+        'Match': ['Lakers vs Celtics', 'Warriors vs Suns'],
+        'Home_Team': ['Lakers', 'Warriors'], 'Away_Team': ['Celtics', 'Suns'],
+        'Home_Odds': 1.9, 'Away_Odds': 1.9
+    })
+    analyzer = PlayerStatsAnalyzer()
+    analyzer.repository = PlayerStatsRepository(str(tmp_path / 'player_stats.csv'), str(tmp_path / 'index.json'))
+    analyzer.prop_model.repository = analyzer.repository
+    analyzer.props_file = str(tmp_path / 'player_props.csv')
+    return GameContextCache(collector, analyzer, HolzhauerStrategy())
+
+def test_ids_of_the_same_game_share_the_context(contexts):
+    context = contexts.get('Lakers vs Celtics')
+    assert context.match == 'Lakers vs Celtics'
+    assert contexts.get('lakers vs celtics') is context
+    assert contexts.get('Celtics') is context
+    assert contexts.get('Knicks') is None
+
+def test_props_are_filtered_by_resolved_match(contexts):
+    scored = contexts.stats_analyzer.score_props(match='Lakers vs Celtics', resolve_match=contexts.resolve_match)
+    assert sorted(scored['player_name']) == ['Jayson Tatum', 'LeBron James']
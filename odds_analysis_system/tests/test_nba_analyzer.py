@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from nba_analyzer import NBAAnalyzer
+
+def full_game(seed):
+    rng = np.random.default_rng(seed)
+    recent = [
+        {'id': i, 'win': int(rng.integers(0, 2)), 'points': float(rng.normal(110, 10)), 'margin': float(rng.normal(0, 10)),
+         **{f'Q{q}_points': float(rng.normal(27, 6)) for q in range(1, 5)}}
+        for i in range(5)
+    ]
+    game_data = {
+        'id': seed,
+        **{f'Q{q}_points': rng.normal(27, 5, 8).tolist() for q in range(1, 5)},
+        'is_home': True, 'back_to_back': False, 'rest_days': 2, 'is_playoff': True,
+        'last_10_games': recent * 2, 'last_5_games': recent, 'player_stats': {}
+    }
+    player_stats = {
+        'Full Stats': {
+            'pts_per_game': 28.0, 'min_per_game': 36.0, 'plus_minus': 6.0, 'usage_rate': 31.0,
+            'last_5_games_rating': 0.9, 'season_rating': 0.8, 'vs_opponent_rating': 0.7,
+            'height_advantage': 0.5, 'minutes_last_game': 38.0, 'is_back_to_back': False,
+            'last_5_games_minutes': 180.0, 'days_rest': 1
+        }
+    }
+    team_stats = {
+        side: {'pace': 100.0 + i, 'three_rate': 0.35, 'paint_points': 48.0, 'fast_break_points': 13.0,
+               'starters': {position: f'{side} {position}' for position in ('PG', 'SG', 'SF', 'PF', 'C')}}
+        for i, side in enumerate(('home_team', 'away_team'))
+    }
+    team_stats['head_to_head'] = [{'winner': 'home', 'point_diff': 4.0}, {'winner': 'away', 'point_diff': -2.0}]
+    return game_data, player_stats, team_stats
+
+def partial_game():
+    # Sem is_playoff, sem quarters nem jogos recentes; jogador só com back-to-back e descanso
+    game_data = {'id': 'partial', 'is_home': True, 'back_to_back': False, 'rest_days': 3}
+    player_stats = {'Partial Stats': {'is_back_to_back': True, 'days_rest': 0}}
+    return game_data, player_stats, {}
+
+# Valores da implementação escalar anterior ao lote (analyze_game jogo a jogo)
+SCALAR_EXPECTED = {
+    0: {
+        'quarters': {
+            'Q1': (27.84111016018683, 3.997258714191015, -0.2616365741171191),
+            'Q2': (32.50722330304232, 3.704372472545267, 0.3891453293375951),
+            'Q3': (27.408006647701306, 4.2189087195063495, -0.33256974214139556),
+            'Q4': (26.260257380249215, 4.706316337105864, 0.43698626291276116)
+        },
+        'team_momentum': 1.1500888961100006,
+        'recent_slope': -2.654856652007511,
+        'momentum_shifts': [(1, 3, 'down')],
+        'holzhauer_score': 1.8164361470304773,
+        'recommendations': ['strong_bet', 'quarter_bet', 'player_prop']
+    },
+    1: {
+        'quarters': {
+            'Q1': (27.1497395070794, 5.463027584062313, -1.6785818367671768),
+            'Q2': (26.01264609098479, 2.292307316410017, 0.589425584386888),
+            'Q3': (27.841148563322687, 3.9070737419414727, -0.17505932324479095),
+            'Q4': (25.0338782261001, 2.9205365526371785, 0.02727608509253333)
+        },
+        'team_momentum': 0.6980764791000003,
+        'recent_slope': -3.0605930338330323,
+        'momentum_shifts': [(0, 1, 'up'), (3, 2, 'down'), (4, 1, 'up'), (4, 2, 'down')],
+        'holzhauer_score': 1.6592536844057673,
+        'recommendations': ['strong_bet', 'player_prop']
+    }
+}
+
+def check_full_game(analysis, expected):
+    assert analysis['situation_analysis'] == {'home_factor': 1.1, 'schedule_factor': 1.15, 'importance_factor': 1.2}
+    assert analysis['player_analysis'] == {'Full Stats': {
+        'impact_category': 'superstar', 'impact_factor': 0.25, 'form_rating': pytest.approx(0.81),
+        'matchup_advantage': 0.1, 'fatigue_factor': pytest.approx(0.8)
+    }}
+    quarters = {
+        quarter: (values['avg_points'], values['variance'], values['trend']['slope'])
+        for quarter, values in analysis['quarter_analysis'].items()
+    }
+    assert quarters == {quarter: pytest.approx(values) for quarter, values in expected['quarters'].items()}
+
+    momentum = analysis['momentum_factors']
+    assert momentum['team_momentum'] == pytest.approx(expected['team_momentum'])
+    assert momentum['recent_performance']['trend']['slope'] == pytest.approx(expected['recent_slope'])
+    assert [(shift['game_id'], shift['quarter'], shift['direction']) for shift in momentum['momentum_shifts']] == expected['momentum_shifts']
+    assert analysis['holzhauer_score'] == pytest.approx(expected['holzhauer_score'])
+    assert [recommendation['type'] for recommendation in analysis['recommendations']] == expected['recommendations']
+
+def test_full_games_match_the_scalar_values():
+    analyzer = NBAAnalyzer()
+    for seed, expected in SCALAR_EXPECTED.items():
+        check_full_game(analyzer.analyze_game(*full_game(seed)), expected)
+
+def test_mixed_slate_rows_keep_their_values():
+    analyzer = NBAAnalyzer()
+    games = [full_game(0), partial_game(), full_game(1), (None, None, None)]
+    batched = analyzer.analyze_slate(analyzer.build_slate(games))
+    assert len(batched) == len(games)
+    check_full_game(batched[0], SCALAR_EXPECTED[0])
+    check_full_game(batched[2], SCALAR_EXPECTED[1])
+    assert batched[1]['holzhauer_score'] == pytest.approx(0.05 * 0.5 * 0.3 + 1.125 * 0.15)
+    assert batched[3]['quarter_analysis'] == {} and batched[3]['recommendations'] == []
+
+def test_partial_inputs_count_field_by_field():
+    analysis = NBAAnalyzer().analyze_game(*partial_game())
+    assert analysis['situation_analysis'] == {'home_factor': 1.1, 'schedule_factor': 1.15}
+    player = analysis['player_analysis']['Partial Stats']
+    assert player['fatigue_factor'] == pytest.approx(0.8)
+    assert player['impact_category'] == 'rotation'
+    assert player['form_rating'] == 0.5
+    assert analysis['quarter_analysis'] == {}
+    # Sem quarters nem momentum: só jogadores e situação entram no score
+    assert analysis['holzhauer_score'] == pytest.approx(0.05 * 0.5 * 0.3 + 1.125 * 0.15)
@@ -0,0 +1,61 @@
+import json
+import os
+from datetime import datetime, timedelta
+import pytest
+from behavior_store import BehaviorStore
+from player_behavior_tracker import PlayerBehaviorTracker
+
+@pytest.fixture
+def files(tmp_path):
+    return {'log_file': str(tmp_path / 'behavior_log.jsonl'), 'snapshot_file': str(tmp_path / 'behavior_snapshot.json')}
+
+def observe(tracker, *events):
+    for event in events:
+        tracker.register_observation('Jogador', datetime.now(), 'frustração', event)
+
+def events(tracker):
+    tracker.sync()
+    return [observation['detalhes'] for observation in tracker.behavior_log]
+
+def test_recovery_replays_segments_after_a_lost_snapshot_segment(tmp_path, files):
+    tracker = PlayerBehaviorTracker(store=BehaviorStore(**files, snapshot_interval=3))
+    observe(tracker, 'e0', 'e1', 'e2')  # Snapshot no terceiro registro
+    observe(tracker, 'e3', 'e4')
+
+    # Outro worker (com snapshot próprio) rotaciona o log duas vezes: o segmento do snapshot se perde
+    other = PlayerBehaviorTracker(store=BehaviorStore(files['log_file'], str(tmp_path / 'other.json'), snapshot_interval=2))
+    other.sync()
+    observe(other, 'e5', 'e6', 'e7', 'e8')
+
+    # e3 a e5 estavam só no segmento perdido; o `.1` (e6, e7) e o log atual (e8) são aplicados
+    expected = ['e0', 'e1', 'e2', 'e6', 'e7', 'e8']
+    assert events(PlayerBehaviorTracker(store=BehaviorStore(**files, snapshot_interval=3))) == expected
+    assert events(tracker) == expected
+
+def test_recovery_after_the_log_is_deleted_skips_the_snapshot_rotated_segment(files):
+    tracker = PlayerBehaviorTracker(store=BehaviorStore(**files, snapshot_interval=3))
+    observe(tracker, 'e0', 'e1', 'e2', 'e3')
+    os.remove(files['log_file'])
+    observe(tracker, 'e4')
+
+    # O `.1` já está no snapshot e não é aplicado de novo
+    assert events(PlayerBehaviorTracker(store=BehaviorStore(**files, snapshot_interval=3))) == ['e0', 'e1', 'e2', 'e4']
+
+def test_snapshot_keeps_only_the_retention_window(files):
+    tracker = PlayerBehaviorTracker(store=BehaviorStore(**files, snapshot_interval=3), retention_minutes=60)
+    tracker.register_observation('Jogador', datetime.now() - timedelta(hours=2), 'frustração', 'antiga')
+    observe(tracker, 'e0', 'e1')
+
+    with open(files['snapshot_file'], encoding='utf-8') as f:
+        assert [observation['detalhes'] for observation in json.load(f)['behavior_log']] == ['e0', 'e1']
+    assert events(tracker) == ['e0', 'e1']
+
+def test_recovery_waits_for_first_use(files):
+    writer = PlayerBehaviorTracker(store=BehaviorStore(**files))
+    observe(writer, 'e0')
+
+    store = BehaviorStore(**files)
+    reader = PlayerBehaviorTracker(store=store)
+    assert reader.behavior_log == [] and store.segment is None
+    assert reader.get_player_emotional_state('Jogador') is not None
+    assert events(reader) == ['e0']
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+from player_stats_repository import PlayerStatsRepository
+
+@pytest.fixture
+def repository(tmp_path):
+    return PlayerStatsRepository(str(tmp_path / 'player_stats.csv'), str(tmp_path / 'player_stats_index.json'))
+
+def game(**stats):
+    return {'player_name': 'LeBron James', 'game_date': '2024-10-22', **stats}
+
+def test_same_values_with_other_dtype_are_unchanged(repository):
+    repository.append([game(points=25, rebounds=7)])
+    # Um NaN em outra linha do lote promove a coluna para float: 25 vira 25.0
+    counts = repository.append([game(points=25, rebounds=7), {**game(points=30), 'game_date': '2024-10-24'}])
+    assert counts == {'new': 1, 'updated': 0, 'unchanged': 1}
+
+def test_partial_row_keeps_stored_values(repository):
+    repository.append([game(points=25, rebounds=7, assists=8)])
+    counts = repository.append([game(points=28)])
+    assert counts == {'new': 0, 'updated': 1, 'unchanged': 0}
+
+    stats = repository.player('LeBron James')
+    assert len(stats) == 1
+    assert stats.iloc[0][['points', 'rebounds', 'assists']].tolist() == [28, 7, 8]
+
+    # O índice de chaves gravado também guarda a linha completa
+    reloaded = PlayerStatsRepository(repository.stats_file, repository.index_file)
+    assert reloaded.append([game(points=28.0, rebounds=7)]) == {'new': 0, 'updated': 0, 'unchanged': 1}
+
+def test_partial_rows_in_one_batch_are_merged(repository):
+    counts = repository.append([game(points=25, rebounds=7), game(assists=8)])
+    assert counts == {'new': 1, 'updated': 0, 'unchanged': 0}
+    assert repository.player('LeBron James').iloc[0][['points', 'rebounds', 'assists']].tolist() == [25, 7, 8]
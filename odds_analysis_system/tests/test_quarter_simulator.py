@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from player_stats_repository import PlayerStatsRepository
+from prop_model import count_parameters
+from quarter_simulator import QUANTILES, QuarterSimulator
+
+SIMS = 100000
+
+@pytest.fixture
+def simulator(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = []
+    for player in range(8):
+        for game in range(30):
+            quarters = rng.negative_binomial(3, 0.35, 4)
+            rows.append({
+                'player_name': f'Player {player}',
+                'game_date': str(pd.Timestamp('2024-10-22') + pd.Timedelta(days=game))[:10],
+                'is_home': game % 2 == 0,
+                'points': quarters.sum(),
+                **{f'quarter_{quarter + 1}_pts': quarters[quarter] for quarter in range(4)}
+            })
+    stats_file = tmp_path / 'player_stats.csv'
+    pd.DataFrame(rows).to_csv(stats_file, index=False)
+    repository = PlayerStatsRepository(str(stats_file), str(tmp_path / 'player_stats_index.json'))
+    return QuarterSimulator(repository, sims=SIMS, seed=0)
+
+def test_last_quarter_matches_negative_binomial(simulator):
+    players = ['Player 0', 'Player 1', 'Player 2']
+    points, lines = {name: 12 for name in players}, {name: 17.5 for name in players}
+    # Último quarter sem ritmo: o total é os pontos atuais mais uma binomial negativa
+    result = simulator.simulate(players, current_quarter=3, current_points=points, lines=lines, pace={})
+
+    _, means, variances = simulator._parameters(players)
+    overdispersed, r, p = count_parameters(means[:, 3], variances[:, 3])
+    assert overdispersed.all()
+
+    for i, name in enumerate(players):
+        projection = result['players'][name]
+        expected = stats.nbinom.ppf(QUANTILES, r[i], p[i])
+        assert [projection['quarters']['q4'][f'p{int(q * 100)}'] for q in QUANTILES] == expected.tolist()
+        sampled = [projection['total'][f'p{int(q * 100)}'] - points[name] for q in QUANTILES]
+        assert np.allclose(sampled, expected, atol=1)
+        assert projection['prob_over'] == pytest.approx(stats.nbinom.sf(np.floor(17.5 - 12), r[i], p[i]), abs=0.01)
+
+def test_draw_samples_follow_table(simulator):
+    mean, var = np.array([[6.0, 2.5]]), np.array([[14.0, 2.5]])
+    samples = simulator._draw(simulator._cdf_table(mean, var))
+
+    _, r, p = count_parameters(mean[0, 0], var[0, 0])
+    assert np.quantile(samples[0, :, 0], QUANTILES, method='inverted_cdf').tolist() == stats.nbinom.ppf(QUANTILES, r, p).tolist()
+    assert np.mean(samples[0, :, 0] > 8) == pytest.approx(stats.nbinom.sf(8, r, p), abs=0.01)
+    # Sem sobredispersão a contagem é Poisson
+    assert np.mean(samples[0, :, 1] > 3) == pytest.approx(stats.poisson.sf(3, 2.5), abs=0.01)
@@ -0,0 +1,33 @@
+import os
+import numpy as np
+import pytest
+import trend_utils
+from trend_utils import ols_slope, ols_slopes, rolling_slopes
+
+# O StartupStarter usa uma cópia deste módulo; os dois arquivos devem ser idênticos
+STARTUP_COPY = os.path.join(os.path.dirname(__file__), '..', '..', 'StartupStarter', 'trend_utils.py')
+
+def test_startup_copy_in_sync():
+    if not os.path.exists(STARTUP_COPY):
+        pytest.skip('StartupStarter não está na árvore')
+    with open(trend_utils.__file__, 'rb') as source, open(STARTUP_COPY, 'rb') as copy:
+        assert copy.read() == source.read(), 'Copie odds_analysis_system/trend_utils.py para StartupStarter/trend_utils.py'
+
+def test_slopes_match_polyfit():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(2, 12, 50)
+    series = [rng.normal(0, 1, length).cumsum() for length in lengths]
+    padded = np.full((len(series), lengths.max()), np.nan)
+    for row, values in enumerate(series):
+        padded[row, :len(values)] = values
+
+    expected = [np.polyfit(np.arange(len(values)), values, 1)[0] for values in series]
+    assert np.allclose(ols_slopes(padded), expected)
+    assert np.allclose([ols_slope(values) for values in series], expected)
+    assert np.isnan(ols_slope([1.0])) and np.isnan(ols_slope([]))
+
+def test_rolling_slopes_match_windows():
+    values = np.random.default_rng(1).normal(0, 1, (4, 12))
+    window = 5
+    expected = ols_slopes(np.stack([values[:, t:t + window] for t in range(12 - window + 1)], axis=1).reshape(-1, window))
+    assert np.allclose(rolling_slopes(values, window), expected.reshape(4, -1))
@@ -0,0 +1,52 @@
+import numpy as np
+
+def ols_slopes(values):
+    """Inclinação da reta de mínimos quadrados de cada linha de um array 2-D, em forma fechada
+
+    O eixo x é a posição na linha (0, 1, 2, ...). Linhas mais curtas podem
+    ser completadas com NaN no final; linhas com menos de 2 pontos
+    (ou com x constante) têm inclinação NaN.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1)
+    x = np.arange(values.shape[1], dtype=float)
+    y = np.where(valid, values, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (valid @ x) / counts
+        y_mean = y.sum(axis=1) / counts
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        sxx = np.einsum('ij,ij->i', dx, dx)
+        slopes = np.einsum('ij,ij->i', dx, y - y_mean[:, None]) / sxx
+    return np.where(counts >= 2, slopes, np.nan)
+
+def ols_slope(series):
+    """Inclinação de uma única série (NaN com menos de 2 pontos)"""
+    return float(ols_slopes(np.asarray(series, dtype=float).reshape(1, -1))[0]) if len(series) else float('nan')
+
+def rolling_slopes(values, window):
+    """Inclinação de cada janela de `window` pontos consecutivos de cada linha
+
+    Retorna um array linhas x (colunas - window + 1): a coluna t é a
+    inclinação de values[:, t:t + window]. Usa somas acumuladas, então o
+    custo não depende do tamanho da janela; as linhas não podem ter NaN.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    rows, size = values.shape
+    if window < 2 or window > size:
+        return np.full((rows, max(size - window + 1, 0)), np.nan)
+
+    positions = np.arange(size, dtype=float)
+    zeros = np.zeros((rows, 1))
+    cum_y = np.hstack([zeros, np.cumsum(values, axis=1)])
+    cum_jy = np.hstack([zeros, np.cumsum(values * positions, axis=1)])
+
+    # Somas de y e de k*y na janela, com k = j - t a posição relativa dentro da janela
+    window_y = cum_y[:, window:] - cum_y[:, :-window]
+    starts = positions[:size - window + 1]
+    window_ky = cum_jy[:, window:] - cum_jy[:, :-window] - starts * window_y
+
+    k = np.arange(window, dtype=float)
+    sum_k, sum_kk = k.sum(), (k * k).sum()
+    return (window * window_ky - sum_k * window_y) / (window * sum_kk - sum_k ** 2)
@@ -6,6 +6,8 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import logging
 import time
 import json
+import math
+import statistics
 
 class NBAOddsScraper:
     def __init__(self):
@@ -73,7 +75,7 @@ class NBAOddsScraper:
             trend = sum(1 for x in last_5 if x > line) / 5
             
             # Calcula valor esperado
-            ev = self._calculate_prop_ev(avg, line, prop_data['over_odds'])
+            ev = self._calculate_prop_ev(avg, line, prop_data['over_odds'], last_5)
             
             # Calcula confiança
             confidence = self._calculate_prop_confidence(trend, matchup_rating, avg, line)
@@ -97,11 +99,27 @@ class NBAOddsScraper:
             self.logger.error(f"Erro na análise de prop: {str(e)}")
             return None
 
-    def _calculate_prop_ev(self, avg, line, odds):
+    def _calculate_prop_ev(self, avg, line, odds, last_5):
         """Calcula o valor esperado de uma prop"""
-        prob_over = 0.5 + (avg - line) / (2 * line)  # Ajusta probabilidade com base na média
+        prob_over = self._calculate_prob_over(avg, line, last_5)
         return (prob_over * (odds - 1)) - (1 - prob_over)
 
+    def _calculate_prob_over(self, avg, line, last_5):
+        """Probabilidade do over: Poisson com a média do jogador, ou normal quando os últimos jogos variam mais que ela"""
+        threshold = math.floor(line)  # Over é acima da linha; numa linha inteira o empate não conta
+        variance = statistics.variance(last_5) if len(last_5) > 1 else avg
+
+        if variance <= avg:
+            # P(X <= threshold) somando os termos da Poisson
+            term = cdf = math.exp(-avg)
+            for k in range(1, threshold + 1):
+                term *= avg / k
+                cdf += term
+            return max(0.0, 1 - cdf)
+
+        # Normal com correção de continuidade: over é X >= threshold + 1
+        return 0.5 * math.erfc((threshold + 0.5 - avg) / math.sqrt(2 * variance))
+
     def _calculate_prop_confidence(self, trend, matchup_rating, avg, line):
         """Calcula a confiança em uma prop"""
         base_confidence = 70